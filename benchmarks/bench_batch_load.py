@@ -0,0 +1,66 @@
+"""
+Бенчмарк пакетного разбора каталога миссий: последовательный разбор
+против load_many в пуле процессов.
+
+Запуск:
+    python -m benchmarks.bench_batch_load [--files 120] [--workers 4]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from pop_file_parser.batch import load_many
+from pop_file_parser.valve_parser import ValveFormat
+
+EXAMPLE = Path(__file__).resolve().parent.parent / "examples" / "expert_mission.pop"
+
+
+def write_pack(directory: Path, files: int, scale: int) -> List[Path]:
+    """files копий примера, каждая с волнами, повторенными scale раз."""
+    text = EXAMPLE.read_text(encoding="utf-8")
+    body = "\n".join(line for line in text.split("\n") if not line.startswith("#"))
+    head, _, tail = body.partition("{")
+    inner = tail.rsplit("}", 1)[0]
+    paths = []
+    for index in range(files):
+        path = directory / f"mission_{index}.pop"
+        path.write_text(f"{head}{{{inner * scale}}}\n", encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=120, help="Количество файлов")
+    parser.add_argument("--scale", type=int, default=5, help="Повторов волн в файле")
+    parser.add_argument("--workers", type=int, default=None, help="Количество процессов")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_pack(Path(directory), args.files, args.scale)
+        size = sum(path.stat().st_size for path in paths)
+
+        started = time.perf_counter()
+        formatter = ValveFormat()
+        serial = [formatter.parse_file(str(path)) for path in paths]
+        serial_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        results = load_many(paths, workers=args.workers)
+        trees = [result.tree() for result in results]
+        pool_time = time.perf_counter() - started
+        assert trees == serial
+
+        slowest = max(results, key=lambda result: result.seconds)
+        print(f"Files:      {args.files}, {size / 1024 / 1024:.2f} MB")
+        print(f"Serial:     {serial_time:.3f} s")
+        print(f"load_many:  {pool_time:.3f} s (including decoding trees)")
+        print(f"Speedup:    {serial_time / pool_time:.1f}x")
+        print(f"Slowest:    {Path(slowest.path).name}, {slowest.seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
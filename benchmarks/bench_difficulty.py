@@ -0,0 +1,56 @@
+"""
+Бенчмарк DifficultyEstimator: первая оценка миссии и повторная после
+правки одного робота (оценки остальных роботов берутся из кэша).
+
+Запуск:
+    python -m benchmarks.bench_difficulty [--copies 50]
+"""
+import argparse
+import time
+from pathlib import Path
+
+from pop_file_parser.difficulty import DifficultyEstimator
+from pop_file_parser.models.mission_info import MissionInfo
+from pop_file_parser.models.tf_bot import TFBot
+from pop_file_parser.valve_parser import ValveFormat
+
+EXAMPLE = Path(__file__).resolve().parent.parent / "examples" / "expert_mission.pop"
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--copies", type=int, default=50, help="Копий волн примера в миссии")
+    args = parser.parse_args()
+
+    tree = ValveFormat().parse_file(str(EXAMPLE))
+    mission = MissionInfo()
+    for copy in range(args.copies):
+        info = MissionInfo.from_valve_format(tree["WaveSchedule"])
+        for wave in info.waves:
+            for spawn in wave.wave_spawns:
+                for bot in spawn.squad:
+                    if isinstance(bot, TFBot):
+                        # Разные роботы в каждой копии: иначе все попадут в кэш
+                        bot.health = 1000 + copy
+        mission.waves.extend(info.waves)
+    bots = sum(len(spawn.squad) for wave in mission.waves for spawn in wave.wave_spawns)
+
+    estimator = DifficultyEstimator()
+    started = time.perf_counter()
+    estimator.score_mission(mission)
+    cold = time.perf_counter() - started
+    cold_misses = estimator.misses
+
+    next(bot for bot in mission.waves[0].wave_spawns[0].squad if isinstance(bot, TFBot)).health = 9999
+    started = time.perf_counter()
+    estimator.score_mission(mission)
+    warm = time.perf_counter() - started
+
+    print(f"Waves: {len(mission.waves)}, robots: {bots}")
+    print(f"Cold score:   {cold * 1000:.1f} ms ({cold_misses} bots scored)")
+    print(f"After edit:   {warm * 1000:.1f} ms ({estimator.misses - cold_misses} bots scored)")
+
+
+if __name__ == "__main__":
+    main()
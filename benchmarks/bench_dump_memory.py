@@ -0,0 +1,74 @@
+"""
+Пиковая память экспорта: dump() одной строкой против потокового dump_to().
+
+Запуск:
+    python -m benchmarks.bench_dump_memory [--lines 50000]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from benchmarks.bench_lexer import EXAMPLE
+from pop_file_parser.valve_parser import ValveFormat
+
+
+def build_mission(lines: int) -> Dict[str, Any]:
+    """Размножает волны примера, пока дамп не займет не меньше lines строк."""
+    formatter = ValveFormat()
+    mission = formatter.parse_file(str(EXAMPLE), comments=False)
+    mission.pop("__base_files", None)
+    schedule = mission["WaveSchedule"]
+    waves: List[Dict[str, Any]] = schedule["Wave"]
+    if not isinstance(waves, list):
+        waves = [waves]
+    per_copy = sum(1 for _ in formatter.iter_dump({"Wave": waves}))
+    copies = max(1, -(-lines // per_copy))
+    schedule["Wave"] = waves * copies
+    return mission
+
+
+def measure(export: Callable[[Any], None], path: str) -> tuple:
+    """Возвращает (пиковая память в байтах, время в секундах) записи в файл."""
+    with open(path, "w", encoding="utf-8") as f:
+        tracemalloc.start()
+        started = time.perf_counter()
+        export(f)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak, elapsed
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=50000, help="Минимальное число строк")
+    args = parser.parse_args()
+
+    formatter = ValveFormat()
+    mission = build_mission(args.lines)
+    line_count = sum(1 for _ in formatter.iter_dump(mission))
+
+    fd, path = tempfile.mkstemp(suffix=".pop")
+    os.close(fd)
+    try:
+        joined, joined_time = measure(lambda f: f.write(formatter.dump(mission)), path)
+        with open(path, encoding="utf-8") as f:
+            expected = f.read()
+        streamed, streamed_time = measure(lambda f: formatter.dump_to(mission, f), path)
+        with open(path, encoding="utf-8") as f:
+            assert f.read() == expected
+    finally:
+        os.remove(path)
+
+    print(f"Lines:      {line_count}")
+    print(f"dump():     peak {joined / 1024:.0f} KiB, {joined_time:.3f} s")
+    print(f"dump_to():  peak {streamed / 1024:.0f} KiB, {streamed_time:.3f} s")
+    print(f"Reduction:  {joined / streamed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Бенчмарк вывода: кэш отступов Emitter против умножения отступа на строку.
+
+LegacyFormat ниже повторяет прежние ValveFormat.iter_dump и его
+вспомогательные методы, где каждая строка строилась как "\\t" * indent + ...
+
+Запуск:
+    python -m benchmarks.bench_emitter [--scale 100]
+"""
+import argparse
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+from benchmarks.bench_lexer import EXAMPLE
+from pop_file_parser.valve_keys import (
+    KEY_CLASSES, BLOCK, OUTPUT, PARAMETERS, ATTRIBUTES, ATTRIBUTE_BLOCK
+)
+from pop_file_parser.valve_parser import ValveFormat
+
+
+class LegacyFormat(ValveFormat):
+    """Прежний вывод (эталон)."""
+
+    def _format_output_block(self, key: str, value: Dict[str, Any], indent: int) -> List[str]:
+        """Форматирует Output блок или Parameters."""
+        result = []
+        result.append("\t" * indent + key)
+        result.append("\t" * indent + "{")
+        
+        if key == "Parameters":
+            # Специальная обработка Parameters - только как блок, без строкового значения
+            for param_key, param_value in value.items():
+                formatted_value = self._format_value(param_value)
+                # Используем табуляцию для отступов
+                result.append(f"\t" * (indent + 1) + f"{param_key} {formatted_value}")
+        else:
+            # Обычный Output блок
+            for output_key, output_value in value.items():
+                # Используем табуляцию для отступов
+                result.append(f"\t" * (indent + 1) + f"{output_key} {self._format_value(output_value)}")
+            
+        result.append("\t" * indent + "}")
+        return result
+
+    def iter_dump(self, data: Dict[str, Any], indent: int = 0) -> Iterator[str]:
+        """Прежний iter_dump: отступ умножается на каждую строку."""
+        dict_emitters = self._DICT_EMITTERS
+        
+        # Если есть комментарий, добавляем его первым
+        if "__comment" in data:
+            comment = data["__comment"]
+            # Разбиваем комментарий на строки и форматируем каждую как однострочный комментарий
+            for line in comment.split('\n'):
+                yield "\t" * indent + f"// {line.strip()}"
+        
+        regular_data = {k: v for k, v in data.items() if k not in {"__comment", "__base_files", "__attrs"}}
+        
+        # Сначала обрабатываем атрибуты, если они есть
+        if "__attrs" in data:
+            for attr in data["__attrs"]:
+                yield "\t" * indent + f'Attributes {attr}'
+            
+        for key, value in regular_data.items():
+            if isinstance(value, dict):
+                # Способ вывода блока выбирается по таблице ключей
+                yield from dict_emitters[KEY_CLASSES[key].strategy](self, key, value, indent)
+            elif isinstance(value, (list, tuple)):
+                # Для списков проверяем, не Squad ли это
+                if key == "Squad":
+                    yield "\t" * indent + "Squad"
+                    yield "\t" * indent + "{"
+                    for item in value:
+                        if isinstance(item, dict):
+                            item_type = next(iter(item))  # TFBot или Tank
+                            yield "\t" * (indent + 1) + item_type
+                            yield "\t" * (indent + 1) + "{"
+                            yield from self._iter_nested(item[item_type], indent + 2)
+                            yield "\t" * (indent + 1) + "}"
+                        else:
+                            # Если элемент не словарь, форматируем его как есть
+                            yield "\t" * (indent + 1) + str(item)
+                    yield "\t" * indent + "}"
+                else:
+                    # Для обычных списков - каждый элемент как отдельный блок
+                    for item in value:
+                        if isinstance(item, dict):
+                            yield "\t" * indent + self._format_key_value(key, item)
+                            yield "\t" * indent + "{"
+                            yield from self._iter_nested(item, indent + 1)
+                            yield "\t" * indent + "}"
+                        else:
+                            yield "\t" * indent + self._format_key_value(key, item)
+            else:
+                # Простые значения (строки, числа, булевы)
+                # Пропускаем вывод Parameters как строки
+                if key != "Parameters":
+                    yield "\t" * indent + self._format_key_value(key, value)
+                    
+    def _emit_attributes(self, key: str, value: Any, indent: int) -> Iterator[str]:
+        """Выводит блок Attributes строками "Attributes X"."""
+        if isinstance(value, (str, list)):
+            # Если это строка или список, выводим как есть
+            attrs = value if isinstance(value, list) else [value]
+            for attr in attrs:
+                yield "\t" * indent + f'Attributes {attr}'
+        else:
+            # Если это словарь или что-то другое, извлекаем значения
+            for attr_val in value.values():
+                if attr_val:  # Пропускаем пустые значения
+                    yield "\t" * indent + f'Attributes {attr_val}'
+
+    def _emit_attribute_block(self, key: str, value: Dict[str, Any], indent: int) -> Iterator[str]:
+        """Выводит CharacterAttributes и ItemAttributes."""
+        yield "\t" * indent + key
+        yield "\t" * indent + "{"
+        for attr_key, attr_val in value.items():
+            if attr_key == "ItemName":
+                yield "\t" * (indent + 1) + f'ItemName "{attr_val}"'
+            elif isinstance(attr_val, (int, float)):
+                yield "\t" * (indent + 1) + f'"{attr_key}" {attr_val}'
+            else:
+                yield "\t" * (indent + 1) + f'"{attr_key}" "{attr_val}"'
+        yield "\t" * indent + "}"
+
+    def _emit_block(self, key: str, value: Dict[str, Any], indent: int) -> Iterator[str]:
+        """Выводит обычный вложенный блок."""
+        yield "\t" * indent + self._format_key_value(key, value)
+        yield "\t" * indent + "{"
+        yield from self._iter_nested(value, indent + 1)
+        yield "\t" * indent + "}"
+
+    # Диспетчеризация вывода блока по KeyClass.strategy
+    _DICT_EMITTERS: Dict[int, Callable[..., Iterable[str]]] = {
+        BLOCK: _emit_block,
+        OUTPUT: _format_output_block,
+        PARAMETERS: _format_output_block,
+        ATTRIBUTES: _emit_attributes,
+        ATTRIBUTE_BLOCK: _emit_attribute_block,
+    }
+
+    def _iter_nested(self, data: Dict[str, Any], indent: int) -> Iterator[str]:
+        """Строки вложенного блока; пустой блок дает одну пустую строку, как в dump()."""
+        empty = True
+        for line in self.iter_dump(data, indent):
+            empty = False
+            yield line
+        if empty:
+            yield ""
+
+
+def build_mission(scale: int) -> Dict[str, Any]:
+    """Пример миссии, волны которого повторены scale раз."""
+    mission = ValveFormat().parse_file(str(EXAMPLE))
+    mission.pop("__base_files", None)
+    schedule = mission["WaveSchedule"]
+    waves = schedule["Wave"] if isinstance(schedule["Wave"], list) else [schedule["Wave"]]
+    schedule["Wave"] = waves * scale
+    return mission
+
+
+def measure(formatter: ValveFormat, data: Dict[str, Any], repeat: int) -> float:
+    """Возвращает лучшее время dump() в секундах."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        formatter.dump(data)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=100, help="Во сколько раз увеличить пример")
+    parser.add_argument("--repeat", type=int, default=5, help="Количество повторов")
+    args = parser.parse_args()
+
+    data = build_mission(args.scale)
+    legacy_formatter = LegacyFormat()
+    formatter = ValveFormat()
+    assert legacy_formatter.dump(data) == formatter.dump(data)
+
+    legacy = measure(legacy_formatter, data, args.repeat)
+    emitter = measure(formatter, data, args.repeat)
+
+    print(f"Lines:        {formatter.dump(data).count(chr(10)) + 1} ({args.scale}x {EXAMPLE.name})")
+    print(f"Legacy dump:  {legacy:.3f} s")
+    print(f"Emitter dump: {emitter:.3f} s")
+    print(f"Speedup:      {legacy / emitter:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
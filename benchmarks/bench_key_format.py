@@ -0,0 +1,115 @@
+"""
+Стоимость классификации и форматирования одного ключа при dump.
+
+Эталоны ниже повторяют прежние ValveFormat._is_output_block,
+_is_root_param и _format_key_value, которые собирали списки суффиксов и
+множества литералов на каждый вызов.
+
+Запуск:
+    python -m benchmarks.bench_key_format [--repeat 5]
+"""
+import argparse
+import time
+from typing import Any, Callable, Iterator, List, Tuple
+
+from benchmarks.bench_lexer import EXAMPLE
+from pop_file_parser.valve_keys import KEY_CLASSES, OUTPUT
+from pop_file_parser.valve_parser import ValveFormat
+
+
+def legacy_is_output_block(key: str) -> bool:
+    """Прежняя проверка Output блока (эталон)."""
+    return any(key.endswith(suffix) for suffix in [
+        "Output", "WaveOutput", "SpawnOutput", "DeathOutput",
+        "BombDroppedOutput", "KilledOutput"
+    ])
+
+
+def legacy_is_root_param(key: str) -> bool:
+    """Прежняя проверка корневого параметра (эталон)."""
+    root_params = {
+        "FixedRespawnWaveTime", "CanBotsAttackWhileInSpawnRoom",
+        "AddSentryBusterWhenDamageDealtExceeds", "Advanced"
+    }
+    return key in root_params
+
+
+def legacy_format_key_value(key: str, value: Any) -> str:
+    """Прежнее форматирование пары ключ-значение (эталон)."""
+    if key == "__attrs":
+        return f'Attributes {" ".join(value)}'
+    if isinstance(value, (dict, list)) and key in {
+        "WaveSchedule", "Wave", "WaveSpawn", "Tank", "TFBot",
+        "Mission", "CharacterAttributes", "ItemAttributes", "Squad"
+    }:
+        return key
+    if isinstance(value, bool):
+        if legacy_is_root_param(key):
+            return f'{key} {"Yes" if value else "No"}'
+        return f'{key} {1 if value else 0}'
+    if isinstance(value, (int, float)):
+        if key == "ItemName":
+            return f'{key} "{value}"'
+        return f'{key} {value}'
+    return f'{key} "{value}"'
+
+
+def iter_pairs(data: Any) -> Iterator[Tuple[str, Any]]:
+    """Все пары ключ-значение дерева."""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, dict):
+            for key, value in node.items():
+                yield key, value
+                stack.append(value)
+
+
+def measure(step: Callable[[str, Any], Any], pairs: List[Tuple[str, Any]], repeat: int) -> float:
+    """Возвращает лучшее время на одну пару в наносекундах."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for key, value in pairs:
+            step(key, value)
+        best = min(best, time.perf_counter() - started)
+    return best / len(pairs) * 1e9
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5, help="Количество повторов")
+    args = parser.parse_args()
+
+    formatter = ValveFormat()
+    tree = formatter.parse_file(str(EXAMPLE))
+    # Добавляем булевы и числовые значения, как в деревьях из моделей
+    tree["WaveSchedule"].update({"Advanced": True, "RespawnWaveTime": 6})
+    pairs = [pair for pair in iter_pairs(tree) if pair[0] != "__base_files"] * 200
+
+    def legacy(key: str, value: Any) -> None:
+        if isinstance(value, dict):
+            legacy_is_output_block(key)
+        else:
+            legacy_format_key_value(key, value)
+
+    def table(key: str, value: Any) -> None:
+        if isinstance(value, dict):
+            KEY_CLASSES[key].strategy == OUTPUT
+        else:
+            formatter._format_key_value(key, value)
+
+    legacy_ns = measure(legacy, pairs, args.repeat)
+    table_ns = measure(table, pairs, args.repeat)
+
+    print(f"Keys:          {len(pairs)}")
+    print(f"Legacy checks: {legacy_ns:.0f} ns/key")
+    print(f"Key table:     {table_ns:.0f} ns/key")
+    print(f"Speedup:       {legacy_ns / table_ns:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
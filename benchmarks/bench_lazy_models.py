@@ -0,0 +1,69 @@
+"""
+Бенчмарк создания моделей из разобранной миссии: обычный режим
+from_valve_format и ленивый (lazy=True) при чтении только параметров
+волн, как в popcompiler info.
+
+Запуск:
+    python -m benchmarks.bench_lazy_models [--waves 500] [--spawns 8]
+"""
+import argparse
+import time
+from typing import Any, Dict
+
+from pop_file_parser.models.mission_info import MissionInfo
+
+
+def build_mission(waves: int, spawns: int) -> Dict[str, Any]:
+    """waves волн по spawns WaveSpawn с отрядом из трех роботов."""
+    bot = {
+        "Class": "Heavyweapons", "Health": 5000, "Skill": "Expert", "Scale": 1.75,
+        "Attributes": ["MiniBoss", "AlwaysCrit"],
+        "CharacterAttributes": {"move speed bonus": 0.5, "damage force reduction": 0.3},
+    }
+    schedule = []
+    for _ in range(waves):
+        wave_spawns = [
+            {
+                "Where": "spawnbot", "TotalCount": 10, "TotalCurrency": 100,
+                "Squad": {"TFBot": [dict(bot) for _ in range(3)]},
+            }
+            for _ in range(spawns)
+        ]
+        schedule.append({"WaveSpawn": wave_spawns, "Tank": [{"Health": 20000}]})
+    return {"StartingCurrency": 400, "Wave": schedule}
+
+
+def measure(data: Dict[str, Any], lazy: bool, repeat: int) -> float:
+    """Лучшее время загрузки и чтения комментариев волн в секундах."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        info = MissionInfo.from_valve_format(data, lazy=lazy)
+        for wave in info.waves:
+            wave.comment
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--waves", type=int, default=500, help="Количество волн")
+    parser.add_argument("--spawns", type=int, default=8, help="WaveSpawn в волне")
+    parser.add_argument("--repeat", type=int, default=5, help="Количество повторов")
+    args = parser.parse_args()
+
+    data = build_mission(args.waves, args.spawns)
+    assert MissionInfo.from_valve_format(data, lazy=True) == MissionInfo.from_valve_format(data)
+
+    eager = measure(data, False, args.repeat)
+    lazy = measure(data, True, args.repeat)
+
+    print(f"Robots:  {args.waves * args.spawns * 3} in {args.waves} waves")
+    print(f"Eager:   {eager:.3f} s")
+    print(f"Lazy:    {lazy:.3f} s")
+    print(f"Speedup: {eager / lazy:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
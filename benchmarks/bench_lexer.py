@@ -0,0 +1,57 @@
+"""
+Бенчмарк лексического анализатора: посимвольный обход против регулярного сканера.
+
+Запуск:
+    python -m benchmarks.bench_lexer [--scale 200]
+"""
+import argparse
+import time
+from pathlib import Path
+
+from pop_file_parser.lexer import Lexer
+
+EXAMPLE = Path(__file__).resolve().parent.parent / "examples" / "expert_mission.pop"
+
+
+def load_scaled_example(scale: int) -> str:
+    """Возвращает пример миссии, повторенный scale раз (без директив #base)."""
+    text = EXAMPLE.read_text(encoding="utf-8")
+    # Лексер не поддерживает директивы препроцессора
+    body = "\n".join(line for line in text.split("\n") if not line.startswith("#"))
+    return body * scale
+
+
+def measure(lexer: Lexer, text: str, fast: bool, repeat: int) -> float:
+    """Возвращает лучшее время токенизации в секундах."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        lexer.tokenize(text, fast=fast)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=200, help="Во сколько раз увеличить пример")
+    parser.add_argument("--repeat", type=int, default=3, help="Количество повторов")
+    args = parser.parse_args()
+
+    text = load_scaled_example(args.scale)
+    lexer = Lexer()
+
+    assert lexer.tokenize(text, fast=True) == lexer.tokenize(text, fast=False)
+
+    legacy = measure(lexer, text, fast=False, repeat=args.repeat)
+    fast = measure(lexer, text, fast=True, repeat=args.repeat)
+
+    size_mb = len(text.encode("utf-8")) / (1024 * 1024)
+    print(f"Input: {size_mb:.2f} MB ({args.scale}x {EXAMPLE.name})")
+    print(f"Character walk: {legacy:.3f} s")
+    print(f"Regex scanner:  {fast:.3f} s")
+    print(f"Speedup:        {legacy / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Отчет tracemalloc о памяти моделей: классы со __slots__ (slotted) и те же
+dataclass с __dict__ у каждого экземпляра, как до перехода на слоты.
+
+Запуск:
+    python -m benchmarks.bench_model_memory [--bots 10000]
+"""
+import argparse
+import tracemalloc
+from dataclasses import MISSING, field, fields, make_dataclass
+from typing import Any, Callable, Dict, List
+
+from pop_file_parser.models.output_block import OutputBlock
+from pop_file_parser.models.robot import Robot
+from pop_file_parser.models.tank import Tank
+from pop_file_parser.models.tf_bot import TFBot
+from pop_file_parser.models.wave import Wave
+from pop_file_parser.models.wave_spawn import WaveSpawn
+
+MODELS = (TFBot, WaveSpawn, Wave, Tank, OutputBlock, Robot)
+
+
+def with_dict(cls: type) -> type:
+    """Тот же набор полей без __slots__: экземпляры хранят поля в __dict__."""
+    spec = []
+    for f in fields(cls):
+        if f.default is not MISSING:
+            spec.append((f.name, f.type, field(default=f.default)))
+        elif f.default_factory is not MISSING:
+            spec.append((f.name, f.type, field(default_factory=f.default_factory)))
+        else:
+            spec.append((f.name, f.type))
+    return make_dataclass(cls.__name__, spec)
+
+
+def traced(build: Callable[[], Any]) -> int:
+    """Объем памяти (байт), занятой результатом build()."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return after - before
+
+
+def build_mission(models: Dict[str, type], bots: int, tracked: bool) -> List[Any]:
+    """Волны по 10 WaveSpawn с отрядом из 5 TFBot, всего bots роботов."""
+    def make(model_name: str, **kwargs: Any) -> Any:
+        model = models[model_name](**kwargs)
+        if tracked:
+            # До слотов DirtyTrackingMixin хранил флаг в __dict__ экземпляра
+            model._dirty = True
+        return model
+
+    waves = []
+    spawns_per_wave, squad_size = 10, 5
+    for wave_index in range(max(1, bots // (spawns_per_wave * squad_size))):
+        wave = make("Wave", checkpoint=True, description=f"Wave {wave_index}")
+        for _ in range(spawns_per_wave):
+            spawn = make("WaveSpawn", where="spawnbot", total_count=20, total_currency=50)
+            for bot_index in range(squad_size):
+                spawn.squad.append(make(
+                    "TFBot", name="Heavy", class_name="Heavyweapons",
+                    health=300 + bot_index, skill="Hard",
+                ))
+            wave.wave_spawns.append(spawn)
+        wave.tanks.append(make("Tank", health=20000))
+        waves.append(wave)
+    return waves
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bots", type=int, default=10000, help="Количество роботов в миссии")
+    parser.add_argument("--count", type=int, default=10000, help="Экземпляров на класс")
+    args = parser.parse_args()
+
+    print(f"{'Model':<12} {'__dict__':>10} {'__slots__':>10}   bytes per instance")
+    for cls in MODELS:
+        dict_cls = with_dict(cls)
+        kwargs = {"name": "x"} if cls is Robot else {}
+        plain = traced(lambda: [dict_cls(**kwargs) for _ in range(args.count)])
+        slotted = traced(lambda: [cls(**kwargs) for _ in range(args.count)])
+        print(f"{cls.__name__:<12} {plain / args.count:>10.0f} {slotted / args.count:>10.0f}")
+
+    dict_models = {cls.__name__: with_dict(cls) for cls in MODELS}
+    slot_models = {cls.__name__: cls for cls in MODELS}
+    plain = traced(lambda: build_mission(dict_models, args.bots, tracked=True))
+    slotted = traced(lambda: build_mission(slot_models, args.bots, tracked=False))
+
+    print()
+    print(f"Mission with {args.bots} bots:")
+    print(f"__dict__:  {plain / 1024 / 1024:.2f} MiB")
+    print(f"__slots__: {slotted / 1024 / 1024:.2f} MiB")
+    print(f"Saved:     {(1 - slotted / plain) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
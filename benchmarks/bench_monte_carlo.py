@@ -0,0 +1,49 @@
+"""
+Бенчмарк MonteCarloEngine: время выборки волн с RandomChoice.
+
+Запуск:
+    python -m benchmarks.bench_monte_carlo [--samples 5000] [--total 40]
+"""
+import argparse
+import time
+
+from pop_file_parser.models.tf_bot import TFBot
+from pop_file_parser.models.wave import Wave
+from pop_file_parser.models.wave_spawn import WaveSpawn
+from pop_file_parser.monte_carlo import CLASS_HEALTH, MonteCarloEngine
+
+
+def make_wave(spawns: int, total: int) -> Wave:
+    """Волна из spawns WaveSpawn с RandomChoice по всем классам и гигантом."""
+    choices = [TFBot(class_name=name.capitalize()) for name in CLASS_HEALTH]
+    choices.append(TFBot(class_name="Heavyweapons", health=5000, attributes={"MiniBoss"}))
+    return Wave(wave_spawns=[
+        WaveSpawn(total_count=total, random_choice=True, squad=choices) for _ in range(spawns)
+    ])
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=5000, help="Реализаций волны")
+    parser.add_argument("--spawns", type=int, default=6, help="WaveSpawn с RandomChoice")
+    parser.add_argument("--total", type=int, default=40, help="TotalCount каждого WaveSpawn")
+    args = parser.parse_args()
+
+    wave = make_wave(args.spawns, args.total)
+    engine = MonteCarloEngine(samples=args.samples, seed=0)
+    started = time.perf_counter()
+    result = engine.sample_wave(wave)
+    elapsed = time.perf_counter() - started
+    summary = result.summary()
+
+    robots = args.spawns * args.total * args.samples
+    print(f"Samples:      {args.samples}, robots drawn: {robots}")
+    print(f"Time:         {elapsed:.3f} s ({robots / elapsed / 1e6:.1f} M robots/s)")
+    print(f"Health p5/p50/p95: {summary['health']['p5']:.0f} / "
+          f"{summary['health']['p50']:.0f} / {summary['health']['p95']:.0f}")
+    print(f"Giants mean:  {summary['giants']['mean']:.1f} (max {summary['giants']['max']:.0f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Бенчмарк разбора вложенных блоков: рекурсия против явного стека.
+
+Рекурсивные эталоны ниже повторяют прежние реализации ValveFormat._parse_block
+и Parser.parse_block/parse_value, чтобы сравнить накладные расходы на вызовы.
+
+Запуск:
+    python -m benchmarks.bench_nesting [--scale 200] [--depth 5000]
+"""
+import argparse
+import sys
+import time
+from typing import Any, Callable, Dict
+
+from benchmarks.bench_lexer import load_scaled_example
+from pop_file_parser.parser import Parser
+from pop_file_parser.valve_parser import ValveFormat
+from pop_file_parser.valve_scanner import (
+    ValveScanner, TOKEN_LBRACE, TOKEN_RBRACE, TOKEN_EOF
+)
+
+
+def recursive_valve_block(scanner: ValveScanner) -> Dict[str, Any]:
+    """Рекурсивный разбор блока Valve (эталон)."""
+    result: Dict[str, Any] = {}
+    current_key = None
+    while True:
+        kind, start, end = scanner.next_token()
+        if kind == TOKEN_RBRACE:
+            return result
+        if kind == TOKEN_EOF:
+            raise ValueError("Expected '}'")
+        if not current_key:
+            current_key = scanner.decode(start, end)
+            continue
+        if kind == TOKEN_LBRACE:
+            value = recursive_valve_block(scanner)
+        else:
+            value = scanner.decode(start, end)
+        if current_key in result:
+            if isinstance(result[current_key], list):
+                result[current_key].append(value)
+            else:
+                result[current_key] = [result[current_key], value]
+        else:
+            result[current_key] = value
+        current_key = None
+
+
+def recursive_parser_value(parser: Parser) -> Any:
+    """Рекурсивный разбор значения Parser (эталон)."""
+    token = parser.current_token
+    if token.type == 'LBRACE':
+        attributes = {}
+        parser.eat('LBRACE')
+        while parser.current_token.type != 'RBRACE':
+            key = parser.current_token.value
+            parser.eat('IDENTIFIER')
+            attributes[key] = recursive_parser_value(parser)
+        parser.eat('RBRACE')
+        return attributes
+    if token.type == 'LBRACKET':
+        values = []
+        parser.eat('LBRACKET')
+        while parser.current_token.type != 'RBRACKET':
+            values.append(recursive_parser_value(parser))
+        parser.eat('RBRACKET')
+        return values
+    return parser._parse_scalar()
+
+
+def best_of(run: Callable[[], Any], repeat: int) -> float:
+    """Возвращает лучшее время выполнения run() в секундах."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def valve_runs(text: str):
+    """Возвращает пару (рекурсия, явный стек) для ValveFormat."""
+    def recursive():
+        scanner = ValveScanner(text)
+        scanner.next_token()  # Корневой ключ
+        scanner.next_token()  # {
+        return recursive_valve_block(scanner)
+
+    def iterative():
+        scanner = ValveScanner(text)
+        scanner.next_token()
+        scanner.next_token()
+        return ValveFormat()._parse_block(scanner, [])
+
+    return recursive, iterative
+
+
+def parser_runs(text: str):
+    """Возвращает пару (рекурсия, явный стек) для Parser по списку токенов."""
+    tokens = Parser().lexer.tokenize(text)
+
+    def recursive():
+        parser = Parser()
+        parser.reset(tokens)
+        return recursive_parser_value(parser)
+
+    def iterative():
+        parser = Parser()
+        parser.reset(tokens)
+        return parser.parse_value()
+
+    return recursive, iterative
+
+
+def report(title: str, runs, repeat: int) -> None:
+    """Печатает сравнение времени либо RecursionError эталона."""
+    recursive, iterative = runs
+    stack = best_of(iterative, repeat)
+    try:
+        baseline = best_of(recursive, repeat)
+    except RecursionError:
+        print(f"{title}: recursion  RecursionError, explicit stack {stack:.3f} s")
+        return
+    print(f"{title}: recursion {baseline:.3f} s, explicit stack {stack:.3f} s "
+          f"({baseline / stack:.2f}x)")
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=200, help="Во сколько раз увеличить пример")
+    parser.add_argument("--depth", type=int, default=5000, help="Глубина синтетической вложенности")
+    parser.add_argument("--repeat", type=int, default=3, help="Количество повторов")
+    args = parser.parse_args()
+
+    example = "WaveSchedule\n{\n" + load_scaled_example(args.scale) + "\n}\n"
+    deep_valve = "Root {" + " k {" * args.depth + " v 1" + " }" * args.depth + " }"
+    # Parser принимает только ключи-идентификаторы: вложенные блоки и массивы
+    deep_parser = "{ k [" * args.depth + " 1" + " ] }" * args.depth
+    flat_parser = "{" + " ".join(
+        f"Wave{i} {{ Spawn {{ Count {i} Where spawnbot Tags [a b] }} }}" for i in range(20000)
+    ) + " }"
+
+    print(f"Python recursion limit: {sys.getrecursionlimit()}")
+    report("ValveFormat, scaled example", valve_runs(example), args.repeat)
+    report(f"ValveFormat, depth {args.depth}", valve_runs(deep_valve), args.repeat)
+    report("Parser, 20000 nested blocks", parser_runs(flat_parser), args.repeat)
+    report(f"Parser, depth {args.depth}", parser_runs(deep_parser), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
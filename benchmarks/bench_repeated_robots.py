@@ -0,0 +1,90 @@
+"""
+Бенчмарк вывода миссии с повторяющимися роботами: с кэшем отрисовки
+поддеревьев (SubtreeCache) и без него.
+
+Запуск:
+    python -m benchmarks.bench_repeated_robots [--waves 200] [--unique 8]
+"""
+import argparse
+import time
+from typing import Any, Dict, Optional
+
+from pop_file_parser.models.tank import Tank
+from pop_file_parser.models.tf_bot import TFBot
+from pop_file_parser.models.wave import Wave
+from pop_file_parser.models.wave_spawn import WaveSpawn
+from pop_file_parser.subtree_cache import SubtreeCache
+from pop_file_parser.valve_parser import ValveFormat
+
+
+def make_bot(index: int) -> TFBot:
+    """Робот с заметным количеством атрибутов."""
+    bot = TFBot(
+        name=f"Giant Robot {index}", class_name="Heavyweapons", health=5000 + index,
+        skill="Expert", scale=1.75, class_icon="heavy_giant",
+    )
+    bot.attributes = {"MiniBoss", "AlwaysCrit"}
+    bot.items = ["The Brass Beast", "The Bear Claws"]
+    bot.character_attributes = {
+        "move speed bonus": 0.5, "damage force reduction": 0.3,
+        "airblast vulnerability multiplier": 0.3, "override footstep sound set": 2,
+    }
+    bot.item_attributes = {"ItemName": "The Brass Beast", "damage bonus": 1.5}
+    return bot
+
+
+def build_mission(waves: int, unique: int) -> Dict[str, Any]:
+    """waves волн по 4 WaveSpawn; роботы выбираются из unique вариантов."""
+    schedule = []
+    for wave_index in range(waves):
+        wave = Wave(checkpoint=True)
+        for spawn_index in range(4):
+            spawn = WaveSpawn(where="spawnbot", total_count=10, total_currency=100)
+            spawn.squad.append(make_bot((wave_index * 4 + spawn_index) % unique))
+            wave.wave_spawns.append(spawn)
+        wave.tanks.append(Tank(health=20000))
+        schedule.append(wave.to_valve_format())
+    return {"WaveSchedule": {"StartingCurrency": 400, "Wave": schedule}}
+
+
+def measure(data: Dict[str, Any], subtree_cache: Optional[SubtreeCache], repeat: int) -> float:
+    """Лучшее время dump() в секундах (кэш создается заново на каждый экспорт)."""
+    best = float("inf")
+    for _ in range(repeat):
+        formatter = ValveFormat()
+        formatter.subtree_cache = subtree_cache and SubtreeCache()
+        started = time.perf_counter()
+        formatter.dump(data)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--waves", type=int, default=200, help="Количество волн")
+    parser.add_argument("--unique", type=int, default=8, help="Количество разных роботов")
+    parser.add_argument("--repeat", type=int, default=5, help="Количество повторов")
+    args = parser.parse_args()
+
+    data = build_mission(args.waves, args.unique)
+    assert ValveFormat().dump(data) == measure_reference(data)
+
+    plain = measure(data, None, args.repeat)
+    cached = measure(data, SubtreeCache(), args.repeat)
+
+    print(f"Robots:        {args.waves * 4} ({args.unique} unique), {args.waves} tanks")
+    print(f"Without cache: {plain:.3f} s")
+    print(f"Subtree cache: {cached:.3f} s")
+    print(f"Speedup:       {plain / cached:.1f}x")
+
+
+def measure_reference(data: Dict[str, Any]) -> str:
+    """dump() без кэша - эталон для проверки результата."""
+    formatter = ValveFormat()
+    formatter.subtree_cache = None
+    return formatter.dump(data)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Отчет tracemalloc о памяти деревьев разбора с таблицей строк и без нее
+при загрузке набора pop файлов (ValveFormat) и токенизации (Lexer).
+
+Запуск:
+    python -m benchmarks.bench_string_memory [--files 100]
+"""
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, List
+
+from pop_file_parser import lexer as lexer_module
+from pop_file_parser.lexer import Lexer
+from pop_file_parser.string_table import COMMON_VALUES, SCHEMA_KEYWORDS, StringTable
+from pop_file_parser.valve_parser import ValveFormat
+
+EXAMPLE = Path(__file__).resolve().parent.parent / "examples" / "expert_mission.pop"
+
+
+def write_pack(directory: Path, files: int) -> List[Path]:
+    """Копии примера миссии с разными именами волн (без директив #base)."""
+    text = EXAMPLE.read_text(encoding="utf-8")
+    body = "\n".join(line for line in text.split("\n") if not line.startswith("#"))
+    paths = []
+    for index in range(files):
+        path = directory / f"mission_{index}.pop"
+        path.write_text(body.replace("wave", f"wave{index}_"), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def traced(build: Callable[[], Any]) -> int:
+    """Объем памяти (байт), занятой результатом build()."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return after - before
+
+
+def load_trees(paths: List[Path], strings: Any) -> Any:
+    """Деревья всех файлов; новая таблица строк учитывается в результате."""
+    formatter = ValveFormat()
+    formatter.strings = strings() if strings else None
+    return formatter.strings, [formatter.parse_file(str(path)) for path in paths]
+
+
+def load_tokens(paths: List[Path], strings: StringTable) -> Any:
+    """Токены всех файлов с заданной таблицей строк лексера."""
+    saved = lexer_module.STRINGS
+    lexer_module.STRINGS = strings
+    try:
+        lexer = Lexer()
+        return strings, [lexer.tokenize(path.read_text(encoding="utf-8")) for path in paths]
+    finally:
+        lexer_module.STRINGS = saved
+
+
+def report(title: str, plain: int, interned: int) -> None:
+    print(f"{title}")
+    print(f"  without table: {plain / 1024 / 1024:.2f} MiB")
+    print(f"  string table:  {interned / 1024 / 1024:.2f} MiB")
+    print(f"  saved:         {(plain - interned) / 1024 / 1024:.2f} MiB ({(1 - interned / plain) * 100:.0f}%)")
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=100, help="Количество файлов")
+    args = parser.parse_args()
+
+    def fresh_table() -> StringTable:
+        return StringTable(SCHEMA_KEYWORDS | COMMON_VALUES)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_pack(Path(directory), args.files)
+        size = sum(path.stat().st_size for path in paths)
+        print(f"Files: {args.files}, {size / 1024 / 1024:.2f} MB")
+
+        plain = traced(lambda: load_trees(paths, None))
+        interned = traced(lambda: load_trees(paths, fresh_table))
+        report("ValveFormat.parse_file trees:", plain, interned)
+
+        # Таблица без записей возвращает каждую строку как есть
+        plain = traced(lambda: load_tokens(paths, StringTable(max_entries=0)))
+        interned = traced(lambda: load_tokens(paths, fresh_table()))
+        report("Lexer.tokenize tokens:", plain, interned)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Бенчмарк моделирования волн: время TimelineSimulator на наборе миссий.
+
+Запуск:
+    python -m benchmarks.bench_timeline [--missions 200] [--scale 5]
+"""
+import argparse
+import time
+from pathlib import Path
+
+from pop_file_parser.models.mission_info import MissionInfo
+from pop_file_parser.timeline import TimelineSimulator
+from pop_file_parser.valve_parser import ValveFormat
+
+EXAMPLE = Path(__file__).resolve().parent.parent / "examples" / "expert_mission.pop"
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--missions", type=int, default=200, help="Количество миссий")
+    parser.add_argument("--scale", type=int, default=5, help="Множитель TotalCount")
+    args = parser.parse_args()
+
+    tree = ValveFormat().parse_file(str(EXAMPLE))
+    missions = []
+    for _ in range(args.missions):
+        info = MissionInfo.from_valve_format(tree["WaveSchedule"])
+        for wave in info.waves:
+            for spawn in wave.wave_spawns:
+                spawn.total_count *= args.scale
+        missions.append(info)
+    waves = sum(len(info.waves) for info in missions)
+
+    simulator = TimelineSimulator()
+    started = time.perf_counter()
+    timelines = [simulator.simulate_mission(info) for info in missions]
+    elapsed = time.perf_counter() - started
+    events = sum(len(timeline.times) for mission in timelines for timeline in mission)
+
+    print(f"Missions:     {args.missions}, waves: {waves}, alive changes: {events}")
+    print(f"Total:        {elapsed:.3f} s")
+    print(f"Per mission:  {elapsed / args.missions * 1000:.2f} ms")
+    print(f"Longest wave: {max(t.end or 0 for mission in timelines for t in mission):.0f} s simulated")
+
+
+if __name__ == "__main__":
+    main()
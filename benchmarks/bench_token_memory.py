@@ -0,0 +1,44 @@
+"""
+Сравнение памяти: List[Token] против компактного TokenBuffer.
+
+Запуск:
+    python -m benchmarks.bench_token_memory [--scale 200]
+"""
+import argparse
+import tracemalloc
+
+from benchmarks.bench_lexer import load_scaled_example
+from pop_file_parser.lexer import Lexer
+
+
+def measure(build) -> int:
+    """Возвращает объем памяти, удерживаемый результатом build(), в байтах."""
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=200, help="Во сколько раз увеличить пример")
+    args = parser.parse_args()
+
+    text = load_scaled_example(args.scale)
+    lexer = Lexer()
+
+    token_list = measure(lambda: lexer.tokenize(text))
+    buffer = measure(lambda: lexer.tokenize_compact(text))
+    count = len(lexer.tokenize_compact(text))
+
+    print(f"Tokens:       {count}")
+    print(f"List[Token]:  {token_list / 1024:.0f} KiB ({token_list / count:.0f} B/token)")
+    print(f"TokenBuffer:  {buffer / 1024:.0f} KiB ({buffer / count:.0f} B/token)")
+    print(f"Reduction:    {token_list / buffer:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Асинхронная обертка PopFileCompiler для загрузки и экспорта миссий
+без блокировки цикла событий.
+"""
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Optional, Union
+
+from .compiler import PopFileCompiler, parse_mission
+
+PathLike = Union[str, Path]
+
+DEFAULT_LIMIT = 8
+
+
+def _write_text(path: str, text: str) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+class AsyncPopFileCompiler:
+    """
+    Асинхронный фасад компилятора.
+
+    Чтение и запись файлов выполняются в пуле потоков цикла событий, разбор
+    и формирование текста - в executor (по умолчанию тот же пул потоков).
+    Для разбора можно передать ProcessPoolExecutor; текст экспорта строится
+    из состояния компилятора, поэтому в этом случае он формируется в пуле
+    потоков.
+
+    Одновременных операций не больше limit; чтобы ограничить несколько
+    фасадов вместе, передайте им общий asyncio.Semaphore в limiter.
+    Компилятор нельзя изменять, пока выполняется его load_async/export_async.
+    """
+
+    def __init__(self, compiler: Optional[PopFileCompiler] = None,
+                 executor: Optional[Executor] = None, limit: int = DEFAULT_LIMIT,
+                 limiter: Optional[asyncio.Semaphore] = None, comments: bool = True):
+        """
+        Args:
+            compiler: Оборачиваемый компилятор (по умолчанию новый)
+            executor: Пул для разбора и формирования текста
+                      (None - пул потоков цикла событий)
+            limit: Максимум одновременных операций
+            limiter: Общий ограничитель вместо собственного
+            comments: Сохранять комментарии при разборе
+        """
+        if limit < 1:
+            raise ValueError(f"limit must be positive, got {limit}")
+        self.compiler = compiler if compiler is not None else PopFileCompiler()
+        self.executor = executor
+        self.limit = limit
+        self.comments = comments
+        # Semaphore создается в работающем цикле: до Python 3.10 он
+        # привязывается к циклу при создании
+        self._limiter = limiter
+
+    @property
+    def limiter(self) -> asyncio.Semaphore:
+        """Ограничитель одновременных операций."""
+        if self._limiter is None:
+            self._limiter = asyncio.Semaphore(self.limit)
+        return self._limiter
+
+    @property
+    def _render_executor(self) -> Optional[Executor]:
+        if isinstance(self.executor, ProcessPoolExecutor):
+            return None
+        return self.executor
+
+    async def load_async(self, path: PathLike,
+                         sections: Optional[Iterable[str]] = None) -> PopFileCompiler:
+        """
+        Загружает миссию из файла (см. PopFileCompiler.load_file).
+
+        Args:
+            path: Путь к файлу
+            sections: Загружаемые блоки WaveSchedule (None - весь файл)
+
+        Returns:
+            Загруженный компилятор
+        """
+        loop = asyncio.get_running_loop()
+        async with self.limiter:
+            data = await loop.run_in_executor(None, Path(path).read_bytes)
+            if sections is not None:
+                sections = list(sections)
+            tree, verbatim = await loop.run_in_executor(
+                self.executor, parse_mission, data, sections, self.comments
+            )
+        self.compiler.load_tree(tree, verbatim)
+        return self.compiler
+
+    async def export_async(self, path: PathLike) -> None:
+        """Экспортирует миссию в файл (см. PopFileCompiler.export_to_file)."""
+        loop = asyncio.get_running_loop()
+        async with self.limiter:
+            text = await loop.run_in_executor(self._render_executor, self.compiler.render_export)
+            await loop.run_in_executor(None, _write_text, str(path), text)
+        self.compiler.mark_exported()
+
+
+async def load_many_async(paths: Iterable[PathLike], executor: Optional[Executor] = None,
+                          limit: int = DEFAULT_LIMIT, comments: bool = True) -> List[PopFileCompiler]:
+    """
+    Загружает несколько миссий одновременно, не больше limit за раз.
+
+    Returns:
+        Компиляторы в порядке paths
+    """
+    limiter = asyncio.Semaphore(limit)
+    facades = []
+    loads = []
+    for path in paths:
+        facade = AsyncPopFileCompiler(executor=executor, limiter=limiter, comments=comments)
+        facades.append(facade)
+        loads.append(facade.load_async(path))
+    await asyncio.gather(*loads)
+    return [facade.compiler for facade in facades]
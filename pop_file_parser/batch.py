@@ -0,0 +1,104 @@
+"""
+Пакетный разбор pop файлов в пуле процессов.
+"""
+import marshal
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .valve_parser import ValveFormat
+
+PathLike = Union[str, Path]
+
+
+@dataclass
+class LoadResult:
+    """
+    Результат разбора одного файла.
+
+    Дерево передается между процессами сериализованным через marshal
+    (payload): это компактнее и быстрее pickle для словарей и строк, а
+    декодируется оно только вызовом tree().
+    """
+    path: str
+    seconds: float
+    payload: Optional[bytes] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """Разобран ли файл без ошибок."""
+        return self.error is None
+
+    def tree(self) -> Dict[str, Any]:
+        """
+        Дерево разбора файла (декодируется при каждом вызове).
+
+        Raises:
+            ValueError: Файл не удалось разобрать
+        """
+        if self.payload is None:
+            raise ValueError(f"{self.path}: {self.error}")
+        return marshal.loads(self.payload)
+
+
+def load_file(path: PathLike, comments: bool = True, bases: bool = False,
+              search_path: Iterable[str] = ()) -> LoadResult:
+    """
+    Разбирает один файл и замеряет время разбора.
+
+    Ошибки разбора и чтения не выбрасываются, а сохраняются в
+    LoadResult.error, чтобы один плохой файл не прерывал пакет.
+    """
+    started = time.perf_counter()
+    parser = ValveFormat()
+    try:
+        if bases:
+            tree = parser.parse_file_with_bases(str(path), tuple(search_path), comments=comments)
+        else:
+            tree = parser.parse_file(str(path), comments=comments)
+        payload = marshal.dumps(tree)
+    except Exception as e:
+        return LoadResult(str(path), time.perf_counter() - started, error=f"{type(e).__name__}: {e}")
+    return LoadResult(str(path), time.perf_counter() - started, payload=payload)
+
+
+def load_many(paths: Iterable[PathLike], workers: Optional[int] = None,
+              comments: bool = True, bases: bool = False,
+              search_path: Iterable[str] = (), chunksize: Optional[int] = None) -> List[LoadResult]:
+    """
+    Разбирает файлы в пуле процессов.
+
+    Args:
+        paths: Пути к файлам
+        workers: Количество процессов (по умолчанию по числу процессоров);
+                 1 - разбор в текущем процессе без пула
+        comments: Сохранять комментарии в ключах "__comment" блоков
+        bases: Подключать директивы #base (parse_file_with_bases)
+        search_path: Дополнительные каталоги поиска #base файлов
+        chunksize: Количество файлов в одной задаче пула (по умолчанию
+                   около четырех задач на процесс)
+
+    Returns:
+        Результаты в порядке paths
+    """
+    paths = [str(path) for path in paths]
+    load = partial(load_file, comments=comments, bases=bases, search_path=tuple(search_path))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(paths))
+    if workers <= 1:
+        return [load(path) for path in paths]
+    if chunksize is None:
+        chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(load, paths, chunksize=chunksize))
+
+
+def find_mission_files(directory: PathLike, pattern: str = "*.pop") -> List[Path]:
+    """Файлы каталога по шаблону имени, отсортированные по пути."""
+    return sorted(path for path in Path(directory).glob(pattern) if path.is_file())
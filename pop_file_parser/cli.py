@@ -2,11 +2,14 @@
 Интерфейс командной строки для работы с компилятором.
 """
 import sys
+import time
 import click
 from pathlib import Path
 from rich.console import Console
 from rich.table import Table
+from .batch import find_mission_files, load_many
 from .compiler import PopFileCompiler
+from .economy import analyze_directory, economy_json
 
 console = Console()
 
@@ -145,6 +148,84 @@ def export(input_path, output_path):
         console.print(f"[red]Error:[/red] {str(e)}")
         sys.exit(1)
 
+@cli.command()
+@click.argument('directory', type=click.Path(exists=True, file_okay=False))
+@click.option('--workers', type=int, default=None, help='Количество процессов (по умолчанию по числу CPU)')
+@click.option('--pattern', default='*.pop', show_default=True, help='Шаблон имен файлов')
+@click.option('--bases/--no-bases', default=False, help='Подключать директивы #base')
+def batch(directory, workers, pattern, bases):
+    """Разобрать все pop файлы каталога в пуле процессов."""
+    paths = find_mission_files(directory, pattern)
+    if not paths:
+        console.print(f"[yellow]No files matching {pattern} in {directory}[/yellow]")
+        return
+        
+    started = time.perf_counter()
+    results = load_many(paths, workers=workers, bases=bases)
+    elapsed = time.perf_counter() - started
+    
+    table = Table(title=f"Directory: {directory}")
+    table.add_column("File", style="cyan")
+    table.add_column("Waves", justify="right", style="green")
+    table.add_column("Time, ms", justify="right", style="yellow")
+    table.add_column("Status")
+    
+    failed = 0
+    for result in results:
+        name = str(Path(result.path).relative_to(directory))
+        if result.ok:
+            waves = result.tree().get("WaveSchedule", {}).get("Wave", [])
+            count = len(waves) if isinstance(waves, list) else 1
+            table.add_row(name, str(count), f"{result.seconds * 1000:.1f}", "[green]OK[/green]")
+        else:
+            failed += 1
+            table.add_row(name, "-", f"{result.seconds * 1000:.1f}", f"[red]{result.error}[/red]")
+            
+    console.print(table)
+    parse_time = sum(result.seconds for result in results)
+    console.print(
+        f"{len(results)} files, {failed} failed; parse time {parse_time:.2f} s, "
+        f"wall time {elapsed:.2f} s"
+    )
+    if failed:
+        sys.exit(1)
+
+@cli.command()
+@click.argument('directory', type=click.Path(exists=True, file_okay=False))
+@click.option('--workers', type=int, default=None, help='Количество процессов (по умолчанию по числу CPU)')
+@click.option('--pattern', default='*.pop', show_default=True, help='Шаблон имен файлов')
+@click.option('--bases/--no-bases', default=False, help='Подключать директивы #base')
+@click.option('--json', 'as_json', is_flag=True, help='Вывести JSON вместо таблицы')
+def economy(directory, workers, pattern, bases, as_json):
+    """Кредиты по волнам для всех pop файлов каталога."""
+    economies = analyze_directory(directory, pattern, workers=workers, bases=bases)
+    if as_json:
+        click.echo(economy_json(economies))
+    else:
+        table = Table(title=f"Economy: {directory}")
+        table.add_column("File", style="cyan")
+        table.add_column("Wave", justify="right")
+        table.add_column("Currency", justify="right", style="green")
+        table.add_column("Delta", justify="right")
+        table.add_column("Available", justify="right", style="yellow")
+        table.add_column("Cumulative", justify="right", style="yellow")
+        table.add_column("Per robot", justify="right")
+        
+        for mission in economies:
+            name = str(Path(mission.path).relative_to(directory))
+            if mission.error:
+                table.add_row(name, "-", "-", "-", "-", "-", f"[red]{mission.error}[/red]")
+                continue
+            for wave in mission.waves:
+                table.add_row(
+                    name, str(wave.wave), str(wave.currency), f"{wave.delta:+d}",
+                    str(wave.available), str(wave.cumulative), f"{wave.per_robot:.1f}"
+                )
+                
+        console.print(table)
+    if any(mission.error for mission in economies):
+        sys.exit(1)
+
 def main():
     """Точка входа для CLI."""
     cli()
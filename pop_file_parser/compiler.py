@@ -2,9 +2,11 @@
 Основной модуль компилятора pop файлов.
 """
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union, Any
 import logging
+import re
 from .valve_parser import ValveFormat
+from .valve_scanner import Buffer
 from .models.wave import Wave
 from .models.wave_spawn import WaveSpawn
 from .models.tf_bot import TFBot
@@ -14,6 +16,46 @@ logger = logging.getLogger(__name__)
 from .models.mission import Mission
 from .models.template import TemplateManager, Template
 
+# Пропущенная при выборочной загрузке секция: (селектор, исходный текст)
+VerbatimBlock = Tuple[str, str]
+
+_WAVE_SELECTOR_RE = re.compile(r'Wave\[(\d+)\]$')
+
+
+def _as_list(value: Any) -> List[Any]:
+    """Значение дерева разбора списком (один блок - список из одного)."""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def parse_mission(data: Buffer, sections: Optional[Iterable[str]] = None,
+                  comments: bool = True, encoding: str = 'utf-8'
+                  ) -> Tuple[Dict[str, Any], List[VerbatimBlock]]:
+    """
+    Разбирает содержимое pop файла для PopFileCompiler.load_tree.
+    
+    Без sections файл разбирается целиком. С sections строятся только
+    выбранные блоки WaveSchedule (см. ValveFormat.parse_sections), а
+    текст остальных возвращается для записи без изменений. Функция уровня
+    модуля, чтобы разбор можно было передать в ProcessPoolExecutor.
+    
+    Returns:
+        Дерево разбора и пропущенные секции (селектор, исходный текст)
+    """
+    parser = ValveFormat()
+    if sections is None:
+        return parser.parse_buffer(data, encoding, comments=comments), []
+    tree, skipped = parser.parse_sections(data, sections, encoding, comments=comments)
+    verbatim = []
+    for selector, start, end in skipped:
+        block = data[start:end]
+        if not isinstance(block, str):
+            block = bytes(block).decode(encoding)
+        verbatim.append((selector, block))
+    return tree, verbatim
+
+
 class PopFileCompiler:
     """Компилятор pop файлов для MvM режима Team Fortress 2."""
     def __init__(self):
@@ -24,6 +66,16 @@ class PopFileCompiler:
         self.missions: List[Mission] = []  # Список поддерживающих миссий
         self.template_manager = TemplateManager()  # Менеджер шаблонов
         self.comments: Dict[str, str] = {}  # Комментарии для блоков
+        # Строки последнего экспорта по id модели: (модель, строки)
+        self._rendered: Dict[Tuple[str, int], Tuple[Any, List[str]]] = {}
+        # Исходные словари загруженных моделей по id: (модель, словарь)
+        self._sources: Dict[Tuple[str, int], Tuple[Any, Dict[str, Any]]] = {}
+        # Позиция волн среди ключей WaveSchedule (None - в конце)
+        self._wave_slot: Optional[int] = None
+        # Пропущенные при выборочной загрузке волны: (следующая загруженная
+        # волна или None, строки) и остальные пропущенные блоки
+        self._raw_waves: List[Tuple[Optional[Wave], List[str]]] = []
+        self._raw_blocks: List[List[str]] = []
         
     def add_robot(self, wave_id: int, robot_config: dict) -> None:
         """Добавляет нового робота в волну."""
@@ -37,6 +89,82 @@ class PopFileCompiler:
         robot = TFBot.from_valve_format(robot_config)
         wave.wave_spawns[0].squad.append(robot)
 
+    def load_file(self, file_path: Union[str, Path],
+                  sections: Optional[Iterable[str]] = None) -> None:
+        """
+        Загружает миссию из .pop файла.
+        
+        Args:
+            file_path: Путь к файлу
+            sections: Загружаемые блоки WaveSchedule ("Wave[2]", "Templates",
+                      см. ValveFormat.parse_sections); остальные блоки
+                      экспортируются в исходном виде. None - весь файл.
+        """
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        self.load_tree(*parse_mission(data, sections))
+        
+    def load_tree(self, tree: Dict[str, Any], verbatim: Iterable[VerbatimBlock] = ()) -> None:
+        """
+        Загружает миссию из дерева разбора ValveFormat.
+        
+        Волны WaveSchedule становятся моделями в self.waves, остальное
+        дерево сохраняется в self.mission; директивы #base переносятся в
+        self.base_files. Модели помнят свои исходные словари: пока волна,
+        WaveSpawn или Tank не изменены, экспорт выводит исходный словарь,
+        так что ключи, которых нет в моделях, не теряются.
+        
+        Args:
+            tree: Результат ValveFormat.parse_file / parse_buffer
+            verbatim: Пропущенные секции из parse_mission; волны выводятся
+                      на своих местах среди загруженных, остальные блоки -
+                      в конце WaveSchedule
+        """
+        mission = dict(tree)
+        self.base_files = list(mission.pop("__base_files", []))
+        schedule = mission.get("WaveSchedule")
+        schedule = dict(schedule) if isinstance(schedule, dict) else {}
+        waves = _as_list(schedule.get("Wave"))
+        self._wave_slot = None
+        if waves and all(isinstance(data, dict) for data in waves):
+            self._wave_slot = list(schedule).index("Wave")
+            del schedule["Wave"]
+        else:
+            waves = []
+        mission["WaveSchedule"] = schedule
+        self.mission = mission
+        self._rendered = {}
+        self._sources = {}
+        self.waves = [self._load_wave(data) for data in waves]
+        
+        self._raw_waves = []
+        self._raw_blocks = []
+        skipped_waves = []
+        for selector, text in verbatim:
+            match = _WAVE_SELECTOR_RE.match(selector)
+            if match:
+                skipped_waves.append((int(match.group(1)), text.splitlines()))
+            else:
+                self._raw_blocks.append(text.splitlines())
+        # Загруженные волны занимают непропущенные номера по порядку
+        skipped_numbers = {number for number, _ in skipped_waves}
+        numbers = (n for n in range(len(waves) + len(skipped_waves)) if n not in skipped_numbers)
+        loaded = list(zip(numbers, self.waves))
+        for number, lines in sorted(skipped_waves, key=lambda item: item[0]):
+            anchor = next((wave for index, wave in loaded if index > number), None)
+            self._raw_waves.append((anchor, lines))
+            
+    def _load_wave(self, data: Dict[str, Any]) -> Wave:
+        """Создает сохраненную волну и запоминает исходные словари ее частей."""
+        wave = Wave.from_valve_format(data)
+        self._sources["Wave", id(wave)] = (wave, data)
+        for spawn, spawn_data in zip(wave.wave_spawns, _as_list(data.get("WaveSpawn"))):
+            self._sources["WaveSpawn", id(spawn)] = (spawn, spawn_data)
+        for tank, tank_data in zip(wave.tanks, _as_list(data.get("Tank"))):
+            self._sources["Tank", id(tank)] = (tank, tank_data)
+        wave.mark_clean()
+        return wave
+        
     def export_to_file(self, file_path: Union[str, Path]) -> None:
         """
         Экспортирует миссию в .pop файл.
@@ -45,29 +173,181 @@ class PopFileCompiler:
             file_path: Путь для сохранения файла
         """
         parser = ValveFormat()
+        with open(file_path, 'w', encoding='utf-8') as f:
+            # Строки пишутся по мере формирования, без сборки всего текста
+            parser.write_lines(self._iter_export_lines(parser), f)
+        self.mark_exported()
+        
+    def render_export(self) -> str:
+        """
+        Возвращает текст экспорта, не записывая его в файл.
+        
+        После успешной записи текста нужно вызвать mark_exported().
+        """
+        parser = ValveFormat()
+        return "\n".join(self._iter_export_lines(parser))
+        
+    def mark_exported(self) -> None:
+        """Помечает волны сохраненными: следующий экспорт перерисует только измененные."""
+        for wave in self.waves:
+            wave.mark_clean()
+            
+    def _iter_export_lines(self, parser: ValveFormat) -> Iterator[str]:
+        """Строки экспорта: директивы #base, затем миссия."""
         output = self.mission
 
-        # Добавляем уникальные base директивы если они есть
-        if self.base_files:
-            unique_bases = list(dict.fromkeys(self.base_files))
-            output["__base_files"] = unique_bases
-
         # Добавляем миссии и шаблоны в основную структуру
         wave_schedule = output.get("WaveSchedule", {})
         wave_schedule.update(self._compile_missions())
         wave_schedule.update(self._compile_templates())
         output["WaveSchedule"] = wave_schedule
 
-        with open(file_path, 'w', encoding='utf-8') as f:
-            # Сначала #base директивы
-            if "__base_files" in output:
-                for base_file in output["__base_files"]:
-                    f.write(f'#base {base_file}\n')
-                f.write('\n')
-                del output["__base_files"]
+        # Сначала уникальные #base директивы
+        if self.base_files:
+            for base_file in dict.fromkeys(self.base_files):
+                yield f'#base {base_file}'
+            yield ''
+
+        yield from self._iter_mission_lines(parser, output)
 
-            # Затем основное содержимое
-            f.write(parser.dump(output))
+    def _iter_mission_lines(self, parser: ValveFormat, output: Dict[str, Any]) -> Iterator[str]:
+        """
+        Строки миссии; волны из self.waves выводятся на месте ключа Wave
+        загруженного WaveSchedule (или в конце WaveSchedule).
+        
+        Волны, WaveSpawn и Tank без изменений с прошлого экспорта берутся
+        из строк, сохраненных тогда, остальные перерисовываются.
+        """
+        if not (self.waves or self._raw_waves or self._raw_blocks):
+            yield from parser.iter_dump(output)
+            return
+            
+        rendered = self._rendered
+        self._rendered = {}
+        emitter = parser.emitter
+        wave_schedule = output.get("WaveSchedule")
+        if not isinstance(wave_schedule, dict):
+            output = dict(output, WaveSchedule={})
+            
+        for key, value in output.items():
+            if key != "WaveSchedule":
+                yield from parser.iter_dump({key: value})
+                continue
+            yield emitter.headers[0, key]
+            yield emitter.opens[0]
+            items = list(value.items())
+            slot = len(items) if self._wave_slot is None else min(self._wave_slot, len(items))
+            empty = True
+            for line in parser.iter_dump(dict(items[:slot]), 1):
+                empty = False
+                yield line
+            for line in self._iter_wave_lines(parser, rendered):
+                empty = False
+                yield line
+            for line in parser.iter_dump(dict(items[slot:]), 1):
+                empty = False
+                yield line
+            for lines in self._raw_blocks:
+                empty = False
+                yield from self._raw_lines(parser, lines)
+            if empty:
+                yield ""
+            yield emitter.closes[0]
+            
+    def _iter_wave_lines(self, parser: ValveFormat,
+                         rendered: Dict[Tuple[str, int], Tuple[Any, List[str]]]) -> Iterator[str]:
+        """Строки волн; пропущенные при загрузке волны - перед следующей загруженной."""
+        present = {id(wave) for wave in self.waves}
+        before: Dict[int, List[List[str]]] = {}
+        tail = []
+        for anchor, lines in self._raw_waves:
+            if anchor is not None and id(anchor) in present:
+                before.setdefault(id(anchor), []).append(lines)
+            else:
+                tail.append(lines)
+        for wave in self.waves:
+            for lines in before.pop(id(wave), ()):
+                yield from self._raw_lines(parser, lines)
+            yield from self._wave_lines(parser, wave, rendered)
+        for lines in tail:
+            yield from self._raw_lines(parser, lines)
+            
+    def _raw_lines(self, parser: ValveFormat, lines: List[str]) -> Iterator[str]:
+        """Исходный текст пропущенного блока; первая строка получает отступ уровня 1."""
+        if lines:
+            yield parser.emitter.pads[1] + lines[0]
+            yield from lines[1:]
+            
+    def _wave_lines(self, parser: ValveFormat, wave: Wave,
+                    rendered: Dict[Tuple[str, int], Tuple[Any, List[str]]]) -> List[str]:
+        """Строки блока Wave; неизмененные части берутся из rendered."""
+        emitter = parser.emitter
+        
+        def cached(tag: str, model: Any, dirty: bool) -> Optional[List[str]]:
+            entry = rendered.get((tag, id(model)))
+            if entry is None or entry[0] is not model or dirty:
+                return None
+            self._rendered[tag, id(model)] = entry
+            return entry[1]
+            
+        def store(tag: str, model: Any, lines: List[str]) -> List[str]:
+            self._rendered[tag, id(model)] = (model, lines)
+            return lines
+            
+        def source(tag: str, model: Any, dirty: bool) -> Optional[Dict[str, Any]]:
+            # Исходный словарь загруженной модели, пока она не изменена
+            entry = self._sources.get((tag, id(model)))
+            if entry is None or entry[0] is not model:
+                return None
+            if dirty:
+                del self._sources[tag, id(model)]
+                return None
+            return entry[1]
+            
+        lines = cached("Wave", wave, wave.is_dirty)
+        if lines is not None:
+            # Сохраняем и строки частей волны для следующих экспортов
+            for tag, model in self._wave_parts(wave):
+                cached(tag, model, False)
+            cached("WaveParams", wave, False)
+            return lines
+            
+        if not wave.is_dirty:
+            data = source("Wave", wave, False)
+            if data is not None:
+                return store("Wave", wave, list(parser.iter_dump({"Wave": data}, 1)))
+                
+        own = wave.own_valve_format()
+        if "WaveSpawn" in own or "Tank" in own:
+            # Пользовательские блоки с теми же именами: рисуем волну целиком
+            return store("Wave", wave, list(parser.iter_dump({"Wave": wave.to_valve_format()}, 1)))
+            
+        body = cached("WaveParams", wave, wave.is_self_dirty)
+        if body is None:
+            data = source("Wave", wave, wave.is_self_dirty)
+            if data is not None:
+                own = {key: value for key, value in data.items() if key not in ("WaveSpawn", "Tank")}
+            body = store("WaveParams", wave, list(parser.iter_dump(own, 2)))
+        body = list(body)
+        for tag, model in self._wave_parts(wave):
+            part = cached(tag, model, model.is_dirty)
+            if part is None:
+                data = source(tag, model, model.is_dirty)
+                if data is None:
+                    data = model.to_valve_format()
+                part = store(tag, model, list(parser.iter_dump({tag: data}, 2)))
+            body.extend(part)
+            
+        # Пустой блок выводится с пустой строкой, как в dump()
+        lines = [emitter.headers[1, "Wave"], emitter.opens[1], *(body or [""]), emitter.closes[1]]
+        return store("Wave", wave, lines)
+        
+    def _wave_parts(self, wave: Wave) -> Iterator[Tuple[str, Any]]:
+        """WaveSpawn и Tank волны в порядке вывода."""
+        for spawn in wave.wave_spawns:
+            yield "WaveSpawn", spawn
+        for tank in wave.tanks:
+            yield "Tank", tank
 
     def get_wave(self, wave_id: int) -> Optional[Wave]:
         """Возвращает объект волны по номеру (1-индексация)."""
@@ -99,6 +379,7 @@ class PopFileCompiler:
                     setattr(robot, key, value)
                 else:
                     robot.attributes[key] = value
+                    robot.mark_dirty()
         else:
             raise IndexError(f"Robot index {robot_index} out of range for wave {wave_id}")
 
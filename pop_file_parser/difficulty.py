@@ -0,0 +1,203 @@
+"""
+Оценка сложности волн по роботам, танкам и числу одновременно живых
+роботов.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from .models.mission_info import MissionInfo
+from .models.tank import Tank
+from .models.template import TemplateManager
+from .models.tf_bot import TFBot
+from .models.wave import Wave
+from .models.wave_spawn import WaveSpawn
+from .monte_carlo import CLASS_HEALTH
+from .timeline import ROBOT_LIMIT, TimelineSimulator
+
+SKILL_FACTORS = {"easy": 0.75, "normal": 1.0, "hard": 1.25, "expert": 1.5}
+
+# Множители урона и скорости из CharacterAttributes. Атрибуты скорострельности
+# задают интервал между выстрелами, поэтому урон делится на их значение
+DAMAGE_ATTRIBUTES = ("damage bonus", "damage penalty")
+FIRE_RATE_ATTRIBUTES = ("fire rate bonus", "fire rate penalty")
+SPEED_ATTRIBUTES = ("move speed bonus", "move speed penalty")
+HEALTH_ATTRIBUTE = "max health additive bonus"
+
+CRIT_FACTOR = 3.0       # AlwaysCrit: криты утраивают урон
+GIANT_FACTOR = 1.5      # MiniBoss: сопротивление отбрасыванию и т.п.
+SCALE_EXPONENT = 0.5    # вклад Scale (размер и дальность досягаемости)
+TANK_FACTOR = 0.25      # танк не атакует, но требует урона
+TANK_SPEED = 75
+
+
+@dataclass
+class WaveDifficulty:
+    """Сложность волны."""
+    wave: int                   # номер волны, с 1
+    score: float                # итоговая оценка
+    robots: float               # сумма оценок роботов без учета одновременности
+    peak: int                   # наибольшее число одновременно живых роботов
+    spawns: List[float] = field(default_factory=list)  # оценки WaveSpawn
+
+
+def _attribute(attributes: Dict[str, Any], name: str, default: float = 1.0) -> float:
+    for key, value in attributes.items():
+        if key.lower() == name:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return default
+    return default
+
+
+class DifficultyEstimator:
+    """
+    Оценка сложности волн.
+
+    Оценка робота - эвристика: здоровье / 100 с множителями навыка
+    (Skill), урона, скорострельности и скорости из CharacterAttributes,
+    AlwaysCrit, MiniBoss и Scale. Оценка волны - сумма оценок роботов
+    WaveSpawn, умноженная на 1 + peak / RobotLimit, где peak - наибольшее
+    число одновременно живых роботов по TimelineSimulator.
+
+    Оценки роботов кэшируются (LRU на max_entries роботов) по ключу
+    текущего содержимого модели (content_key) и ключу раскрытого шаблона,
+    поэтому правки на месте (Item, CharacterAttributes) тоже учитываются.
+    Повторная оценка миссии после правки одного робота заново оценивает
+    только его. Наибольшее число
+    живых роботов волны кэшируется по параметрам ее WaveSpawn.
+    """
+
+    def __init__(self, templates: Optional[TemplateManager] = None,
+                 simulator: Optional[TimelineSimulator] = None, max_entries: int = 4096):
+        """
+        Args:
+            templates: Шаблоны для раскрытия роботов с Template
+            simulator: Моделирование волн для оценки одновременности
+            max_entries: Размер кэшей оценок роботов и волн
+        """
+        self.templates = templates
+        self.simulator = simulator if simulator is not None else TimelineSimulator()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._scores: 'OrderedDict[Hashable, float]' = OrderedDict()
+        self._peaks: 'OrderedDict[Hashable, int]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def clear(self) -> None:
+        """Очищает кэши оценок."""
+        self._scores.clear()
+        self._peaks.clear()
+
+    def _key(self, robot: Any) -> Hashable:
+        key: Tuple[Any, ...] = (type(robot).__name__, robot.content_key())
+        if self.templates is not None and isinstance(robot, TFBot) and robot.template:
+            # Раскрытый шаблон - общий объект резолвера (см. TemplateResolver.invalidate)
+            key += (self.templates.resolve(robot.template).content_key(),)
+        return key
+
+    def bot_score(self, robot: Any) -> float:
+        """Оценка TFBot или Tank (из кэша, если такой робот уже оценивался)."""
+        key = self._key(robot)
+        score = self._scores.get(key)
+        if score is not None:
+            self.hits += 1
+            self._scores.move_to_end(key)
+            return score
+        self.misses += 1
+        if isinstance(robot, Tank):
+            score = self._tank_score(robot)
+        else:
+            if self.templates is not None and robot.template:
+                robot = self.templates.resolve_bot(robot)
+            score = self._tfbot_score(robot)
+        self._scores[key] = score
+        if len(self._scores) > self.max_entries:
+            self._scores.popitem(last=False)
+        return score
+
+    def _tfbot_score(self, bot: TFBot) -> float:
+        attributes = bot.character_attributes or {}
+        health = float(bot.health) if bot.health else CLASS_HEALTH.get(bot.class_name.lower(), 0)
+        health += _attribute(attributes, HEALTH_ATTRIBUTE, 0.0)
+
+        factor = SKILL_FACTORS.get(str(bot.skill).lower(), 1.0)
+        for name in DAMAGE_ATTRIBUTES:
+            factor *= _attribute(attributes, name)
+        for name in FIRE_RATE_ATTRIBUTES:
+            rate = _attribute(attributes, name)
+            if rate > 0:
+                factor /= rate
+        for name in SPEED_ATTRIBUTES:
+            factor *= _attribute(attributes, name)
+
+        flags = {attribute.lower() for attribute in bot.attributes}
+        if "alwayscrit" in flags:
+            factor *= CRIT_FACTOR
+        if "miniboss" in flags:
+            factor *= GIANT_FACTOR
+        if bot.scale > 0:
+            factor *= bot.scale ** SCALE_EXPONENT
+        return max(health, 0.0) / 100 * factor
+
+    def _tank_score(self, tank: Tank) -> float:
+        return tank.health / 100 * (tank.speed / TANK_SPEED) * TANK_FACTOR
+
+    def score_wave(self, wave: Wave, number: int = 1) -> WaveDifficulty:
+        """Оценка одной волны."""
+        return self._score_wave(wave, number, self.simulator)
+
+    def score_mission(self, mission: MissionInfo) -> List[WaveDifficulty]:
+        """Оценки всех волн миссии с ее RobotLimit."""
+        simulator = self.simulator
+        if simulator.robot_limit != mission.robot_limit:
+            simulator = TimelineSimulator(mission.robot_limit, simulator.lifetime,
+                                          simulator.tank_lifetime, simulator.horizon)
+        return [self._score_wave(wave, number, simulator) for number, wave in enumerate(mission.waves, 1)]
+
+    def _score_wave(self, wave: Wave, number: int, simulator: TimelineSimulator) -> WaveDifficulty:
+        spawns = []
+        for spawn in wave.wave_spawns:
+            if not spawn.squad:
+                spawns.append(0.0)
+                continue
+            scores = [self.bot_score(robot) for robot in spawn.squad]
+            # RandomChoice и Squad по кругу дают в среднем одну и ту же оценку
+            average = sum(scores) / len(scores)
+            if spawn.support and not spawn.support_limited:
+                # Бесконечная поддержка: учитываем одновременно живых
+                count = spawn.max_active or spawn.spawn_count or 1
+            else:
+                count = spawn.total_count
+            spawns.append(average * count)
+
+        robots = sum(spawns)
+        peak = self._peak(wave, simulator)
+        limit = simulator.robot_limit or ROBOT_LIMIT
+        return WaveDifficulty(number, robots * (1 + peak / limit), robots, peak, spawns)
+
+    def _peak(self, wave: Wave, simulator: TimelineSimulator) -> int:
+        """Наибольшее число живых роботов волны (из кэша по параметрам спавна)."""
+        key = (simulator.robot_limit, simulator.lifetime, simulator.tank_lifetime, simulator.horizon,
+               tuple(_schedule_key(spawn) for spawn in wave.wave_spawns))
+        peak = self._peaks.get(key)
+        if peak is None:
+            peak = self._peaks[key] = simulator.simulate(wave).peak
+            if len(self._peaks) > self.max_entries:
+                self._peaks.popitem(last=False)
+        else:
+            self._peaks.move_to_end(key)
+        return peak
+
+
+def _schedule_key(spawn: WaveSpawn) -> Tuple[Any, ...]:
+    """Параметры WaveSpawn, от которых зависит моделирование волны."""
+    squad = spawn.squad
+    return (spawn.name, spawn.total_count, spawn.max_active, spawn.spawn_count,
+            spawn.support, spawn.support_limited, spawn.wait_for_all_spawned,
+            spawn.wait_for_all_dead, spawn.wait_between_spawns, spawn.wait_before_starting,
+            len(squad), any(isinstance(robot, Tank) for robot in squad))
@@ -0,0 +1,138 @@
+"""
+Анализ экономики миссий: кредиты по волнам, накопленные кредиты и
+кредиты за робота.
+"""
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .batch import find_mission_files, load_many
+from .models.mission_info import MissionInfo
+
+PathLike = Union[str, Path]
+
+
+@dataclass
+class WaveEconomy:
+    """Кредиты одной волны."""
+    wave: int               # номер волны, с 1
+    currency: int           # кредиты, выпадающие за волну
+    robots: int             # роботы, с которых выпадают кредиты
+    available: int          # кредиты на начало волны
+    cumulative: int         # кредиты после волны
+    delta: int              # изменение currency относительно предыдущей волны
+    support_currency: int = 0  # TotalCurrency поддержки, не учтенный в currency
+
+    @property
+    def per_robot(self) -> float:
+        """Средние кредиты за робота."""
+        return self.currency / self.robots if self.robots else 0.0
+
+
+@dataclass
+class MissionEconomy:
+    """Экономика миссии."""
+    path: str
+    starting_currency: int = 0
+    waves: List[WaveEconomy] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def total_currency(self) -> int:
+        """Кредиты за все волны, без StartingCurrency."""
+        return sum(wave.currency for wave in self.waves)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Строки таблицы: по одной на волну."""
+        rows = []
+        for wave in self.waves:
+            row = {"path": self.path}
+            row.update(asdict(wave))
+            row["per_robot"] = round(wave.per_robot, 2)
+            rows.append(row)
+        return rows
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Словарь для JSON."""
+        return {
+            "path": self.path,
+            "starting_currency": self.starting_currency,
+            "total_currency": self.total_currency,
+            "waves": [{key: value for key, value in row.items() if key != "path"} for row in self.rows()],
+            "error": self.error,
+        }
+
+
+def analyze_mission(info: MissionInfo, path: str = "") -> MissionEconomy:
+    """
+    Считает кредиты по волнам миссии.
+
+    Кредиты волны - сумма TotalCurrency ее WaveSpawn. Поддержка (Support 1 и
+    Support Limited) кредитов не приносит: ее TotalCurrency учитывается
+    отдельно в support_currency.
+    """
+    economy = MissionEconomy(path, info.starting_currency)
+    available = info.starting_currency
+    previous = 0
+    for number, wave in enumerate(info.waves, 1):
+        currency = robots = support_currency = 0
+        for spawn in wave.wave_spawns:
+            if spawn.support:
+                support_currency += spawn.total_currency
+            else:
+                currency += spawn.total_currency
+                robots += spawn.total_count
+        economy.waves.append(WaveEconomy(
+            wave=number,
+            currency=currency,
+            robots=robots,
+            available=available,
+            cumulative=available + currency,
+            delta=currency - previous,
+            support_currency=support_currency,
+        ))
+        available += currency
+        previous = currency
+    return economy
+
+
+def analyze_tree(tree: Dict[str, Any], path: str = "") -> MissionEconomy:
+    """Экономика миссии по дереву разбора ValveFormat."""
+    # Роботы для подсчета кредитов не нужны: волны создаются ленивыми
+    info = MissionInfo.from_valve_format(tree.get("WaveSchedule", {}), lazy=True)
+    return analyze_mission(info, path)
+
+
+def analyze_files(paths: Iterable[PathLike], workers: Optional[int] = None,
+                  bases: bool = False) -> List[MissionEconomy]:
+    """
+    Экономика миссий из файлов; разбор выполняется в пуле процессов
+    (см. batch.load_many). Ошибки сохраняются в MissionEconomy.error.
+    """
+    economies = []
+    for result in load_many(paths, workers=workers, comments=False, bases=bases):
+        if not result.ok:
+            economies.append(MissionEconomy(result.path, error=result.error))
+            continue
+        try:
+            economies.append(analyze_tree(result.tree(), result.path))
+        except (ValueError, TypeError, KeyError) as e:
+            economies.append(MissionEconomy(result.path, error=f"{type(e).__name__}: {e}"))
+    return economies
+
+
+def analyze_directory(directory: PathLike, pattern: str = "*.pop", workers: Optional[int] = None,
+                      bases: bool = False) -> List[MissionEconomy]:
+    """Экономика всех миссий каталога."""
+    return analyze_files(find_mission_files(directory, pattern), workers=workers, bases=bases)
+
+
+def economy_rows(economies: Iterable[MissionEconomy]) -> List[Dict[str, Any]]:
+    """Плоская таблица волн всех миссий."""
+    return [row for economy in economies for row in economy.rows()]
+
+
+def economy_json(economies: Iterable[MissionEconomy], indent: Optional[int] = 2) -> str:
+    """JSON с экономикой миссий."""
+    return json.dumps([economy.to_dict() for economy in economies], indent=indent, ensure_ascii=False)
@@ -1,8 +1,48 @@
 """
 Лексический анализатор для pop файлов.
 """
+import re
+from array import array
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, Iterator, List, Optional, Tuple
+from .string_table import STRINGS
+
+# Регулярные выражения однопроходного сканера
+_SKIP_RE = re.compile(r'\s*(?://[^\n]*\s*)*')
+# Основное выражение распознает типичный токен целиком вместе с пропуском
+# пробелов и комментариев перед ним. Все прочее (незакрытые строки, символы
+# вне ASCII, ошибки) разбирается веткой посимвольной точности.
+_TOKEN_RE = re.compile(
+    r'\s*(?://[^\n]*(?![^\n])\s*)*'
+    r'(?:(?P<STRING>"(?:[^"\\]|\\.)*")'
+    r'|(?P<IDENTIFIER>[A-Za-z_]\w*)'
+    r'|(?P<INTEGER>[0-9]+)(?![0-9.]|[^\x00-\x7f])'
+    r'|(?P<FLOAT>[0-9][0-9.]*)(?![0-9.]|[^\x00-\x7f])'
+    r'|(?P<LBRACE>\{)|(?P<RBRACE>\})'
+    r'|(?P<LBRACKET>\[)|(?P<RBRACKET>\]))',
+    re.DOTALL
+)
+_STRING_RE = re.compile(r'"((?:[^"\\]|\\.)*)("?)', re.DOTALL)
+_NUMBER_RE = re.compile(r'[0-9][0-9.]*')
+_WORD_RE = re.compile(r'\w+')
+_ESCAPE_RE = re.compile(r'\\(.)', re.DOTALL)
+_ESCAPES = {'n': '\n', 't': '\t'}
+_PUNCTUATION = {
+    '{': 'LBRACE',
+    '}': 'RBRACE',
+    '[': 'LBRACKET',
+    ']': 'RBRACKET',
+}
+
+# Коды типов токенов для компактного буфера
+TOKEN_TYPES = (
+    'STRING', 'INTEGER', 'FLOAT', 'IDENTIFIER',
+    'LBRACE', 'RBRACE', 'LBRACKET', 'RBRACKET', 'EOF'
+)
+_TYPE_CODES = {kind: code for code, kind in enumerate(TOKEN_TYPES)}
+
+# Сырой токен сканера: (тип, начало значения, конец значения, строка, столбец)
+RawToken = Tuple[str, int, int, int, int]
 
 @dataclass
 class Token:
@@ -12,6 +52,108 @@ class Token:
     line: int
     column: int
 
+class TokenBuffer:
+    """
+    Компактное хранилище токенов на массивах.
+    
+    Вместо объекта Token на каждый токен хранятся код типа (array('B')),
+    смещения начала и конца значения и номер строки (array('I')). Значения
+    вырезаются из исходного текста и объекты Token создаются только при
+    обращении по индексу.
+    """
+    
+    def __init__(self, text: str):
+        self.text = text
+        self.types = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.lines = array('I')
+        
+        for kind, start, end, line, column in scan(text):
+            self.types.append(_TYPE_CODES[kind])
+            self.starts.append(start)
+            self.ends.append(end)
+            self.lines.append(line)
+            
+    def __len__(self) -> int:
+        return len(self.types)
+        
+    def type_at(self, index: int) -> str:
+        """Возвращает тип токена по индексу."""
+        return TOKEN_TYPES[self.types[index]]
+        
+    def value_at(self, index: int) -> Any:
+        """Вырезает значение токена из исходного текста."""
+        return token_value(
+            self.text, TOKEN_TYPES[self.types[index]],
+            self.starts[index], self.ends[index]
+        )
+        
+    def column_at(self, index: int) -> int:
+        """Вычисляет столбец токена по смещению начала."""
+        start = self.starts[index]
+        if self.types[index] == _TYPE_CODES['STRING']:
+            start -= 1  # Столбец строки указывает на открывающую кавычку
+        return start - self.text.rfind('\n', 1, start)
+        
+    def __getitem__(self, index: int) -> Token:
+        if index < 0:
+            index += len(self.types)
+        return Token(
+            self.type_at(index),
+            self.value_at(index),
+            self.lines[index],
+            self.column_at(index)
+        )
+        
+    def __iter__(self) -> Iterator[Token]:
+        for index in range(len(self.types)):
+            yield self[index]
+            
+    def cursor(self) -> 'TokenCursor':
+        """Возвращает курсор для обхода буфера по индексу."""
+        return TokenCursor(self)
+
+class TokenCursor:
+    """
+    Обход TokenBuffer по индексу без создания Token на каждый токен.
+    
+    Курсор - итератор, который при каждом шаге сдвигает индекс и возвращает
+    сам себя, поэтому тип, значение и позиция всегда относятся к текущему
+    токену. Значение и столбец вычисляются только при обращении.
+    """
+    
+    __slots__ = ('buffer', 'index')
+    
+    def __init__(self, buffer: TokenBuffer):
+        self.buffer = buffer
+        self.index = -1
+        
+    def __iter__(self) -> 'TokenCursor':
+        return self
+        
+    def __next__(self) -> 'TokenCursor':
+        if self.index + 1 >= len(self.buffer.types):
+            raise StopIteration
+        self.index += 1
+        return self
+        
+    @property
+    def type(self) -> str:
+        return TOKEN_TYPES[self.buffer.types[self.index]]
+        
+    @property
+    def value(self) -> Any:
+        return self.buffer.value_at(self.index)
+        
+    @property
+    def line(self) -> int:
+        return self.buffer.lines[self.index]
+        
+    @property
+    def column(self) -> int:
+        return self.buffer.column_at(self.index)
+
 class Lexer:
     """Лексический анализатор для pop файлов."""
     
@@ -93,7 +235,7 @@ class Lexer:
         # Пропускаем закрывающую кавычку
         self.advance()
         
-        return Token('STRING', result, line, column)
+        return Token('STRING', STRINGS[result], line, column)
         
     def number(self) -> Token:
         """Обрабатывает числовые литералы."""
@@ -125,7 +267,7 @@ class Lexer:
             result += self.current_char
             self.advance()
             
-        return Token('IDENTIFIER', result, line, column)
+        return Token('IDENTIFIER', STRINGS[result], line, column)
         
     def get_next_token(self) -> Optional[Token]:
         """Получает следующий токен."""
@@ -179,15 +321,163 @@ class Lexer:
             
         return Token('EOF', None, self.line, self.column)
         
-    def tokenize(self, text: str) -> List[Token]:
-        """Разбивает текст на токены."""
-        self.init(text)
-        tokens = []
+    def iter_tokens(self, text: str, fast: bool = True) -> Iterator[Token]:
+        """
+        Лениво выдает токены по одному, заканчивая токеном EOF.
         
+        Args:
+            text: Исходный текст
+            fast: Использовать однопроходный регулярный сканер вместо
+                  посимвольного обхода. Поток токенов идентичен.
+        """
+        if fast:
+            for kind, start, end, line, column in scan(text):
+                yield Token(kind, token_value(text, kind, start, end), line, column)
+            return
+            
+        self.init(text)
         token = self.get_next_token()
         while token.type != 'EOF':
-            tokens.append(token)
+            yield token
             token = self.get_next_token()
             
-        tokens.append(token)
-        return tokens
+        yield token
+        
+    def tokenize(self, text: str, fast: bool = True) -> List[Token]:
+        """
+        Разбивает текст на токены.
+        
+        Args:
+            text: Исходный текст
+            fast: Использовать однопроходный регулярный сканер вместо
+                  посимвольного обхода. Поток токенов идентичен.
+        """
+        return list(self.iter_tokens(text, fast))
+        
+    def tokenize_compact(self, text: str) -> TokenBuffer:
+        """Разбивает текст на токены в компактный буфер на массивах."""
+        return TokenBuffer(text)
+
+
+def _unescape(match: 're.Match[str]') -> str:
+    """Раскрывает escape-последовательность строкового литерала."""
+    char = match.group(1)
+    return _ESCAPES.get(char, char)
+
+
+def token_value(text: str, kind: str, start: int, end: int) -> Any:
+    """
+    Вычисляет значение токена по срезу исходного текста.
+    
+    Строки и идентификаторы берутся из общей таблицы строк (STRINGS).
+    """
+    if kind == 'STRING':
+        value = text[start:end]
+        if '\\' in value:
+            value = _ESCAPE_RE.sub(_unescape, value)
+        return STRINGS[value]
+    if kind == 'INTEGER':
+        return int(text[start:end])
+    if kind == 'FLOAT':
+        return float(text[start:end])
+    if kind == 'EOF':
+        return None
+    if kind == 'IDENTIFIER':
+        return STRINGS[text[start:end]]
+    return text[start:end]
+
+
+def scan(text: str) -> Iterator[RawToken]:
+    """
+    Однопроходный сканер pop файла.
+    
+    Каждый токен вместе с пробелами и комментариями перед ним распознается
+    одним регулярным выражением, строка и столбец вычисляются только в начале
+    токена по числу переводов строк между токенами. Позиции совпадают с
+    посимвольным Lexer: перевод строки в самом первом символе текста
+    не учитывается.
+    """
+    length = len(text)
+    pos = 0
+    line = 1
+    last_newline = -1  # Столбец = позиция - индекс последнего перевода строки
+    counted = 1  # Переводы строк до этой позиции уже учтены
+    match_token = _TOKEN_RE.match
+    count = text.count
+    rfind = text.rfind
+    
+    while True:
+        match = match_token(text, pos)
+        if match is not None:
+            kind = match.lastgroup
+            start = match.start(kind)
+            if start > counted:
+                newlines = count('\n', counted, start)
+                if newlines:
+                    line += newlines
+                    last_newline = rfind('\n', counted, start)
+                counted = start
+            pos = match.end()
+            if kind == 'STRING':
+                yield (kind, start + 1, pos - 1, line, start - last_newline)
+            else:
+                yield (kind, start, pos, line, start - last_newline)
+            continue
+            
+        if pos < length:
+            pos = _SKIP_RE.match(text, pos).end()
+            
+        # Позиция токена (EOF после незакрытой строки стоит на length + 1)
+        if pos > counted:
+            newlines = count('\n', counted, pos)
+            if newlines:
+                line += newlines
+                last_newline = rfind('\n', counted, pos)
+            counted = pos
+        column = pos - last_newline
+        
+        if pos >= length:
+            yield ('EOF', pos, pos, line, column)
+            return
+            
+        char = text[pos]
+        
+        if char == '"':
+            match = _STRING_RE.match(text, pos)
+            end = match.end()
+            if match.group(2):
+                yield ('STRING', pos + 1, end - 1, line, column)
+                pos = end
+            elif end == length:
+                # Незакрытая строка тянется до конца текста
+                yield ('STRING', pos + 1, end, line, column)
+                pos = end + 1
+            else:
+                # Одиночный обратный слэш в конце текста
+                raise Exception(f'Lexical error at line {line}, column {column}')
+            continue
+            
+        kind = _PUNCTUATION.get(char)
+        if kind is not None:
+            yield (kind, pos, pos + 1, line, column)
+            pos += 1
+            continue
+            
+        if char.isdigit():
+            match = _NUMBER_RE.match(text, pos)
+            end = match.end() if match else pos + 1
+            # Цифры вне ASCII, которые принимает str.isdigit
+            while end < length and (text[end].isdigit() or text[end] == '.'):
+                end += 1
+            kind = 'FLOAT' if '.' in text[pos:end] else 'INTEGER'
+            yield (kind, pos, end, line, column)
+            pos = end
+            continue
+            
+        if char.isalpha() or char == '_':
+            end = _WORD_RE.match(text, pos).end()
+            yield ('IDENTIFIER', pos, end, line, column)
+            pos = end
+            continue
+            
+        raise Exception(f'Lexical error at line {line}, column {column}')
@@ -1,11 +1,57 @@
 """
 Базовые классы и миксины для моделей.
 """
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
+from operator import attrgetter
+from typing import Any, Callable, ClassVar, Dict, List, Tuple, Type, TypeVar
+
+T = TypeVar('T')
+
+
+def slotted(cls: Type[T]) -> Type[T]:
+    """
+    Пересоздает dataclass с __slots__ для его полей (аналог
+    dataclass(slots=True) из Python 3.10).
+
+    Экземпляры не получают __dict__, поэтому занимают заметно меньше
+    памяти, но не принимают атрибутов вне полей. Значения по умолчанию
+    сохраняются в __init__, созданном dataclass. Все базовые классы
+    должны объявлять __slots__, иначе __dict__ останется.
+    """
+    inherited = set()
+    for base in cls.__mro__[1:-1]:
+        slots = base.__dict__.get('__slots__', ())
+        inherited.update((slots,) if isinstance(slots, str) else slots)
+
+    names = [f.name for f in fields(cls)]
+    cls_dict = dict(cls.__dict__)
+    cls_dict['__slots__'] = tuple(name for name in names if name not in inherited)
+    for name in names:
+        # Значения по умолчанию конфликтуют со слотами с тем же именем
+        cls_dict.pop(name, None)
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+
+    new_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    new_cls.__qualname__ = cls.__qualname__
+    return new_cls
+
+
+def _has_own(obj: Any, name: str) -> bool:
+    """Задан ли атрибут экземпляра (без вызова __getattr__)."""
+    try:
+        object.__getattribute__(obj, name)
+    except AttributeError:
+        return False
+    return True
+
 
 @dataclass
 class CommentableMixin:
     """Миксин для добавления поддержки комментариев."""
+    # Слот comment объявляет модель (slotted), у остальных - __dict__
+    __slots__ = ()
+
     comment: str = field(default="")
     
     def add_comment(self, comment: str) -> None:
@@ -15,3 +61,116 @@ class CommentableMixin:
     def get_comment(self) -> str:
         """Возвращает комментарий объекта."""
         return self.comment
+
+
+# Класс модели -> attrgetter всех ее полей (для content_key)
+_FIELD_GETTERS: Dict[type, Callable[[Any], Tuple[Any, ...]]] = {}
+
+
+class DirtyTrackingMixin:
+    """
+    Миксин для отслеживания изменений модели (инкрементальный экспорт).
+
+    Присваивание любого публичного поля помечает модель измененной.
+    Изменения внутри списков и словарей полей не отслеживаются, кроме
+    состава дочерних моделей (_tracked_children): после таких правок
+    нужно вызвать mark_dirty(). Новая модель считается измененной.
+    """
+    __slots__ = ('_dirty', '_clean_children')
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if not name.startswith('_'):
+            object.__setattr__(self, '_dirty', True)
+
+    def _tracked_children(self) -> List[Any]:
+        """Дочерние модели, изменения которых делают измененной и эту."""
+        return []
+
+    def mark_dirty(self) -> None:
+        """Помечает модель измененной."""
+        object.__setattr__(self, '_dirty', True)
+
+    def content_key(self) -> str:
+        """
+        Структурный ключ текущих значений полей модели (repr).
+
+        Вычисляется при каждом вызове и не запоминается: поля-списки и
+        словари можно менять на месте, не помечая модель измененной.
+        Предназначен для моделей без дочерних моделей (TFBot, Tank).
+        """
+        getter = _FIELD_GETTERS.get(type(self))
+        if getter is None:
+            names = [f.name for f in fields(self)]
+            # attrgetter с одним именем возвращает значение, а не кортеж
+            getter = _FIELD_GETTERS[type(self)] = attrgetter(*names, names[0])
+        return repr(getter(self))
+
+    def mark_clean(self) -> None:
+        """Помечает модель и ее дочерние модели сохраненными."""
+        children = self._tracked_children()
+        for child in children:
+            if isinstance(child, DirtyTrackingMixin):
+                child.mark_clean()
+        object.__setattr__(self, '_dirty', False)
+        object.__setattr__(self, '_clean_children', tuple(children))
+
+    @property
+    def is_self_dirty(self) -> bool:
+        """Изменены ли собственные поля модели (без дочерних моделей)."""
+        return self._dirty if _has_own(self, '_dirty') else True
+
+    @property
+    def is_dirty(self) -> bool:
+        """Изменена ли модель (или ее дочерние модели) с последнего mark_clean()."""
+        if self.is_self_dirty:
+            return True
+        children = self._tracked_children()
+        clean_children = self._clean_children if _has_own(self, '_clean_children') else ()
+        if len(children) != len(clean_children):
+            return True
+        for child, clean_child in zip(children, clean_children):
+            if child is not clean_child:
+                return True
+            if isinstance(child, DirtyTrackingMixin) and child.is_dirty:
+                return True
+        return False
+
+
+class LazyChildrenMixin(DirtyTrackingMixin):
+    """
+    Миксин для ленивого создания дочерних моделей из разобранного дерева.
+
+    Модель, созданная через from_valve_format(data, lazy=True), хранит
+    ссылку на исходный словарь, а поля из _lazy_children строит при первом
+    обращении и запоминает. Дочерние модели тоже создаются ленивыми.
+    Исходный словарь не должен изменяться, пока поля не построены.
+    Построение поля не помечает модель измененной.
+    """
+    __slots__ = ('_raw',)
+
+    # Имя поля -> build(data, lazy), строящая значение поля из словаря
+    _lazy_children: ClassVar[Dict[str, Callable[[Dict[str, Any], bool], Any]]] = {}
+
+    def _defer_children(self, data: Dict[str, Any]) -> None:
+        """Откладывает создание дочерних моделей до первого обращения."""
+        for name in self._lazy_children:
+            if _has_own(self, name):
+                object.__delattr__(self, name)
+        object.__setattr__(self, '_raw', data)
+
+    def is_materialized(self, name: str) -> bool:
+        """Построено ли поле name (для неленивой модели всегда True)."""
+        return _has_own(self, name) or not _has_own(self, '_raw')
+
+    def __getattr__(self, name: str) -> Any:
+        # Вызывается только для отсутствующих атрибутов: отложенных полей
+        build = type(self)._lazy_children.get(name)
+        if build is None or not _has_own(self, '_raw'):
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        value = build(self._raw, True)
+        # Построение поля не является изменением модели
+        object.__setattr__(self, name, value)
+        if all(_has_own(self, field_name) for field_name in self._lazy_children):
+            object.__delattr__(self, '_raw')
+        return value
@@ -54,8 +54,14 @@ class MissionInfo(CommentableMixin):
         return result
         
     @classmethod
-    def from_valve_format(cls, data: Dict[str, Any]) -> 'MissionInfo':
-        """Создает параметры миссии из формата Valve."""
+    def from_valve_format(cls, data: Dict[str, Any], lazy: bool = False) -> 'MissionInfo':
+        """
+        Создает параметры миссии из формата Valve.
+        
+        Args:
+            data: Словарь WaveSchedule
+            lazy: Создавать волны ленивыми (см. Wave.from_valve_format)
+        """
         info = cls()
         
         # Сохраняем комментарий если он есть
@@ -81,9 +87,15 @@ class MissionInfo(CommentableMixin):
             info.can_bots_attack_in_spawn = data["CanBotsAttackWhileInSpawnRoom"].lower() != "no"
             
         if "Wave" in data:
-            info.waves = [Wave.from_valve_format(wave) for wave in data["Wave"]]
+            waves = data["Wave"]
+            if isinstance(waves, dict):
+                waves = [waves]
+            info.waves = [Wave.from_valve_format(wave, lazy=lazy) for wave in waves]
             
         if "Mission" in data:
-            info.missions = [Mission.from_valve_format(mission) for mission in data["Mission"]]
+            missions = data["Mission"]
+            if isinstance(missions, dict):
+                missions = [missions]
+            info.missions = [Mission.from_valve_format(mission) for mission in missions]
             
         return info
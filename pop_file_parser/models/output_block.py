@@ -3,9 +3,10 @@
 """
 from dataclasses import dataclass
 from typing import Dict, Any
-from .base import CommentableMixin
+from .base import CommentableMixin, slotted
 
 
+@slotted
 @dataclass
 class OutputBlock(CommentableMixin):
     """
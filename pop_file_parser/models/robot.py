@@ -4,9 +4,11 @@
 import logging
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any
+from .base import slotted
 
 logger = logging.getLogger(__name__)
 
+@slotted
 @dataclass
 class Robot:
     """Представляет робота в MvM миссии."""
@@ -3,10 +3,11 @@
 """
 from dataclasses import dataclass
 from typing import Dict, Any
-from .base import CommentableMixin
+from .base import CommentableMixin, DirtyTrackingMixin, slotted
 
+@slotted
 @dataclass
-class Tank(CommentableMixin):
+class Tank(CommentableMixin, DirtyTrackingMixin):
     """Представляет Tank в MvM миссии."""
     name: str = "tankboss"
     health: int = 0
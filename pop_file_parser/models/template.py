@@ -1,10 +1,43 @@
 """
 Модель для представления шаблонов роботов в MvM.
 """
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import Dict, Optional, Any
+from ..template_resolver import TemplateResolver
 from .tf_bot import TFBot
 
+
+def merge_bots(base: Optional[TFBot], bot: TFBot) -> TFBot:
+    """
+    Накладывает поля робота (или шаблона) на разрешенный базовый шаблон.
+
+    Поля со значением по умолчанию наследуются, остальные перекрывают
+    базовые; Attributes, Item и Tags объединяются, словари атрибутов
+    дополняются собственными ключами. Итоговый робот без ссылки на шаблон.
+    """
+    result = TFBot()
+    for f in fields(TFBot):
+        own = getattr(bot, f.name)
+        if f.name == "template":
+            continue
+        if base is None or f.name == "comment":
+            value = own
+        else:
+            inherited = getattr(base, f.name)
+            if isinstance(own, set):
+                value = inherited | own
+            elif isinstance(own, list):
+                value = inherited + [item for item in own if item not in inherited]
+            elif isinstance(own, dict):
+                value = {**inherited, **own}
+            else:
+                value = inherited if own == f.default else own
+        # Изменяемые значения копируются, чтобы не делить их с исходным роботом
+        if isinstance(value, (set, list, dict)) and value is own:
+            value = type(value)(value)
+        setattr(result, f.name, value)
+    return result
+
 @dataclass
 class Template:
     """Представляет шаблон робота в MvM."""
@@ -26,10 +59,20 @@ class Template:
         return result
 
 class TemplateManager:
-    """Менеджер шаблонов для MvM."""
+    """
+    Менеджер шаблонов для MvM.
+    
+    Шаблон наследует другой через TFBot.template. Итоговые роботы
+    (resolve, resolve_bot) вычисляются с мемоизацией; замена или удаление
+    шаблона сбрасывает только его и наследующие его шаблоны. После
+    изменения робота шаблона на месте нужно вызвать invalidate(name).
+    """
     
     def __init__(self):
         self.templates: Dict[str, Template] = {}
+        self.resolver: TemplateResolver[TFBot, TFBot] = TemplateResolver(
+            self._lookup_bot, lambda bot: bot.template, merge_bots
+        )
         
     def add_template(self, name: str, bot: TFBot, comments: str = "") -> None:
         """
@@ -42,6 +85,17 @@ class TemplateManager:
         """
         template = Template(name=name, bot=bot, comments=comments)
         self.templates[name] = template
+        self.resolver.invalidate(name)
+        
+    def remove_template(self, name: str) -> None:
+        """
+        Удаляет шаблон.
+        
+        Args:
+            name: Имя шаблона
+        """
+        self.templates.pop(name, None)
+        self.resolver.invalidate(name)
         
     def get_template(self, name: str) -> Optional[Template]:
         """
@@ -52,6 +106,44 @@ class TemplateManager:
         """
         return self.templates.get(name)
         
+    def resolve(self, name: str) -> TFBot:
+        """
+        Итоговый робот шаблона со всей цепочкой наследования.
+        
+        Результат общий для всех вызовов и не должен изменяться.
+        
+        Args:
+            name: Имя шаблона
+            
+        Raises:
+            ValueError: Неизвестный шаблон или цикл наследования
+        """
+        return self.resolver.resolve(name)
+        
+    def resolve_bot(self, bot: TFBot) -> TFBot:
+        """
+        Итоговый робот с учетом шаблона, на который ссылается bot.
+        
+        Args:
+            bot: Объект TFBot (например, из WaveSpawn)
+        """
+        if not bot.template:
+            return bot
+        return self.resolver.resolve_item(bot)
+        
+    def invalidate(self, name: str) -> None:
+        """
+        Сбрасывает итоговые роботы шаблона name и его наследников.
+        
+        Args:
+            name: Имя измененного шаблона
+        """
+        self.resolver.invalidate(name)
+        
+    def _lookup_bot(self, name: str) -> Optional[TFBot]:
+        template = self.templates.get(name)
+        return template.bot if template is not None else None
+        
     def to_valve_format(self) -> Dict[str, Any]:
         """Конвертирует все шаблоны в формат Valve."""
         result = {}
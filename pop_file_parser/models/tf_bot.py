@@ -3,10 +3,11 @@
 """
 from dataclasses import dataclass, field
 from typing import Dict, List, Set, Any
-from .base import CommentableMixin
+from .base import CommentableMixin, DirtyTrackingMixin, slotted
 
+@slotted
 @dataclass
-class TFBot(CommentableMixin):
+class TFBot(CommentableMixin, DirtyTrackingMixin):
     """Представляет TFBot в MvM миссии."""
     name: str = ""
     class_name: str = ""
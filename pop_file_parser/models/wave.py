@@ -6,10 +6,32 @@ from typing import Dict, List, Any, Optional
 from .wave_spawn import WaveSpawn
 from .tank import Tank
 from .output_block import OutputBlock
-from .base import CommentableMixin
+from .base import CommentableMixin, LazyChildrenMixin, slotted
 
+
+def _wave_spawns_from_valve_format(data: Dict[str, Any], lazy: bool) -> List[Any]:
+    """Создает WaveSpawn волны из формата Valve."""
+    if "WaveSpawn" not in data:
+        return []
+    wave_spawn_data = data["WaveSpawn"]
+    if isinstance(wave_spawn_data, list):
+        return [WaveSpawn.from_valve_format(spawn, lazy=lazy) for spawn in wave_spawn_data]
+    return [WaveSpawn.from_valve_format(wave_spawn_data, lazy=lazy)]
+
+
+def _tanks_from_valve_format(data: Dict[str, Any], lazy: bool) -> List[Any]:
+    """Создает Tank волны из формата Valve."""
+    if "Tank" not in data:
+        return []
+    tank_data = data["Tank"]
+    if isinstance(tank_data, list):
+        return [Tank.from_valve_format(tank) for tank in tank_data]
+    return [Tank.from_valve_format(tank_data)]
+
+
+@slotted
 @dataclass
-class Wave(CommentableMixin):
+class Wave(CommentableMixin, LazyChildrenMixin):
     """Представляет волну в MvM миссии."""
     wave_spawns: List[Any] = field(default_factory=list)
     tanks: List[Any] = field(default_factory=list)
@@ -24,6 +46,16 @@ class Wave(CommentableMixin):
     sound: str = ""
     # comment унаследован и уже идёт с дефолтом
 
+    # Поля, которые в ленивом режиме строятся при первом обращении
+    _lazy_children = {
+        "wave_spawns": _wave_spawns_from_valve_format,
+        "tanks": _tanks_from_valve_format,
+    }
+
+    def _tracked_children(self) -> List[Any]:
+        """Дочерние модели для отслеживания изменений."""
+        return self.wave_spawns + self.tanks
+
     def add_custom_output(self, name: str, target: str = "", action: str = "", custom_settings: Any = "") -> None:
         """
         Добавляет пользовательский output блок.
@@ -47,6 +79,24 @@ class Wave(CommentableMixin):
     
     def to_valve_format(self) -> Dict[str, Any]:
         """Конвертирует волну в формат Valve."""
+        result = self.own_valve_format()
+        
+        # Добавляем спавны
+        for spawn in self.wave_spawns:
+            if "WaveSpawn" not in result:
+                result["WaveSpawn"] = []
+            result["WaveSpawn"].append(spawn.to_valve_format())
+            
+        # Добавляем танки
+        for tank in self.tanks:
+            if "Tank" not in result:
+                result["Tank"] = []
+            result["Tank"].append(tank.to_valve_format())
+            
+        return result
+
+    def own_valve_format(self) -> Dict[str, Any]:
+        """Собственные параметры волны в формате Valve (без WaveSpawn и Tank)."""
         result = {}
         
         # Добавляем комментарий если он есть
@@ -81,44 +131,30 @@ class Wave(CommentableMixin):
             
         if self.sound:
             result["Sound"] = self.sound
-        
-        # Добавляем спавны
-        for spawn in self.wave_spawns:
-            if "WaveSpawn" not in result:
-                result["WaveSpawn"] = []
-            result["WaveSpawn"].append(spawn.to_valve_format())
-            
-        # Добавляем танки
-        for tank in self.tanks:
-            if "Tank" not in result:
-                result["Tank"] = []
-            result["Tank"].append(tank.to_valve_format())
             
         return result
 
     @classmethod
-    def from_valve_format(cls, data: Dict[str, Any]) -> 'Wave':
-        """Создает волну из формата Valve."""
+    def from_valve_format(cls, data: Dict[str, Any], lazy: bool = False) -> 'Wave':
+        """
+        Создает волну из формата Valve.
+        
+        Args:
+            data: Словарь волны
+            lazy: Создавать WaveSpawn и Tank при первом обращении к ним
+        """
         wave = cls()
         
         # Сохраняем комментарий если он есть
         if "__comment" in data:
             wave.comment = data["__comment"]
         
-        # Собираем WaveSpawn
-        if "WaveSpawn" in data:
-            wave_spawn_data = data["WaveSpawn"]
-            if isinstance(wave_spawn_data, list):
-                wave.wave_spawns.extend(WaveSpawn.from_valve_format(spawn) for spawn in wave_spawn_data)
-            else:
-                wave.wave_spawns.append(WaveSpawn.from_valve_format(wave_spawn_data))
-                
-        # Собираем Tank
-        if "Tank" in data:
-            tank_data = data["Tank"]
-            if isinstance(tank_data, list):
-                wave.tanks.extend(Tank.from_valve_format(tank) for tank in tank_data)
-            else:
-                wave.tanks.append(Tank.from_valve_format(tank_data))
+        if lazy:
+            wave._defer_children(data)
+            return wave
+        
+        # Собираем WaveSpawn и Tank
+        wave.wave_spawns.extend(_wave_spawns_from_valve_format(data, False))
+        wave.tanks.extend(_tanks_from_valve_format(data, False))
                 
         return wave
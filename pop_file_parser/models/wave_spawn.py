@@ -5,10 +5,43 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Any, Optional
 from .tank import Tank
 from .tf_bot import TFBot
-from .base import CommentableMixin
+from .base import CommentableMixin, LazyChildrenMixin, slotted
 
+
+def _number(value: Any) -> Optional[int]:
+    """Целое из значения формата Valve ("100.5" -> 100); None, если не число."""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _squad_from_valve_format(data: Dict[str, Any], lazy: bool) -> List[Any]:
+    """Создает роботов WaveSpawn (Squad, TFBot или Tank) из формата Valve."""
+    if "Squad" in data:
+        squad_data = data["Squad"]
+        if isinstance(squad_data, dict) and "TFBot" in squad_data:
+            bots = squad_data["TFBot"]
+            if isinstance(bots, list):
+                return [TFBot.from_valve_format(bot) for bot in bots]
+            return [TFBot.from_valve_format(bots)]
+    elif "TFBot" in data:
+        return [TFBot.from_valve_format(data["TFBot"])]
+    elif "Tank" in data:
+        return [Tank.from_valve_format(data["Tank"])]
+    elif "RandomChoice" in data:
+        choice_data = data["RandomChoice"]
+        if isinstance(choice_data, dict) and "TFBot" in choice_data:
+            bots = choice_data["TFBot"]
+            if isinstance(bots, list):
+                return [TFBot.from_valve_format(bot) for bot in bots]
+            return [TFBot.from_valve_format(bots)]
+    return []
+
+
+@slotted
 @dataclass
-class WaveSpawn(CommentableMixin):
+class WaveSpawn(CommentableMixin, LazyChildrenMixin):
     """Представляет WaveSpawn в MvM миссии."""
     name: str = ""
     where: str = ""
@@ -17,7 +50,8 @@ class WaveSpawn(CommentableMixin):
     spawn_count: int = 0
     total_currency: int = 0
     support: bool = False
-    squad: List[Any] = field(default_factory=list)  # TFBot или Tank
+    support_limited: bool = False  # Support Limited: поддержка с конечным TotalCount
+    squad: List[Any] = field(default_factory=list)  # TFBot или Tank; при random_choice - варианты выбора
     wait_for_all_spawned: str = ""
     wait_for_all_dead: str = ""
     wait_between_spawns: int = 0
@@ -30,6 +64,13 @@ class WaveSpawn(CommentableMixin):
     random_choice: bool = False  # Новое поле, для поддержки случайного выбора
     # comment унаследован и уже идёт с дефолтом
 
+    # Поля, которые в ленивом режиме строятся при первом обращении
+    _lazy_children = {"squad": _squad_from_valve_format}
+
+    def _tracked_children(self) -> List[Any]:
+        """Дочерние модели для отслеживания изменений."""
+        return list(self.squad)
+
     def to_valve_format(self) -> Dict[str, Any]:
         """Конвертирует WaveSpawn в формат Valve."""
         result = {}
@@ -57,7 +98,7 @@ class WaveSpawn(CommentableMixin):
             result["TotalCurrency"] = self.total_currency
             
         if self.support:
-            result["Support"] = 1
+            result["Support"] = "Limited" if self.support_limited else 1
             
         if self.wait_for_all_spawned:
             result["WaitForAllSpawned"] = self.wait_for_all_spawned
@@ -86,8 +127,10 @@ class WaveSpawn(CommentableMixin):
         if self.done_output:
             result["DoneOutput"] = self.done_output
             
-        # Обрабатываем Squad
-        if len(self.squad) == 1:
+        # Обрабатываем RandomChoice и Squad
+        if self.random_choice:
+            result["RandomChoice"] = {"TFBot": [bot.to_valve_format() for bot in self.squad]}
+        elif len(self.squad) == 1:
             bot = self.squad[0]
             if isinstance(bot, TFBot):
                 result["TFBot"] = bot.to_valve_format()
@@ -99,8 +142,14 @@ class WaveSpawn(CommentableMixin):
         return result
     
     @classmethod
-    def from_valve_format(cls, data: Dict[str, Any]) -> 'WaveSpawn':
-        """Создает WaveSpawn из формата Valve."""
+    def from_valve_format(cls, data: Dict[str, Any], lazy: bool = False) -> 'WaveSpawn':
+        """
+        Создает WaveSpawn из формата Valve.
+        
+        Args:
+            data: Словарь WaveSpawn
+            lazy: Создавать роботов (squad) при первом обращении к ним
+        """
         spawn = cls()
         
         # Сохраняем комментарий если он есть
@@ -113,8 +162,12 @@ class WaveSpawn(CommentableMixin):
         if "Where" in data:
             spawn.where = data["Where"]
             
+        # Счетчик и кредиты читаются терпимо: дробные значения округляются
+        # вниз, нечисловые пропускаются (как в valve_events)
         if "TotalCount" in data:
-            spawn.total_count = int(data["TotalCount"])
+            total_count = _number(data["TotalCount"])
+            if total_count is not None:
+                spawn.total_count = total_count
             
         if "MaxActive" in data:
             spawn.max_active = int(data["MaxActive"])
@@ -123,10 +176,15 @@ class WaveSpawn(CommentableMixin):
             spawn.spawn_count = int(data["SpawnCount"])
             
         if "TotalCurrency" in data:
-            spawn.total_currency = int(data["TotalCurrency"])
+            total_currency = _number(data["TotalCurrency"])
+            if total_currency is not None:
+                spawn.total_currency = total_currency
             
         if "Support" in data:
-            spawn.support = bool(int(data["Support"]))
+            if str(data["Support"]).lower() == "limited":
+                spawn.support = spawn.support_limited = True
+            else:
+                spawn.support = bool(int(data["Support"]))
             
         if "WaitForAllSpawned" in data:
             spawn.wait_for_all_spawned = data["WaitForAllSpawned"]
@@ -155,18 +213,13 @@ class WaveSpawn(CommentableMixin):
         if "DoneOutput" in data:
             spawn.done_output = data["DoneOutput"]
             
+        if "RandomChoice" in data:
+            spawn.random_choice = True
+            
         # Обрабатываем Squad и TFBot
-        if "Squad" in data:
-            squad_data = data["Squad"]
-            if isinstance(squad_data, dict) and "TFBot" in squad_data:
-                bots = squad_data["TFBot"]
-                if isinstance(bots, list):
-                    spawn.squad.extend(TFBot.from_valve_format(bot) for bot in bots)
-                else:
-                    spawn.squad.append(TFBot.from_valve_format(bots))
-        elif "TFBot" in data:
-            spawn.squad.append(TFBot.from_valve_format(data["TFBot"]))
-        elif "Tank" in data:
-            spawn.squad.append(Tank.from_valve_format(data["Tank"]))
+        if lazy:
+            spawn._defer_children(data)
+        else:
+            spawn.squad.extend(_squad_from_valve_format(data, False))
             
         return spawn
@@ -0,0 +1,184 @@
+"""
+Монте-Карло оценка состава волн со случайным выбором роботов (RandomChoice):
+распределения суммарного здоровья, числа гигантов и классов.
+"""
+import random
+import statistics
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from .models.mission_info import MissionInfo
+from .models.tank import Tank
+from .models.tf_bot import TFBot
+from .models.wave import Wave
+
+# Здоровье классов по умолчанию (когда у робота не задан Health)
+CLASS_HEALTH = {
+    "scout": 125,
+    "soldier": 200,
+    "pyro": 175,
+    "demoman": 175,
+    "heavyweapons": 300,
+    "engineer": 125,
+    "medic": 150,
+    "sniper": 125,
+    "spy": 125,
+}
+
+
+class RobotSpec(NamedTuple):
+    """Параметры робота, влияющие на оценку."""
+    class_name: str
+    health: int
+    giant: bool
+
+
+def robot_spec(robot: Any) -> RobotSpec:
+    """Класс, здоровье и признак гиганта для TFBot или Tank."""
+    if isinstance(robot, Tank):
+        return RobotSpec("Tank", int(robot.health or 0), False)
+    health = int(float(robot.health)) if robot.health else CLASS_HEALTH.get(robot.class_name.lower(), 0)
+    giant = any(attribute.lower() == "miniboss" for attribute in robot.attributes)
+    return RobotSpec(robot.class_name or "Unknown", health, giant)
+
+
+def _describe(values: array) -> Dict[str, float]:
+    ordered = sorted(values)
+    last = len(ordered) - 1
+
+    def percentile(q: float) -> float:
+        return float(ordered[round(q * last)])
+
+    return {
+        "mean": statistics.fmean(ordered),
+        "stdev": statistics.pstdev(ordered),
+        "min": float(ordered[0]),
+        "p5": percentile(0.05),
+        "p50": percentile(0.5),
+        "p95": percentile(0.95),
+        "max": float(ordered[-1]),
+    }
+
+
+@dataclass
+class WaveDistribution:
+    """
+    Результаты выборки для одной волны: i-й элемент каждого массива
+    относится к i-й реализации волны.
+    """
+    samples: int
+    health: array = field(default_factory=lambda: array('d'))
+    giants: array = field(default_factory=lambda: array('l'))
+    classes: Dict[str, array] = field(default_factory=dict)
+    random_spawns: int = 0  # WaveSpawn с RandomChoice
+
+    def summary(self) -> Dict[str, Any]:
+        """Статистика распределений (среднее, разброс, перцентили)."""
+        if not self.samples:
+            return {"samples": 0}
+        return {
+            "samples": self.samples,
+            "health": _describe(self.health),
+            "giants": _describe(self.giants),
+            "classes": {name: _describe(counts) for name, counts in sorted(self.classes.items())},
+        }
+
+
+class MonteCarloEngine:
+    """
+    Выборка реализаций волн.
+
+    Каждый робот WaveSpawn с RandomChoice выбирается равновероятно из
+    вариантов; Squad и одиночные роботы повторяются TotalCount раз.
+    Бесконечная поддержка (Support 1) не учитывается. RandomSpawn меняет
+    только точку появления и на состав волны не влияет.
+    """
+
+    def __init__(self, samples: int = 1000, seed: Optional[int] = None,
+                 resolve: Optional[Callable[[TFBot], TFBot]] = None):
+        """
+        Args:
+            samples: Количество реализаций каждой волны
+            seed: Зерно генератора; с ним последовательность результатов
+                  движка воспроизводима
+            resolve: Раскрытие шаблонов роботов
+                     (например, TemplateManager.resolve_bot)
+        """
+        if samples < 1:
+            raise ValueError(f"samples must be positive, got {samples}")
+        self.samples = samples
+        self.seed = seed
+        self.resolve = resolve
+        # Один генератор на движок: волны получают разные части одного
+        # потока и не повторяют выборы друг друга
+        self.rng = random.Random(seed)
+
+    def _spec(self, robot: Any) -> RobotSpec:
+        if self.resolve is not None and isinstance(robot, TFBot):
+            robot = self.resolve(robot)
+        return robot_spec(robot)
+
+    def sample_mission(self, mission: MissionInfo) -> List[WaveDistribution]:
+        """Распределения для всех волн миссии."""
+        return [self.sample_wave(wave) for wave in mission.waves]
+
+    def sample_wave(self, wave: Wave, rng: Optional[random.Random] = None) -> WaveDistribution:
+        """
+        Распределения для одной волны.
+
+        Args:
+            wave: Волна
+            rng: Генератор (по умолчанию общий генератор движка)
+        """
+        samples = self.samples
+        fixed_health = 0
+        fixed_giants = 0
+        fixed_classes: Dict[str, int] = {}
+        choices = []
+        for spawn in wave.wave_spawns:
+            if spawn.support and not spawn.support_limited:
+                continue
+            specs = [self._spec(robot) for robot in spawn.squad]
+            count = spawn.total_count
+            if not specs or not count:
+                continue
+            if spawn.random_choice and len(specs) > 1:
+                choices.append((count, specs))
+                continue
+            # Squad выходит целиком: TotalCount роботов по кругу
+            for index in range(count):
+                spec = specs[index % len(specs)]
+                fixed_health += spec.health
+                fixed_giants += spec.giant
+                fixed_classes[spec.class_name] = fixed_classes.get(spec.class_name, 0) + 1
+
+        result = WaveDistribution(
+            samples,
+            health=array('d', [fixed_health]) * samples,
+            giants=array('l', [fixed_giants]) * samples,
+            random_spawns=len(choices),
+        )
+        names = set(fixed_classes)
+        for _, specs in choices:
+            names.update(spec.class_name for spec in specs)
+        for name in names:
+            result.classes[name] = array('l', [fixed_classes.get(name, 0)]) * samples
+
+        if rng is None:
+            rng = self.rng
+        health, giants, classes = result.health, result.giants, result.classes
+        for count, specs in choices:
+            indices = range(len(specs))
+            # Все выборы WaveSpawn для всех реализаций - одним вызовом
+            draws = rng.choices(indices, k=count * samples)
+            for sample in range(samples):
+                chunk = draws[sample * count:(sample + 1) * count]
+                for index in indices:
+                    picked = chunk.count(index)
+                    if picked:
+                        spec = specs[index]
+                        health[sample] += picked * spec.health
+                        giants[sample] += picked * spec.giant
+                        classes[spec.class_name][sample] += picked
+        return result
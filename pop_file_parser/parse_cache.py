@@ -0,0 +1,205 @@
+"""
+Кэши результатов разбора pop файлов: дисковый и in-memory для #base.
+"""
+import hashlib
+import marshal
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Union
+
+# Версия формата файлов кэша; меняется вместе с сериализацией
+CACHE_FORMAT = 1
+
+_MARSHAL = b'M'
+_PICKLE = b'P'
+
+
+class ParseCache:
+    """
+    Кэш деревьев разбора на диске с вытеснением по LRU.
+
+    Ключ записи - SHA-256 от пространства имен (имя и версия парсера,
+    параметры разбора) и содержимого файла, поэтому измененный файл или
+    новая версия парсера просто не находят старую запись. Деревья из
+    словарей, списков и строк сериализуются через marshal, остальное
+    (AST Parser.parse) - через pickle.
+
+    Порядок LRU ведется в памяти и восстанавливается по времени изменения
+    файлов записей (попадание его обновляет); при превышении max_bytes
+    удаляются давно не использованные записи.
+    """
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int = 64 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._sizes: Optional['OrderedDict[Path, int]'] = None
+
+    def key(self, namespace: str, data: bytes) -> str:
+        """Возвращает ключ записи для содержимого data."""
+        digest = hashlib.sha256(f"{CACHE_FORMAT}:{namespace}\0".encode('utf-8'))
+        digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Any:
+        """Возвращает сохраненное дерево или None при промахе."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                payload = f.read()
+            value = self._loads(payload)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # Поврежденная или чужая запись считается промахом
+            self.misses += 1
+            self._remove(path)
+            return None
+
+        self.hits += 1
+        sizes = self._index()
+        if path in sizes:
+            sizes.move_to_end(path)
+        else:
+            sizes[path] = len(payload)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Сохраняет дерево и при необходимости вытесняет старые записи."""
+        payload = self._dumps(value)
+        if len(payload) > self.max_bytes:
+            return
+
+        sizes = self._index()
+        path = self._path(key)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(temp_path, path)
+        except BaseException:
+            self._remove(Path(temp_path))
+            raise
+        sizes.pop(path, None)
+        sizes[path] = len(payload)
+        self._evict()
+
+    def clear(self) -> None:
+        """Удаляет все записи кэша."""
+        for path in list(self._index()):
+            self._remove(path)
+
+    def stats(self) -> Dict[str, int]:
+        """Счетчики попаданий, промахов и вытеснений, размер кэша."""
+        sizes = self._index()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(sizes),
+            "bytes": sum(sizes.values()),
+        }
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.cache"
+
+    def _index(self) -> 'OrderedDict[Path, int]':
+        """Размеры записей от давно использованных к недавним."""
+        if self._sizes is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            entries = []
+            for path in self.directory.glob('*.cache'):
+                stat = path.stat()
+                entries.append((stat.st_mtime, path, stat.st_size))
+            entries.sort()
+            self._sizes = OrderedDict((path, size) for _, path, size in entries)
+        return self._sizes
+
+    def _evict(self) -> None:
+        """Удаляет давно не использованные записи сверх max_bytes."""
+        sizes = self._index()
+        total = sum(sizes.values())
+        while total > self.max_bytes and sizes:
+            path = next(iter(sizes))
+            total -= sizes[path]
+            self._remove(path)
+            self.evictions += 1
+
+    def _remove(self, path: Path) -> None:
+        if self._sizes is not None:
+            self._sizes.pop(path, None)
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def _dumps(self, value: Any) -> bytes:
+        try:
+            return _MARSHAL + marshal.dumps(value)
+        except ValueError:
+            # marshal не умеет экземпляры классов (узлы AST)
+            return _PICKLE + pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def _loads(self, payload: bytes) -> Any:
+        kind, body = payload[:1], payload[1:]
+        if kind == _MARSHAL:
+            return marshal.loads(body)
+        if kind == _PICKLE:
+            return pickle.loads(body)
+        raise ValueError("Unknown cache entry format")
+
+
+class BaseTreeCache:
+    """
+    Ограниченный LRU-кэш разобранных #base файлов в памяти процесса.
+
+    Ключ включает путь, размер и время изменения файла, поэтому
+    измененный файл разбирается заново. Деревья в кэше общие для всех
+    вызовов и не должны изменяться: ValveFormat копирует их при слиянии.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        """Возвращает дерево или None при промахе."""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Сохраняет дерево, вытесняя давно не использованные."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Очищает кэш и счетчики."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Общий кэш #base файлов для всех экземпляров ValveFormat
+BASE_TREE_CACHE = BaseTreeCache()
@@ -1,9 +1,14 @@
 """
 Парсер для pop файлов.
 """
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
 from dataclasses import dataclass, field
-from .lexer import Token, Lexer
+from .lexer import Token, TokenBuffer, Lexer
+from .parse_cache import ParseCache
+from .template_resolver import TemplateResolver
+
+# Типы токенов простых значений
+_SCALAR_TYPES = frozenset(('INTEGER', 'FLOAT', 'STRING', 'IDENTIFIER'))
 
 @dataclass
 class ASTNode:
@@ -75,6 +80,11 @@ class Mission(ASTNode):
             mission_objectives=data.get("Mission", []),
             custom_attributes=data.get("CustomAttributes", {})
         )
+
+    def template_resolver(self) -> TemplateResolver['Template', Dict[str, Any]]:
+        """Разрешение наследования (Base) шаблонов миссии в итоговые атрибуты."""
+        templates = self.templates or {}
+        return TemplateResolver(templates.get, lambda template: template.base, _merge_template_attributes)
         
 @dataclass
 class Wave(ASTNode):
@@ -103,6 +113,12 @@ class Template(ASTNode):
     base: Optional[str]
     attributes: Dict[str, Any]
 
+def _merge_template_attributes(base: Optional[Dict[str, Any]], template: Template) -> Dict[str, Any]:
+    """Атрибуты шаблона поверх итоговых атрибутов базового."""
+    result = dict(base) if base else {}
+    result.update(template.attributes)
+    return result
+
 @dataclass
 class WaveSpawn(ASTNode):
     """Узел спавна волны."""
@@ -137,11 +153,14 @@ class Tank(ASTNode):
 class Parser:
     """Парсер для pop файлов."""
     
-    def __init__(self):
+    # Версия формы AST; входит в ключ ParseCache
+    PARSER_VERSION = 1
+    
+    def __init__(self, cache: Optional[ParseCache] = None):
+        self.cache = cache
         self.lexer = Lexer()
         self.current_token: Optional[Token] = None
-        self.tokens: List[Token] = []
-        self.pos = 0
+        self.tokens: Iterator[Token] = iter(())
         
     def error(self, message: str = "Invalid syntax") -> None:
         """Вызывает ошибку парсинга."""
@@ -153,11 +172,7 @@ class Parser:
     def eat(self, token_type: str) -> None:
         """Проверяет и переходит к следующему токену."""
         if self.current_token.type == token_type:
-            self.pos += 1
-            if self.pos < len(self.tokens):
-                self.current_token = self.tokens[self.pos]
-            else:
-                self.current_token = None
+            self.current_token = next(self.tokens, None)
         else:
             self.error(
                 f"Expected {token_type}, got {self.current_token.type}"
@@ -165,24 +180,32 @@ class Parser:
             
     def parse_string(self) -> str:
         """Парсит строковое значение."""
-        token = self.current_token
+        value = self.current_token.value
         self.eat('STRING')
-        return token.value
+        return value
         
     def parse_number(self) -> Union[int, float]:
         """Парсит числовое значение."""
         token = self.current_token
         if token.type == 'INTEGER':
+            value = token.value
             self.eat('INTEGER')
-            return token.value
+            return value
         elif token.type == 'FLOAT':
+            value = token.value
             self.eat('FLOAT')
-            return token.value
+            return value
         else:
             self.error("Expected number")
             
     def parse_value(self) -> Any:
         """Парсит значение атрибута."""
+        if self.current_token.type in ('LBRACE', 'LBRACKET'):
+            return self._parse_nested()
+        return self._parse_scalar()
+        
+    def _parse_scalar(self) -> Any:
+        """Парсит простое значение (число, строку или идентификатор)."""
         if self.current_token.type in ('INTEGER', 'FLOAT'):
             return self.parse_number()
         elif self.current_token.type == 'STRING':
@@ -191,41 +214,80 @@ class Parser:
             value = self.current_token.value
             self.eat('IDENTIFIER')
             return value
-        elif self.current_token.type == 'LBRACE':
-            return self.parse_block()
-        elif self.current_token.type == 'LBRACKET':
-            return self.parse_array()
         else:
             self.error("Invalid value")
             
     def parse_array(self) -> List[Any]:
         """Парсит массив значений."""
-        values = []
-        self.eat('LBRACKET')
-        
-        while self.current_token.type != 'RBRACKET':
-            values.append(self.parse_value())
-            
-        self.eat('RBRACKET')
-        return values
+        if self.current_token.type != 'LBRACKET':
+            self.eat('LBRACKET')
+        return self._parse_nested()
         
     def parse_block(self) -> Dict[str, Any]:
         """Парсит блок атрибутов."""
-        attributes = {}
-        self.eat('LBRACE')
+        if self.current_token.type != 'LBRACE':
+            self.eat('LBRACE')
+        return self._parse_nested()
         
-        while self.current_token.type != 'RBRACE':
-            if self.current_token.type != 'IDENTIFIER':
-                self.error("Expected identifier")
-                
-            key = self.current_token.value
-            self.eat('IDENTIFIER')
-            
-            value = self.parse_value()
-            attributes[key] = value
+    def _parse_nested(self) -> Union[Dict[str, Any], List[Any]]:
+        """
+        Парсит блок или массив, начинающийся с текущего токена.
+        
+        Вложенные блоки и массивы разбираются на явном стеке, а не рекурсией,
+        поэтому глубина вложенности не ограничена лимитом рекурсии Python.
+        Структурные токены уже проверены по типу, поэтому поток продвигается
+        напрямую, без eat().
+        """
+        tokens = self.tokens
+        # Родительские контейнеры: (блок или массив, ключ вложенного значения)
+        stack = []
+        container = self._open_container()
+        is_block = type(container) is dict
+        key = None
+        
+        while True:
+            token = self.current_token
+            kind = token.type
             
-        self.eat('RBRACE')
-        return attributes
+            if kind == ('RBRACE' if is_block else 'RBRACKET'):
+                self.current_token = next(tokens, None)
+                value = container
+                if not stack:
+                    return value
+                container, key = stack.pop()
+                is_block = type(container) is dict
+            else:
+                if is_block:
+                    if kind != 'IDENTIFIER':
+                        self.error("Expected identifier")
+                    key = token.value
+                    token = self.current_token = next(tokens, None)
+                    kind = token.type
+                    
+                if kind == 'LBRACE' or kind == 'LBRACKET':
+                    stack.append((container, key))
+                    container = {} if kind == 'LBRACE' else []
+                    is_block = kind == 'LBRACE'
+                    self.current_token = next(tokens, None)
+                    continue
+                    
+                if kind not in _SCALAR_TYPES:
+                    self.error("Invalid value")
+                value = token.value
+                self.current_token = next(tokens, None)
+                
+            if is_block:
+                container[key] = value
+            else:
+                container.append(value)
+                
+    def _open_container(self) -> Union[Dict[str, Any], List[Any]]:
+        """Съедает открывающую скобку и возвращает пустой блок или массив."""
+        if self.current_token.type == 'LBRACE':
+            self.eat('LBRACE')
+            return {}
+        self.eat('LBRACKET')
+        return []
         
     def parse_robot(self, data: Dict[str, Any]) -> Robot:
         """Парсит определение робота."""
@@ -443,14 +505,26 @@ class Parser:
             on_bomb_dropped_output=data.get('OnBombDroppedOutput')
         )
         
-    def parse(self, text: str) -> Mission:
-        """Парсит текст pop файла."""
-        self.tokens = self.lexer.tokenize(text)
-        if not self.tokens:
+    def reset(self, tokens: Iterable[Token]) -> None:
+        """
+        Подготавливает парсер к чтению потока токенов.
+        
+        Парсер держит только текущий токен (просмотр на один вперед),
+        поэтому поток может быть генератором и не храниться целиком.
+        TokenBuffer обходится курсором по индексу: текущим токеном
+        становится сам курсор, и объекты Token не создаются.
+        """
+        if isinstance(tokens, TokenBuffer):
+            self.tokens = tokens.cursor()
+        else:
+            self.tokens = iter(tokens)
+        self.current_token = next(self.tokens, None)
+        if self.current_token is None:
             raise Exception("Empty input")
             
-        self.pos = 0
-        self.current_token = self.tokens[0]
+    def parse_tokens(self, tokens: Iterable[Token]) -> Mission:
+        """Парсит миссию из потока токенов."""
+        self.reset(tokens)
         
         mission = self.parse_mission()
         
@@ -458,3 +532,15 @@ class Parser:
             self.error("Expected end of file")
             
         return mission
+        
+    def parse(self, text: str) -> Mission:
+        """Парсит текст pop файла (через кэш, если он задан)."""
+        if self.cache is None:
+            return self.parse_tokens(self.lexer.iter_tokens(text))
+            
+        key = self.cache.key(f"Parser:{self.PARSER_VERSION}", text.encode('utf-8'))
+        mission = self.cache.get(key)
+        if mission is None:
+            mission = self.parse_tokens(self.lexer.iter_tokens(text))
+            self.cache.put(key, mission)
+        return mission
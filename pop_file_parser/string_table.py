@@ -0,0 +1,108 @@
+"""
+Общая таблица строк для парсеров pop файлов (интернирование).
+
+Pop файлы повторяют одни и те же ключи (TFBot, Class, Skill, Where) и
+значения (spawnbot, Expert, AlwaysCrit) десятки тысяч раз. Парсеры
+пропускают вырезанные строки через таблицу STRINGS, и в дереве разбора
+остается по одному объекту на каждое значение.
+"""
+import sys
+from typing import Dict, Iterable
+
+from .valve_keys import (
+    ATTRIBUTE_BLOCKS, BLOCK_NAMES, OUTPUT_SUFFIXES, QUOTED_KEYS, ROOT_PARAMS
+)
+
+# Строки длиннее MAX_LENGTH (описания, комментарии) в таблицу не попадают
+MAX_LENGTH = 64
+MAX_ENTRIES = 1 << 14
+
+# Ключи схемы pop файла
+SCHEMA_KEYWORDS = ROOT_PARAMS | BLOCK_NAMES | ATTRIBUTE_BLOCKS | QUOTED_KEYS | frozenset((
+    *OUTPUT_SUFFIXES,
+    "WaveSchedule", "Templates", "Parameters", "Attributes", "Item", "Class",
+    "ClassIcon", "Health", "Skill", "Scale", "Tag", "Tags", "Action", "Target",
+    "Param", "Delay", "Where", "TotalCount", "MaxActive", "SpawnCount",
+    "TotalCurrency", "Support", "RandomSpawn", "RandomChoice", "WaitForAllSpawned",
+    "WaitForAllDead", "WaitBetweenSpawns", "WaitBeforeStarting", "WaitWhenDone",
+    "Checkpoint", "StartWaveOutput", "InitWaveOutput", "DoneOutput",
+    "FirstSpawnOutput", "LastSpawnOutput", "OnKilledOutput", "OnBombDroppedOutput",
+    "StartingCurrency", "RespawnWaveTime", "RobotLimit", "EventPopfile",
+    "AddSentryBusterWhenKillCountExceeds", "Objective", "InitialCooldown",
+    "CooldownTime", "BeginAtWave", "RunForThisManyWaves", "DesiredCount",
+    "MaxVisionRange", "WeaponRestrictions", "BehaviorModifiers", "TeleportWhere",
+    "AutoJumpMin", "AutoJumpMax", "Speed", "Skin", "StartingPathTrackNode",
+    "Sound", "Description", "Base",
+))
+
+# Частые значения
+COMMON_VALUES = frozenset((
+    "spawnbot", "spawnbot_mission_sentry_buster", "spawnbot_giant",
+    "spawnbot_invasion", "spawnbot_lower", "spawnbot_right", "spawnbot_left",
+    "Easy", "Normal", "Hard", "Expert",
+    "Scout", "Soldier", "Pyro", "Demoman", "Heavyweapons", "Engineer", "Medic",
+    "Sniper", "Spy",
+    "MiniBoss", "AlwaysCrit", "UseBossHealthBar", "SpawnWithFullCharge",
+    "HoldFireUntilFullReload", "AlwaysFireWeapon", "IgnoreFlag", "BulletImmune",
+    "BlastImmune", "FireImmune", "Aggressive", "SuppressFire", "DisableDodge",
+    "AutoJump", "TeleportToHint", "VaccinatorBullets", "VaccinatorBlast",
+    "VaccinatorFire", "Parachute", "AirChargeOnly", "RetainBuildings",
+    "PrimaryOnly", "SecondaryOnly", "MeleeOnly", "Mobber", "SuicideBomber",
+    "Trigger", "Enable", "Disable", "Kill", "Yes", "No", "tankboss",
+    "0", "1", "2", "3", "4", "5", "10", "20", "25", "50", "100",
+))
+
+
+class StringTable(dict):
+    """
+    Таблица строк: table[s] возвращает общий для таблицы объект, равный s.
+
+    Строки не длиннее max_length добавляются при первом обращении, пока в
+    таблице меньше max_entries строк; остальные возвращаются как есть.
+    Начальные строки (seed) интернируются через sys.intern.
+    """
+
+    def __init__(self, seed: Iterable[str] = (), max_length: int = MAX_LENGTH,
+                 max_entries: int = MAX_ENTRIES):
+        super().__init__()
+        self.max_length = max_length
+        self.max_entries = max_entries
+        self._decoders: Dict[str, '_DecodeTable'] = {}
+        for value in seed:
+            value = sys.intern(value)
+            self[value] = value
+
+    def __missing__(self, value: str) -> str:
+        if len(value) <= self.max_length and len(self) < self.max_entries:
+            self[value] = value
+        return value
+
+    def decoder(self, encoding: str) -> Dict[bytes, str]:
+        """
+        Таблица байты -> строка для байтовых буферов в кодировке encoding:
+        повторяющиеся токены не декодируются заново.
+        """
+        decoder = self._decoders.get(encoding)
+        if decoder is None:
+            decoder = self._decoders[encoding] = _DecodeTable(self, encoding)
+        return decoder
+
+
+class _DecodeTable(dict):
+    """Строки таблицы по байтам токена, дополняемые при первом обращении."""
+
+    def __init__(self, strings: StringTable, encoding: str):
+        super().__init__()
+        self.strings = strings
+        self.encoding = encoding
+
+    def __missing__(self, raw: bytes) -> str:
+        value = self.strings[raw.decode(self.encoding)]
+        # Запоминаем только строки, которые попали в таблицу строк
+        if self.strings.get(value) is value:
+            self[raw] = value
+        return value
+
+
+# Общая таблица строк парсеров (ValveFormat, Lexer)
+STRINGS = StringTable(SCHEMA_KEYWORDS | COMMON_VALUES)
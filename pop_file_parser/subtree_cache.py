@@ -0,0 +1,87 @@
+"""
+Кэш отрисованных поддеревьев для вывода повторяющихся блоков (dump).
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Tuple
+
+from .valve_emitter import EMITTER, Emitter
+
+Lines = Tuple[str, ...]
+
+
+def fingerprint(value: Any) -> str:
+    """
+    Структурный ключ дерева формата Valve.
+
+    repr встроенных типов учитывает порядок ключей и тип значения
+    (True, 1, 1.0 и "1" выводятся по-разному и дают разные ключи) и
+    строится на C без обхода дерева в Python.
+    """
+    return repr(value)
+
+
+class SubtreeCache:
+    """
+    Строки отрисованных блоков (TFBot, Tank, Output), общие для
+    структурно одинаковых блоков.
+
+    Блок отрисовывается один раз; на другом уровне вложенности его строки
+    получают отступ нового уровня вместо прежнего, и готовые строки
+    каждого уровня тоже сохраняются. Кэш ограничен max_entries
+    уникальными блоками (LRU).
+    """
+
+    def __init__(self, max_entries: int = 4096, emitter: Emitter = EMITTER):
+        self.max_entries = max_entries
+        self.emitter = emitter
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, Dict[int, Lines]]' = OrderedDict()
+
+    def lines(self, tag: str, data: Any, level: int,
+              render: Callable[[Any, int], Iterable[str]]) -> Lines:
+        """
+        Возвращает строки блока data на уровне level.
+
+        Args:
+            tag: Имя блока, входит в ключ кэша
+            data: Содержимое блока
+            level: Уровень вложенности
+            render: Отрисовка render(data, level) при промахе
+        """
+        # Ключ строится по текущему содержимому блока: правки списков и
+        # словарей модели на месте (Item, CharacterAttributes) его меняют
+        key = (tag, fingerprint(data))
+        levels = self._entries.get(key)
+        if levels is None:
+            self.misses += 1
+            result = tuple(render(data, level))
+            self._entries[key] = {level: result}
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return result
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        result = levels.get(level)
+        if result is None:
+            # Переносим строки с уже отрисованного уровня: каждая непустая
+            # строка начинается с отступа своего уровня
+            known, lines = next(iter(levels.items()))
+            pads = self.emitter.pads
+            strip = len(pads[known])
+            pad = pads[level]
+            # Пустая строка - маркер пустого блока, отступ к ней не добавляется
+            result = levels[level] = tuple(
+                pad + line[strip:] if line else line for line in lines
+            )
+        return result
+
+    def clear(self) -> None:
+        """Очищает кэш и счетчики."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,106 @@
+"""
+Разрешение наследования шаблонов роботов (Template) с мемоизацией.
+"""
+from typing import Callable, Dict, Generic, List, Optional, Set, Tuple, TypeVar
+
+S = TypeVar('S')  # Исходный шаблон
+R = TypeVar('R')  # Разрешенный (итоговый) шаблон
+
+
+class TemplateResolver(Generic[S, R]):
+    """
+    Разворачивает цепочки шаблонов (шаблон ссылается на базовый) в
+    итоговые значения.
+
+    Каждый разрешенный шаблон запоминается. Для шаблона хранятся его прямые
+    наследники, поэтому invalidate(name) сбрасывает только name и
+    зависящие от него шаблоны. Цикл наследования или ссылка на
+    неизвестный шаблон дают ValueError. Разрешенные значения общие для всех
+    вызовов и не должны изменяться.
+
+    Args:
+        lookup: Исходный шаблон по имени или None
+        base_of: Имя базового шаблона ("" или None - базового нет)
+        merge: merge(resolved_base, template) - итоговый шаблон;
+            resolved_base равен None у шаблона без базового
+    """
+
+    def __init__(self, lookup: Callable[[str], Optional[S]],
+                 base_of: Callable[[S], Optional[str]],
+                 merge: Callable[[Optional[R], S], R]):
+        self._lookup = lookup
+        self._base_of = base_of
+        self._merge = merge
+        self.hits = 0
+        self.misses = 0
+        self._resolved: Dict[str, R] = {}
+        self._bases: Dict[str, str] = {}
+        self._dependants: Dict[str, Set[str]] = {}
+
+    def resolve(self, name: str) -> R:
+        """Возвращает итоговый шаблон name."""
+        resolved = self._resolved.get(name)
+        if resolved is not None:
+            self.hits += 1
+            return resolved
+        self.misses += 1
+
+        # Поднимаемся по цепочке до корня или уже разрешенного шаблона
+        chain: List[Tuple[str, S]] = []
+        positions: Dict[str, int] = {}
+        base_resolved: Optional[R] = None
+        current = name
+        while True:
+            if current in positions:
+                cycle = [item_name for item_name, _ in chain[positions[current]:]]
+                raise ValueError(f"Circular template inheritance: {' -> '.join(cycle + [current])}")
+            item = self._lookup(current)
+            if item is None:
+                if chain:
+                    raise ValueError(f"Template {current} not found (base of {chain[-1][0]})")
+                raise ValueError(f"Template {current} not found")
+            positions[current] = len(chain)
+            chain.append((current, item))
+            base = self._base_of(item)
+            if not base:
+                break
+            if base in self._resolved:
+                base_resolved = self._resolved[base]
+                break
+            current = base
+
+        # Спускаемся обратно, запоминая каждый шаблон цепочки
+        for item_name, item in reversed(chain):
+            base_resolved = self._resolved[item_name] = self._merge(base_resolved, item)
+            base = self._base_of(item)
+            if base:
+                self._bases[item_name] = base
+                self._dependants.setdefault(base, set()).add(item_name)
+        return base_resolved
+
+    def resolve_item(self, item: S) -> R:
+        """Итоговое значение шаблона или робота, не хранящегося по имени."""
+        base = self._base_of(item)
+        return self._merge(self.resolve(base) if base else None, item)
+
+    def invalidate(self, name: str) -> None:
+        """Сбрасывает шаблон name и все шаблоны, наследующие его."""
+        stack = [name]
+        while stack:
+            current = stack.pop()
+            self._resolved.pop(current, None)
+            base = self._bases.pop(current, None)
+            if base is not None:
+                self._dependants.get(base, set()).discard(current)
+            stack.extend(self._dependants.pop(current, ()))
+
+    def clear(self) -> None:
+        """Сбрасывает все разрешенные шаблоны и счетчики."""
+        self._resolved.clear()
+        self._bases.clear()
+        self._dependants.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._resolved)
@@ -0,0 +1,250 @@
+"""
+Моделирование хода волны: когда стартуют WaveSpawn, сколько роботов живо
+в каждый момент и когда волна заканчивается.
+"""
+import heapq
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .models.mission_info import MissionInfo
+from .models.tank import Tank
+from .models.wave import Wave
+from .models.wave_spawn import WaveSpawn
+
+ROBOT_LIMIT = 22
+
+# Виды событий: при равном времени гибель обрабатывается раньше попытки
+# спавна, чтобы освободившиеся места сразу были доступны
+_DEATH = 0
+_READY = 1
+
+
+@dataclass
+class SpawnSchedule:
+    """Расписание одного WaveSpawn (None - событие не наступило)."""
+    name: str
+    support: bool = False
+    start: Optional[float] = None        # начало спавна, с учетом WaitBeforeStarting
+    first_spawn: Optional[float] = None
+    all_spawned: Optional[float] = None
+    all_dead: Optional[float] = None
+    spawned: int = 0
+
+
+@dataclass
+class WaveTimeline:
+    """
+    Результат моделирования волны.
+
+    Число живых роботов - ступенчатая функция: после момента times[i] и до
+    times[i + 1] живо alive[i] роботов.
+    """
+    spawns: List[SpawnSchedule]
+    times: array = field(default_factory=lambda: array('d'))
+    alive: array = field(default_factory=lambda: array('l'))
+    end: Optional[float] = None  # None - волна не завершается
+
+    def alive_at(self, moment: float) -> int:
+        """Число живых роботов в момент moment."""
+        index = bisect_right(self.times, moment)
+        return self.alive[index - 1] if index else 0
+
+    @property
+    def peak(self) -> int:
+        """Наибольшее число одновременно живых роботов."""
+        return max(self.alive, default=0)
+
+    @property
+    def stalled(self) -> List[str]:
+        """Имена обязательных WaveSpawn, которые не завершились."""
+        return [spawn.name for spawn in self.spawns if not spawn.support and spawn.all_dead is None]
+
+
+class _Spawner:
+    """Состояние WaveSpawn во время моделирования."""
+    __slots__ = ('model', 'schedule', 'remaining', 'active', 'group', 'lifetime',
+                 'counts', 'waiting')
+
+    def __init__(self, model: WaveSpawn, lifetime: float, tank_lifetime: float):
+        self.model = model
+        self.schedule = SpawnSchedule(model.name, support=model.support)
+        # Поддержка (Support 1) спавнится до конца волны, Support Limited -
+        # только TotalCount роботов
+        infinite = model.support and not model.support_limited
+        self.remaining = float('inf') if infinite else model.total_count
+        self.active = 0
+        squad = model.squad
+        self.group = model.spawn_count or (len(squad) if len(squad) > 1 else 1)
+        is_tank = any(isinstance(bot, Tank) for bot in squad)
+        self.lifetime = tank_lifetime if is_tank else lifetime
+        # Танки не занимают слоты роботов
+        self.counts = not is_tank
+        self.waiting = False
+
+    @property
+    def spawned_all(self) -> bool:
+        return self.schedule.all_spawned is not None
+
+    @property
+    def done(self) -> bool:
+        return self.schedule.all_dead is not None
+
+
+class TimelineSimulator:
+    """
+    Моделирует волны по событиям спавна и гибели роботов.
+
+    Время жизни робота задается параметром lifetime (для танков -
+    tank_lifetime): pop файл не описывает, как быстро игроки убивают роботов.
+    Стоимость моделирования пропорциональна числу групп спавна, а не
+    длительности волны.
+    """
+
+    def __init__(self, robot_limit: int = ROBOT_LIMIT, lifetime: float = 10.0,
+                 tank_lifetime: float = 60.0, horizon: float = 3600.0):
+        """
+        Args:
+            robot_limit: Максимум одновременно живых роботов (RobotLimit)
+            lifetime: Время жизни робота, секунды (больше нуля)
+            tank_lifetime: Время жизни танка, секунды (больше нуля)
+            horizon: Предел моделирования; волна, не закончившаяся к этому
+                     моменту, считается незавершенной
+        """
+        # Робот с нулевым временем жизни умирает в момент спавна, и
+        # бесконечная поддержка спавнится заново, не сдвигая время
+        if not (lifetime > 0 and tank_lifetime > 0):
+            raise ValueError(f"lifetime must be positive, got {lifetime}, {tank_lifetime}")
+        if horizon + min(lifetime, tank_lifetime) == horizon:
+            raise ValueError(f"lifetime is too small to advance time up to horizon {horizon}")
+        self.robot_limit = robot_limit
+        self.lifetime = lifetime
+        self.tank_lifetime = tank_lifetime
+        self.horizon = horizon
+
+    def simulate_mission(self, mission: MissionInfo) -> List[WaveTimeline]:
+        """Моделирует все волны миссии с ее RobotLimit."""
+        simulator = TimelineSimulator(mission.robot_limit, self.lifetime,
+                                      self.tank_lifetime, self.horizon)
+        return [simulator.simulate(wave) for wave in mission.waves]
+
+    def simulate(self, wave: Wave) -> WaveTimeline:
+        """Моделирует одну волну."""
+        spawners = [_Spawner(spawn, self.lifetime, self.tank_lifetime) for spawn in wave.wave_spawns]
+        by_name: Dict[str, List[_Spawner]] = {}
+        for spawner in spawners:
+            by_name.setdefault(spawner.model.name, []).append(spawner)
+
+        timeline = WaveTimeline([spawner.schedule for spawner in spawners])
+        events: list = []
+        sequence = 0
+        alive = 0
+        blocked: List[_Spawner] = []
+        pending = list(spawners)
+        required = sum(1 for spawner in spawners if not spawner.model.support)
+
+        def push(moment: float, kind: int, spawner: _Spawner, count: int = 0) -> None:
+            nonlocal sequence
+            sequence += 1
+            heapq.heappush(events, (moment, kind, sequence, spawner, count))
+
+        def record(moment: float) -> None:
+            if timeline.times and timeline.times[-1] == moment:
+                timeline.alive[-1] = alive
+            else:
+                timeline.times.append(moment)
+                timeline.alive.append(alive)
+
+        def satisfied(name: str, check: str) -> bool:
+            # Ожидание несуществующего WaveSpawn не блокирует старт
+            return all(getattr(other, check) for other in by_name.get(name, ()))
+
+        def finish(spawner: _Spawner, moment: float) -> None:
+            nonlocal required
+            spawner.schedule.all_dead = moment
+            if not spawner.model.support:
+                required -= 1
+
+        def finish_empty(spawner: _Spawner, moment: float) -> None:
+            # WaveSpawn без роботов (TotalCount 0) завершается сразу при старте
+            spawner.schedule.all_spawned = moment
+            finish(spawner, moment)
+
+        def start_ready(moment: float) -> None:
+            # Завершение пустого WaveSpawn может открыть ожидающие его, поэтому
+            # проверка повторяется; все открывшиеся стартуют от moment
+            changed = True
+            while changed:
+                changed = False
+                for spawner in list(pending):
+                    model = spawner.model
+                    if model.wait_for_all_spawned and not satisfied(model.wait_for_all_spawned, 'spawned_all'):
+                        continue
+                    if model.wait_for_all_dead and not satisfied(model.wait_for_all_dead, 'done'):
+                        continue
+                    pending.remove(spawner)
+                    start = moment + model.wait_before_starting
+                    spawner.schedule.start = start
+                    if spawner.remaining == 0 and start == moment:
+                        finish_empty(spawner, moment)
+                        changed = True
+                    else:
+                        # Пустой WaveSpawn с WaitBeforeStarting завершится
+                        # событием в момент start
+                        push(start, _READY, spawner)
+
+        start_ready(0.0)
+        record(0.0)
+        while events and required:
+            moment, kind, _, spawner, count = heapq.heappop(events)
+            if moment > self.horizon:
+                break
+            if kind == _DEATH:
+                spawner.active -= count
+                if spawner.counts:
+                    alive -= count
+                record(moment)
+                if spawner.remaining == 0 and spawner.active == 0 and not spawner.done:
+                    finish(spawner, moment)
+                    start_ready(moment)
+                for waiting in blocked:
+                    waiting.waiting = False
+                    push(moment, _READY, waiting)
+                blocked.clear()
+                continue
+
+            if spawner.remaining == 0:
+                finish_empty(spawner, moment)
+                start_ready(moment)
+                continue
+
+            model = spawner.model
+            size = min(spawner.group, spawner.remaining)
+            if ((model.max_active and spawner.active + size > model.max_active)
+                    or (spawner.counts and alive + size > self.robot_limit)):
+                if not spawner.waiting:
+                    spawner.waiting = True
+                    blocked.append(spawner)
+                continue
+
+            spawner.remaining -= size
+            spawner.active += size
+            if spawner.counts:
+                alive += size
+            record(moment)
+            schedule = spawner.schedule
+            schedule.spawned += size
+            if schedule.first_spawn is None:
+                schedule.first_spawn = moment
+            push(moment + spawner.lifetime, _DEATH, spawner, size)
+            if spawner.remaining:
+                push(moment + model.wait_between_spawns, _READY, spawner)
+            else:
+                schedule.all_spawned = moment
+                start_ready(moment)
+
+        if not required:
+            timeline.end = max((spawner.schedule.all_dead for spawner in spawners
+                                if not spawner.model.support), default=0.0)
+        return timeline
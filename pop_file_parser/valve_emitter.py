@@ -0,0 +1,52 @@
+"""
+Кэш отступов и повторяющихся фрагментов строк для вывода формата Valve.
+"""
+from typing import Callable, Dict, Hashable, Tuple
+
+# Политика отступов: один символ табуляции на уровень вложенности
+INDENT = "\t"
+
+
+class _FragmentTable(dict):
+    """
+    Таблица строк, вычисляемых один раз при первом обращении.
+
+    При переполнении (max_entries записей) таблица очищается: уровни
+    вложенности и имена блоков обычного файла в нее помещаются, а поток
+    уникальных ключей не накапливается в общем EMITTER.
+    """
+
+    def __init__(self, build: Callable[..., str], max_entries: int = 4096):
+        super().__init__()
+        self._build = build
+        self.max_entries = max_entries
+
+    def __missing__(self, key: Hashable) -> str:
+        if len(self) >= self.max_entries:
+            self.clear()
+        fragment = self[key] = self._build(key)
+        return fragment
+
+
+class Emitter:
+    """
+    Готовые строки отступов и скобок для каждого уровня вложенности.
+
+    pads[level] - отступ уровня, opens[level] / closes[level] - строки
+    "{" и "}" с отступом, headers[level, key] - строка имени блока.
+    Строки строятся один раз и переиспользуются, поэтому форматтер не
+    умножает отступ на каждую выводимую строку.
+    """
+
+    def __init__(self, unit: str = INDENT, max_entries: int = 4096):
+        self.unit = unit
+        self.pads: Dict[int, str] = _FragmentTable(lambda level: unit * level, max_entries)
+        self.opens: Dict[int, str] = _FragmentTable(lambda level: self.pads[level] + "{", max_entries)
+        self.closes: Dict[int, str] = _FragmentTable(lambda level: self.pads[level] + "}", max_entries)
+        self.headers: Dict[Tuple[int, str], str] = _FragmentTable(
+            lambda level_key: self.pads[level_key[0]] + level_key[1], max_entries
+        )
+
+
+# Общий эмиттер форматтеров ValveFormat
+EMITTER = Emitter()
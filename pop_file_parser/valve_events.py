@@ -0,0 +1,113 @@
+"""
+Событийный (SAX-стиль) разбор pop файлов без построения дерева.
+
+Обработчики передаются в ValveFormat.scan_buffer / ValveFormat.scan_file.
+"""
+from typing import Dict, List, Optional
+
+
+class ValveHandler:
+    """
+    Базовый обработчик событий сканера.
+
+    Все методы ничего не делают; наследники переопределяют только нужные.
+    """
+
+    def start_block(self, key: str) -> None:
+        """Начало блока "key { ..."."""
+
+    def key_value(self, key: str, value: str) -> None:
+        """Пара ключ-значение внутри текущего блока."""
+
+    def end_block(self) -> None:
+        """Закрывающая скобка текущего блока."""
+
+    def base_file(self, path: str) -> None:
+        """Директива #base."""
+
+
+class BlockPathHandler(ValveHandler):
+    """Обработчик, отслеживающий путь из имен открытых блоков."""
+
+    def __init__(self) -> None:
+        self.path: List[str] = []
+
+    def start_block(self, key: str) -> None:
+        self.path.append(key)
+
+    def end_block(self) -> None:
+        self.path.pop()
+
+
+class WaveSummaryHandler(BlockPathHandler):
+    """
+    Сводка по волнам: число волн, WaveSpawn в каждой волне и
+    используемые шаблоны роботов.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.base_files: List[str] = []
+        self.wave_spawns: List[int] = []  # Число WaveSpawn по волнам
+        self.templates_defined: List[str] = []
+        self.templates_used: Dict[str, int] = {}  # Шаблон -> число ссылок
+
+    @property
+    def wave_count(self) -> int:
+        """Количество волн в WaveSchedule."""
+        return len(self.wave_spawns)
+
+    def start_block(self, key: str) -> None:
+        path = self.path
+        if len(path) == 1 and key == "Wave":
+            self.wave_spawns.append(0)
+        elif len(path) == 2 and key == "WaveSpawn" and path[1] == "Wave":
+            self.wave_spawns[-1] += 1
+        elif len(path) == 2 and path[1] == "Templates":
+            self.templates_defined.append(key)
+        path.append(key)
+
+    def key_value(self, key: str, value: str) -> None:
+        if key == "Template":
+            self.templates_used[value] = self.templates_used.get(value, 0) + 1
+
+    def base_file(self, path: str) -> None:
+        self.base_files.append(path)
+
+
+def _currency(value: str) -> Optional[int]:
+    """Значение валюты целым числом ("100.0" -> 100); None, если не число."""
+    try:
+        return int(float(value))
+    except (ValueError, OverflowError):
+        return None
+
+
+class CurrencySummaryHandler(BlockPathHandler):
+    """Сводка по валюте: стартовая валюта и TotalCurrency по волнам."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.starting_currency = 0
+        self.wave_currency: List[int] = []  # Сумма TotalCurrency по волнам
+
+    @property
+    def total_currency(self) -> int:
+        """Вся валюта, выдаваемая волнами (без стартовой)."""
+        return sum(self.wave_currency)
+
+    def start_block(self, key: str) -> None:
+        if len(self.path) == 1 and key == "Wave":
+            self.wave_currency.append(0)
+        self.path.append(key)
+
+    def key_value(self, key: str, value: str) -> None:
+        path = self.path
+        if key == "TotalCurrency" and len(path) == 3 and path[2] == "WaveSpawn":
+            currency = _currency(value)
+            if path[1] == "Wave" and currency is not None:
+                self.wave_currency[-1] += currency
+        elif key == "StartingCurrency" and len(path) == 1:
+            currency = _currency(value)
+            if currency is not None:
+                self.starting_currency = currency
@@ -0,0 +1,101 @@
+"""
+Классификация ключей формата Valve для форматирования (dump).
+
+Признаки ключа вычисляются один раз и хранятся в таблице KEY_CLASSES,
+общей для valve_parser и valve_parser_fixed; форматтеры выбирают способ
+вывода блока по KeyClass.strategy через свои словари диспетчеризации.
+"""
+from typing import Iterable, NamedTuple
+
+# Способы вывода блока (значения-словаря)
+BLOCK = 0            # Обычный вложенный блок
+OUTPUT = 1           # Output блок (OnKilledOutput, DoneOutput, ...)
+PARAMETERS = 2       # Блок Parameters
+ATTRIBUTES = 3       # Attributes: значения выводятся строками "Attributes X"
+ATTRIBUTE_BLOCK = 4  # CharacterAttributes / ItemAttributes
+
+# Корневые параметры: булевы значения выводятся как Yes/No
+ROOT_PARAMS = frozenset((
+    "FixedRespawnWaveTime", "CanBotsAttackWhileInSpawnRoom",
+    "AddSentryBusterWhenDamageDealtExceeds", "Advanced",
+))
+
+# Имена блоков, которые выводятся без кавычек
+BLOCK_NAMES = frozenset((
+    "WaveSchedule", "Wave", "WaveSpawn", "Tank", "TFBot",
+    "Mission", "CharacterAttributes", "ItemAttributes", "Squad",
+))
+
+OUTPUT_SUFFIXES = (
+    "Output", "WaveOutput", "SpawnOutput", "DeathOutput",
+    "BombDroppedOutput", "KilledOutput",
+)
+
+ATTRIBUTE_BLOCKS = frozenset(("CharacterAttributes", "ItemAttributes"))
+
+# Строковые значения этих ключей всегда в кавычках (valve_parser_fixed)
+QUOTED_KEYS = frozenset(("Where", "Name", "Template", "ItemName"))
+
+# Часто повторяющиеся блоки, отрисовка которых кэшируется (SubtreeCache)
+MEMO_BLOCKS = frozenset(("TFBot", "Tank"))
+
+
+class KeyClass(NamedTuple):
+    """Признаки ключа, нужные при форматировании."""
+    strategy: int      # Способ вывода блока
+    root_param: bool   # Корневой параметр (Yes/No)
+    block_name: bool   # Имя блока без кавычек
+    item_name: bool    # ItemName: числа тоже в кавычках
+    quoted: bool       # Строковое значение всегда в кавычках
+    memoize: bool      # Отрисовка содержимого блока кэшируется
+
+
+def classify_key(key: str) -> KeyClass:
+    """Вычисляет признаки ключа (без кэша, см. KEY_CLASSES)."""
+    if key.endswith(OUTPUT_SUFFIXES):
+        strategy = OUTPUT
+    elif key == "Parameters":
+        strategy = PARAMETERS
+    elif key == "Attributes":
+        strategy = ATTRIBUTES
+    elif key in ATTRIBUTE_BLOCKS:
+        strategy = ATTRIBUTE_BLOCK
+    else:
+        strategy = BLOCK
+    return KeyClass(
+        strategy=strategy,
+        root_param=key in ROOT_PARAMS,
+        block_name=key in BLOCK_NAMES,
+        item_name=key == "ItemName",
+        quoted=key in QUOTED_KEYS,
+        memoize=key in MEMO_BLOCKS,
+    )
+
+
+class _KeyTable(dict):
+    """
+    Таблица ключ -> KeyClass, дополняемая при первом обращении.
+
+    Ключи схемы (schema) хранятся всегда. Прочие ключи (имена шаблонов,
+    произвольные блоки) добавляются, пока в таблице меньше max_entries
+    записей; при переполнении таблица возвращается к ключам схемы, так
+    что поток уникальных ключей не растит ее без предела. Поиск по
+    таблице остается обычным обращением к dict.
+    """
+
+    def __init__(self, schema: Iterable[str] = (), max_entries: int = 4096):
+        super().__init__((key, classify_key(key)) for key in schema)
+        self._schema = dict(self)
+        self.max_entries = max(max_entries, len(self._schema) + 1)
+
+    def __missing__(self, key: str) -> KeyClass:
+        if len(self) >= self.max_entries:
+            self.clear()
+            self.update(self._schema)
+        key_class = self[key] = classify_key(key)
+        return key_class
+
+
+KEY_CLASSES = _KeyTable(ROOT_PARAMS | BLOCK_NAMES | ATTRIBUTE_BLOCKS | QUOTED_KEYS | MEMO_BLOCKS | {
+    "Parameters", "Attributes", *OUTPUT_SUFFIXES,
+})
@@ -1,167 +1,438 @@
 """
 Парсер для формата файлов Valve (используется в Source engine).
 """
-from typing import Any, Dict, List, Union
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple,
+    Union
+)
+from pathlib import Path
+import copy
+import mmap
 import re
+from .parse_cache import ParseCache, BaseTreeCache, BASE_TREE_CACHE
+from .string_table import STRINGS, StringTable
+from .subtree_cache import SubtreeCache
+from .valve_emitter import Emitter, EMITTER
+from .valve_keys import (
+    KEY_CLASSES, BLOCK, OUTPUT, PARAMETERS, ATTRIBUTES, ATTRIBUTE_BLOCK
+)
+from .valve_scanner import (
+    ValveScanner, Buffer, TOKEN_STRING, TOKEN_WORD, TOKEN_LBRACE, TOKEN_RBRACE,
+    TOKEN_BASE, TOKEN_EOF
+)
+
+# Селектор секции: "Templates" или "Wave[6]" (индекс с нуля)
+_SECTION_RE = re.compile(r'([^\s\[\]]+)(?:\[(\d+)\])?$')
+
+# Служебные ключи дерева, не выводимые как обычные значения
+_SPECIAL_KEYS = frozenset(("__comment", "__base_files", "__attrs"))
+
+# Пропущенная секция: (селектор, начало, конец) - смещения в буфере от ключа
+# блока до его закрывающей скобки включительно
+SkippedRegion = Tuple[str, int, int]
+
+# Значение subtree_cache по умолчанию: собственный кэш экземпляра
+_OWN_SUBTREE_CACHE: Any = object()
 
 class ValveFormat:
     """Парсер формата Valve."""
     
-    def __init__(self):
-        self.text = ""
-        self.pos = 0
-        self.line = 1
-        self.column = 1
-        self.comments = {}  # Хранение комментариев для блоков
-        
-    def parse_file(self, file_path: str) -> Dict[str, Any]:
-        """Парсит файл формата Valve."""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            self.text = f.read()
-            
-        # Сохраняем комментарии перед блоками
-        self._extract_block_comments()
-        
-        # Удаляем однострочные комментарии
-        self.text = re.sub(r'//.*?\n', '\n', self.text)
-        # Удаляем многострочные комментарии
-        self.text = re.sub(r'/\*.*?\*/', '', self.text, flags=re.DOTALL)
-        
-        # Обрабатываем директивы #base
-        base_files = []
-        for match in re.finditer(r'#base\s+"?([^"\n]+)"?', self.text):
-            base_files.append(match.group(1))
-            
-        # Удаляем директивы #base из текста
-        self.text = re.sub(r'#base\s+"?[^"\n]+"?\s*\n', '', self.text)
+    # Отступы и скобки при выводе (dump)
+    emitter: Emitter = EMITTER
+    
+    # Таблица строк для ключей и значений дерева разбора (None - без нее)
+    strings: Optional[StringTable] = STRINGS
+    
+    # Версия формы дерева разбора; входит в ключ ParseCache
+    PARSER_VERSION = 1
+    
+    def __init__(self, cache: Optional[ParseCache] = None,
+                 base_cache: Optional[BaseTreeCache] = None,
+                 subtree_cache: Optional[SubtreeCache] = _OWN_SUBTREE_CACHE):
+        """
+        Args:
+            cache: Дисковый кэш результатов parse_file
+            base_cache: Кэш разобранных #base файлов (по умолчанию общий
+                        для процесса)
+            subtree_cache: Кэш отрисовки повторяющихся блоков TFBot, Tank
+                           и Output при dump (по умолчанию свой у экземпляра,
+                           None - без кэша)
+        """
+        self.cache = cache
+        self.base_cache = BASE_TREE_CACHE if base_cache is None else base_cache
+        if subtree_cache is _OWN_SUBTREE_CACHE:
+            subtree_cache = SubtreeCache()
+        self.subtree_cache = subtree_cache
+    
+    def parse_file(self, file_path: str, use_mmap: bool = False,
+                   comments: bool = True) -> Dict[str, Any]:
+        """
+        Парсит файл формата Valve.
+        
+        Args:
+            file_path: Путь к файлу
+            use_mmap: Отобразить файл в память и сканировать байты напрямую,
+                      декодируя только сохраняемые ключи и значения
+            comments: Сохранять комментарии в ключах "__comment" блоков
+        """
+        if self.cache is not None:
+            # Содержимое все равно читается целиком ради хэша
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            key = self.cache.key(
+                f"ValveFormat:{self.PARSER_VERSION}:comments={comments}", data
+            )
+            result = self.cache.get(key)
+            if result is None:
+                result = self.parse_buffer(data, comments=comments)
+                self.cache.put(key, result)
+            return result
             
-        self.pos = 0
-        self.line = 1
-        self.column = 1
-
-        self._skip_whitespace()
-        if self.pos < len(self.text) and self.text[self.pos] != '{':
-            root_key = self._parse_string()
-            self._skip_whitespace()
-            if self.pos < len(self.text) and self.text[self.pos] == '{':
-                result = {root_key: self._parse_block()}
-            else:
-                raise ValueError(f"Expected '{{' after root key at line {self.line}, column {self.column}")
-        else:
-            result = self._parse_block()
+        if use_mmap:
+            with open(file_path, 'rb') as f:
+                # Пустой файл нельзя отобразить в память
+                if not f.seek(0, 2):
+                    return self.parse_buffer(b'', comments=comments)
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return self.parse_buffer(mapped, comments=comments)
+                    
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return self.parse_buffer(f.read(), comments=comments)
+    
+    def parse_file_with_bases(self, file_path: str, search_path: Sequence[str] = (),
+                              comments: bool = True) -> Dict[str, Any]:
+        """
+        Парсит файл и подключает его директивы #base.
+        
+        Ключи #base файлов добавляются в дерево рекурсивно, если их там
+        еще нет: значения самого файла важнее подключенных, а первый
+        #base важнее следующих. "__base_files" сохраняет список директив
+        файла. Разобранные #base файлы берутся из base_cache, так что
+        общие файлы при загрузке набора миссий разбираются один раз.
+        
+        Args:
+            file_path: Путь к файлу
+            search_path: Каталоги поиска #base после каталога
+                         подключающего файла
+            comments: Сохранять комментарии в ключах "__comment" блоков
+        
+        Raises:
+            FileNotFoundError: #base файл не найден
+            ValueError: Циклическое подключение #base
+        """
+        path = Path(file_path).resolve()
+        result = self.parse_file(str(path), comments=comments)
+        self._merge_bases(result, result.get("__base_files", ()), path,
+                          search_path, comments, [path])
+        return result
+        
+    def find_base_file(self, name: str, directory: Union[str, Path],
+                       search_path: Sequence[str] = ()) -> Path:
+        """Ищет #base файл в каталоге подключающего файла, затем в search_path."""
+        for candidate_dir in (directory, *search_path):
+            candidate = Path(candidate_dir) / name
+            if candidate.is_file():
+                return candidate.resolve()
+        raise FileNotFoundError(f"#base file not found: {name}")
+        
+    def _merge_bases(self, tree: Dict[str, Any], base_names: Sequence[str], path: Path,
+                     search_path: Sequence[str], comments: bool, chain: List[Path]) -> None:
+        """Добавляет в дерево ключи #base файлов, подключенных из path."""
+        for name in base_names:
+            base_path = self.find_base_file(name, path.parent, search_path)
+            if base_path in chain:
+                cycle = " -> ".join(str(p) for p in chain + [base_path])
+                raise ValueError(f"Circular #base include: {cycle}")
+                
+            base_tree = self._load_base(base_path, comments)
+            self._merge_tree(tree, base_tree)
+            # Вложенные #base ищутся относительно подключенного файла
+            chain.append(base_path)
+            self._merge_bases(tree, base_tree.get("__base_files", ()), base_path,
+                              search_path, comments, chain)
+            chain.pop()
+                
+    def _load_base(self, path: Path, comments: bool) -> Dict[str, Any]:
+        """Возвращает разобранный #base файл из общего LRU-кэша."""
+        stat = path.stat()
+        key = (str(path), stat.st_mtime_ns, stat.st_size, comments)
+        tree = self.base_cache.get(key)
+        if tree is None:
+            tree = self.parse_file(str(path), comments=comments)
+            self.base_cache.put(key, tree)
+        return tree
+        
+    def _merge_tree(self, target: Dict[str, Any], source: Dict[str, Any]) -> None:
+        """Копирует в target ключи source, которых там нет."""
+        for key, value in source.items():
+            if key in ("__base_files", "__comment"):
+                continue
+            if key not in target:
+                target[key] = copy.deepcopy(value)
+            elif isinstance(target[key], dict) and isinstance(value, dict):
+                self._merge_tree(target[key], value)
+                
+    def parse_buffer(self, buffer: Buffer, encoding: str = 'utf-8',
+                     comments: bool = True) -> Dict[str, Any]:
+        """
+        Парсит текст или байтовый буфер (bytes, mmap) за один проход.
         
-        # Добавляем комментарии к блокам
-        self._add_comments_to_result(result)
+        Комментарии пропускаются сканером и, если comments включен, сразу
+        прикрепляются к своему блоку: комментарий перед ключом вложенного
+        блока попадает в "__comment" этого блока, остальные - в "__comment"
+        блока, внутри которого они написаны. Директивы #base собираются
+        в "__base_files" по ходу сканирования.
+        """
+        scanner = ValveScanner(buffer, encoding, capture_comments=comments, strings=self.strings)
+        base_files: List[str] = []
         
-        # Добавляем информацию о базовых файлах
+        kind, start, end = self._next_token(scanner, base_files)
+        if kind == TOKEN_LBRACE:
+            result = self._parse_block(scanner, base_files, scanner.take_comments())
+        elif kind > TOKEN_WORD:
+            line, column = scanner.location(start)
+            raise ValueError(f"Expected '{{' at line {line}, column {column}")
+        else:
+            root_key = scanner.decode(start, end)
+            root_comments = scanner.take_comments()
+            kind, start, end = self._next_token(scanner, base_files)
+            if kind != TOKEN_LBRACE:
+                line, column = scanner.location(start)
+                raise ValueError(f"Expected '{{' after root key at line {line}, column {column}")
+            root_comments += scanner.take_comments()
+            result = {root_key: self._parse_block(scanner, base_files, root_comments)}
+            
         if base_files:
             result["__base_files"] = base_files
             
         return result
-    
-    def _extract_block_comments(self):
-        """Извлекает комментарии перед блоками."""
-        # Ищем комментарии перед каждым блоком
-        block_pattern = re.compile(r'(?:/\*(?P<multi>.*?)\*/\s*|\s*(?P<single>//[^\n]*\n)+\s*)(?P<key>[A-Za-z][A-Za-z0-9_]*)\s*{', re.DOTALL)
-        
-        for match in block_pattern.finditer(self.text):
-            comment = match.group('multi') or match.group('single')
-            key = match.group('key')
-            if comment:
-                # Очищаем комментарий от /*, */, // и лишних пробелов
-                comment = re.sub(r'/\*|\*/|//|\n\s*', ' ', comment).strip()
-                self.comments[key] = comment
-
-    def _skip_whitespace(self):
-        """Пропускает пробельные символы."""
-        while (
-            self.pos < len(self.text) and 
-            self.text[self.pos].isspace()
-        ):
-            if self.text[self.pos] == '\n':
-                self.line += 1
-                self.column = 1
+        
+    def parse_sections(self, buffer: Buffer, sections: Iterable[str],
+                       encoding: str = 'utf-8', comments: bool = True
+                       ) -> Tuple[Dict[str, Any], List[SkippedRegion]]:
+        """
+        Выборочно парсит блоки верхнего уровня внутри корневого блока.
+        
+        Строятся только блоки, подходящие под sections: "Templates" выбирает
+        все блоки с таким именем, "Wave[6]" - седьмой блок Wave. Простые
+        значения корневого блока (StartingCurrency и т.п.) сохраняются
+        всегда. Остальные блоки пропускаются подсчетом скобок без
+        декодирования и построения словарей.
+        
+        Returns:
+            Дерево в формате parse_buffer и список пропущенных секций
+            (селектор, начало, конец). Смещения указывают в buffer (в байтах
+            для bytes/mmap, в символах для str), так что buffer[начало:конец]
+            - исходный текст блока для записи без изменений.
+        """
+        names = set()
+        indexed = set()
+        for section in sections:
+            match = _SECTION_RE.match(section)
+            if not match:
+                raise ValueError(f"Invalid section selector: {section!r}")
+            if match.group(2) is None:
+                names.add(match.group(1))
             else:
-                self.column += 1
-            self.pos += 1
+                indexed.add((match.group(1), int(match.group(2))))
+                
+        scanner = ValveScanner(buffer, encoding, capture_comments=comments, strings=self.strings)
+        base_files: List[str] = []
+        skipped: List[SkippedRegion] = []
+        
+        kind, start, end = self._next_token(scanner, base_files)
+        root_key = None
+        if kind > TOKEN_WORD and kind != TOKEN_LBRACE:
+            line, column = scanner.location(start)
+            raise ValueError(f"Expected '{{' at line {line}, column {column}")
+        if kind != TOKEN_LBRACE:
+            root_key = scanner.decode(start, end)
+            kind, start, end = self._next_token(scanner, base_files)
+            if kind != TOKEN_LBRACE:
+                line, column = scanner.location(start)
+                raise ValueError(f"Expected '{{' after root key at line {line}, column {column}")
+                
+        result: Dict[str, Any] = {}
+        block_comments = scanner.take_comments()
+        counts: Dict[str, int] = {}
+        current_key = None
+        key_start = 0
+        key_comments: List[str] = []
+        
+        while True:
+            gap_start = scanner.pos
+            kind, start, end = self._next_token(scanner, base_files)
             
-    def _parse_string(self) -> str:
-        """Парсит строковое значение."""
-        start = self.pos
-        if self.text[self.pos] == '"':
-            # Строка в кавычках
-            self.pos += 1
-            start = self.pos
-            while self.pos < len(self.text) and self.text[self.pos] != '"':
-                if self.text[self.pos] == '\n':
-                    self.line += 1
-                    self.column = 1
+            if kind <= TOKEN_WORD:
+                if current_key is None:
+                    current_key = scanner.decode(start, end)
+                    # Регион начинается с открывающей кавычки ключа или с
+                    # комментариев перед ним: они принадлежат блоку
+                    key_start = start - 1 if kind == TOKEN_STRING else start
+                    key_comments = scanner.take_comments()
+                    if key_comments:
+                        key_start = scanner.comment_start(gap_start, key_start)
+                    continue
+                value = scanner.decode(start, end)
+                block_comments += key_comments + scanner.take_comments()
+                
+            elif kind == TOKEN_LBRACE:
+                if current_key is None:
+                    line, column = scanner.location(start)
+                    raise ValueError(f"Expected key at line {line}, column {column}")
+                    
+                index = counts.get(current_key, 0)
+                counts[current_key] = index + 1
+                key_comments += scanner.take_comments()
+                if current_key in names or (current_key, index) in indexed:
+                    value = self._parse_block(scanner, base_files, key_comments)
                 else:
-                    self.column += 1
-                self.pos += 1
-            end = self.pos
-            self.pos += 1
-            return self.text[start:end]
-        else:
-            # Строка без кавычек
-            while (
-                self.pos < len(self.text) and 
-                not self.text[self.pos].isspace() and 
-                self.text[self.pos] not in '{}'
-            ):
-                self.column += 1
-                self.pos += 1
-            return self.text[start:self.pos]
+                    block_end = self._skip_block(scanner, base_files)
+                    skipped.append((f"{current_key}[{index}]", key_start, block_end))
+                    current_key = None
+                    key_comments = []
+                    continue
+                    
+            elif kind == TOKEN_RBRACE:
+                block_comments += key_comments + scanner.take_comments()
+                if block_comments:
+                    result["__comment"] = "\n".join(block_comments)
+                break
+                
+            else:
+                line, column = scanner.location(start)
+                raise ValueError(f"Expected '}}' at line {line}, column {column}")
+                
+            self._add_value(result, current_key, value)
+            current_key = None
+            key_comments = []
             
-    def _parse_value(self) -> Union[str, Dict[str, Any], List[Any]]:
-        """Парсит значение (строку или блок)."""
-        self._skip_whitespace()
-        
-        if self.pos >= len(self.text):
-            raise ValueError(f"Unexpected end of file at line {self.line}, column {self.column}")
+        if root_key is not None:
+            result = {root_key: result}
+        if base_files:
+            result["__base_files"] = base_files
             
-        if self.text[self.pos] == '{':
-            return self._parse_block()
+        return result, skipped
+        
+    def _skip_block(self, scanner: ValveScanner, base_files: List[str]) -> int:
+        """
+        Пропускает блок (после открывающей скобки) подсчетом скобок.
+        
+        Returns:
+            Смещение сразу после закрывающей скобки
+        """
+        next_token = scanner.next_token
+        capture_comments = scanner.capture_comments
+        scanner.capture_comments = False
+        depth = 1
+        
+        while True:
+            kind, start, end = next_token()
+            if kind == TOKEN_RBRACE:
+                depth -= 1
+                if not depth:
+                    scanner.capture_comments = capture_comments
+                    return end
+            elif kind == TOKEN_LBRACE:
+                depth += 1
+            elif kind == TOKEN_BASE:
+                base_files.append(scanner.decode(start, end))
+            elif kind == TOKEN_EOF:
+                line, column = scanner.location(start)
+                raise ValueError(f"Expected '}}' at line {line}, column {column}")
+                
+    def _add_value(self, result: Dict[str, Any], key: str, value: Any) -> None:
+        """Добавляет значение в блок; повторяющийся ключ превращается в массив."""
+        if key in result:
+            if isinstance(result[key], list):
+                result[key].append(value)
+            else:
+                result[key] = [result[key], value]
         else:
-            return self._parse_string()
+            result[key] = value
             
-    def _parse_block(self) -> Dict[str, Any]:
-        """Парсит блок в фигурных скобках."""
-        self._skip_whitespace()
+    def _next_token(self, scanner: ValveScanner, base_files: List[str]):
+        """Возвращает следующий значимый токен, собирая директивы #base."""
+        token = scanner.next_token()
+        while token[0] == TOKEN_BASE:
+            base_files.append(scanner.decode(token[1], token[2]))
+            token = scanner.next_token()
+        return token
         
-        if self.pos >= len(self.text) or self.text[self.pos] != '{':
-            raise ValueError(
-                f"Expected '{{' at line {self.line}, column {self.column}"
-            )
-            
-        self.pos += 1
-        self.column += 1
+    def _parse_block(self, scanner: ValveScanner, base_files: List[str],
+                     comments: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Строит словарь блока из токенов сканера (после открывающей скобки).
         
-        result = {}
+        Вложенные блоки разбираются на явном стеке, а не рекурсией, поэтому
+        глубина вложенности ограничена только памятью.
+        """
+        next_token = scanner.next_token
+        take_comments = scanner.take_comments
+        decode = scanner.decode
+        
+        result: Dict[str, Any] = {}
+        block_comments = list(comments) if comments else []
         current_key = None
-        current_array = []
+        key_comments: List[str] = []
+        # Родительские блоки: (словарь, комментарии, ключ вложенного блока)
+        stack = []
         
-        while self.pos < len(self.text):
-            self._skip_whitespace()
+        while True:
+            kind, start, end = next_token()
             
-            if self.text[self.pos] == '}':
-                self.pos += 1
-                self.column += 1
-                # Если был массив, сохраняем его
-                if current_key and current_array:
-                    result[current_key] = current_array
-                return result
+            if kind <= TOKEN_WORD:
+                # Парсим ключ
+                if not current_key:
+                    current_key = decode(start, end)
+                    if scanner.comments:
+                        key_comments = take_comments()
+                    continue
+                    
+                # Простое значение: комментарии остаются в текущем блоке
+                value = decode(start, end)
+                if scanner.comments:
+                    key_comments += take_comments()
+                if key_comments:
+                    block_comments += key_comments
+                    key_comments = []
+                    
+            elif kind == TOKEN_LBRACE:
+                if not current_key:
+                    line, column = scanner.location(start)
+                    raise ValueError(f"Expected key at line {line}, column {column}")
+                    
+                # Комментарии перед ключом вложенного блока принадлежат ему
+                if scanner.comments:
+                    key_comments += take_comments()
+                stack.append((result, block_comments, current_key))
+                result = {}
+                block_comments = key_comments
+                current_key = None
+                key_comments = []
+                continue
+                
+            elif kind == TOKEN_RBRACE:
+                block_comments += key_comments
+                if scanner.comments:
+                    block_comments += take_comments()
+                if block_comments:
+                    result["__comment"] = "\n".join(block_comments)
+                if not stack:
+                    return result
+                value = result
+                result, block_comments, current_key = stack.pop()
+                key_comments = []
                 
-            # Парсим ключ
-            if not current_key:
-                current_key = self._parse_string()
+            elif kind == TOKEN_BASE:
+                base_files.append(decode(start, end))
                 continue
                 
-            # Парсим значение
-            value = self._parse_value()
-            
-            # Если это не первое значение для этого ключа,
-            # преобразуем в массив
+            else:
+                line, column = scanner.location(start)
+                raise ValueError(f"Expected '}}' at line {line}, column {column}")
+                
+            # Повторяющийся ключ превращается в массив
             if current_key in result:
                 if isinstance(result[current_key], list):
                     result[current_key].append(value)
@@ -171,41 +442,109 @@ class ValveFormat:
                 result[current_key] = value
                 
             current_key = None
+
+    def scan_file(self, file_path: str, handler: Any, use_mmap: bool = False) -> Any:
+        """
+        Сканирует файл формата Valve, передавая события обработчику.
+        
+        Args:
+            file_path: Путь к файлу
+            handler: Обработчик событий (см. valve_events.ValveHandler)
+            use_mmap: Отобразить файл в память и сканировать байты напрямую
+        """
+        if use_mmap:
+            with open(file_path, 'rb') as f:
+                if not f.seek(0, 2):
+                    return self.scan_buffer(b'', handler)
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return self.scan_buffer(mapped, handler)
+                    
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return self.scan_buffer(f.read(), handler)
             
-        raise ValueError(
-            f"Expected '}}' at line {self.line}, column {self.column}"
-        )
-    
-    def _add_comments_to_result(self, result: Dict[str, Any], prefix: str = ""):
-        """Добавляет сохраненные комментарии к блокам в результат."""
-        if isinstance(result, dict):
-            # Если в блоке уже есть __comment, не перезаписываем его
-            for key, value in result.items():
-                full_key = f"{prefix}{key}" if prefix else key
-                if full_key in self.comments and "__comment" not in value:
-                    if isinstance(value, dict):
-                        value["__comment"] = self.comments[full_key]
-                    else:
-                        # Если значение не словарь, создаем словарь с комментарием
-                        result[key] = {
-                            "__comment": self.comments[full_key],
-                            "value": value
-                        }
-                # Рекурсивно обрабатываем вложенные блоки
-                if isinstance(value, dict):
-                    self._add_comments_to_result(value, f"{full_key}.")
+    def scan_buffer(self, buffer: Buffer, handler: Any, encoding: str = 'utf-8') -> Any:
+        """
+        Сканирует буфер без построения дерева (SAX-стиль).
+        
+        Обработчик получает события start_block(key), key_value(key, value),
+        end_block() и base_file(path) в порядке следования в файле. Словари
+        блоков не создаются, поэтому для сводок по файлу (число волн,
+        шаблоны, валюта) не нужно строить и выбрасывать полное дерево.
+        Ошибки синтаксиса сообщаются так же, как в parse_buffer.
+        
+        Returns:
+            Переданный обработчик
+        """
+        scanner = ValveScanner(buffer, encoding, strings=self.strings)
+        next_token = scanner.next_token
+        decode = scanner.decode
+        start_block = handler.start_block
+        key_value = handler.key_value
+        end_block = handler.end_block
+        
+        # Корневой блок без ключа ("{ ... }") не порождает событий
+        anonymous_root = False
+        depth = 0
+        current_key = None
+        
+        while True:
+            kind, start, end = next_token()
+            
+            if kind <= TOKEN_WORD:
+                if current_key is None:
+                    current_key = decode(start, end)
+                    if not depth:
+                        kind, start, end = next_token()
+                        while kind == TOKEN_BASE:
+                            handler.base_file(decode(start, end))
+                            kind, start, end = next_token()
+                        if kind != TOKEN_LBRACE:
+                            line, column = scanner.location(start)
+                            raise ValueError(f"Expected '{{' after root key at line {line}, column {column}")
+                        start_block(current_key)
+                        current_key = None
+                        depth = 1
+                    continue
+                key_value(current_key, decode(start, end))
+                current_key = None
+                
+            elif kind == TOKEN_LBRACE:
+                if current_key is None:
+                    if depth:
+                        line, column = scanner.location(start)
+                        raise ValueError(f"Expected key at line {line}, column {column}")
+                    anonymous_root = True
+                else:
+                    start_block(current_key)
+                    current_key = None
+                depth += 1
+                
+            elif kind == TOKEN_RBRACE and depth:
+                depth -= 1
+                current_key = None
+                if depth or not anonymous_root:
+                    end_block()
+                if not depth:
+                    return handler
+                    
+            elif kind == TOKEN_BASE:
+                handler.base_file(decode(start, end))
+                
+            elif depth:
+                line, column = scanner.location(start)
+                raise ValueError(f"Expected '}}' at line {line}, column {column}")
+                
+            else:
+                line, column = scanner.location(start)
+                raise ValueError(f"Expected '{{' at line {line}, column {column}")
 
     def _is_root_param(self, key: str) -> bool:
         """Проверяет, является ли параметр корневым."""
-        root_params = {
-            "FixedRespawnWaveTime", "CanBotsAttackWhileInSpawnRoom", 
-            "AddSentryBusterWhenDamageDealtExceeds", "Advanced"
-        }
-        return key in root_params
+        return KEY_CLASSES[key].root_param
 
     def _format_boolean(self, key: str, value: bool) -> str:
         """Форматирует булево значение."""
-        if self._is_root_param(key):
+        if KEY_CLASSES[key].root_param:
             return f'{key} {"Yes" if value else "No"}'
         return f'{key} {1 if value else 0}'
 
@@ -215,21 +554,26 @@ class ValveFormat:
         if key == "__attrs":
             return f'Attributes {" ".join(value)}'
 
+        # Строки - самый частый случай
+        if isinstance(value, str):
+            return f'{key} "{value}"'
+
+        key_class = KEY_CLASSES[key]
+
         # Имена блоков без кавычек
-        if isinstance(value, (dict, list)) and key in {
-            "WaveSchedule", "Wave", "WaveSpawn", "Tank", "TFBot", 
-            "Mission", "CharacterAttributes", "ItemAttributes", "Squad"
-        }:
+        if key_class.block_name and isinstance(value, (dict, list)):
             return key
 
         # Булевы значения
         if isinstance(value, bool):
-            return self._format_boolean(key, value)
+            if key_class.root_param:
+                return f'{key} {"Yes" if value else "No"}'
+            return f'{key} {1 if value else 0}'
 
         # Числовые значения без кавычек
         if isinstance(value, (int, float)):
             # ItemName всегда в кавычках
-            if key == "ItemName":
+            if key_class.item_name:
                 return f'{key} "{value}"'
             return f'{key} {value}'
 
@@ -238,23 +582,20 @@ class ValveFormat:
 
     def _is_output_block(self, key: str) -> bool:
         """Проверяет, является ли ключ Output блоком."""
-        return any(key.endswith(suffix) for suffix in [
-            "Output", "WaveOutput", "SpawnOutput", "DeathOutput",
-            "BombDroppedOutput", "KilledOutput"
-        ])
+        return KEY_CLASSES[key].strategy == OUTPUT
 
     def _format_parameters(self, value: Dict[str, Any], indent: int) -> List[str]:
         """Форматирует блок Parameters."""
-        result = []
-        result.append("\t" * indent + "Parameters")
-        result.append("\t" * indent + "{")
+        emitter = self.emitter
+        pad = emitter.pads[indent + 1]
+        result = [emitter.headers[indent, "Parameters"], emitter.opens[indent]]
         for key, val in value.items():
-            result.append("\t" * (indent + 1) + f"{key} {val}")
-        result.append("\t" * indent + "}")
+            result.append(pad + f"{key} {val}")
+        result.append(emitter.closes[indent])
         return result
 
     def _format_block(self, data: Union[Dict[str, Any], List[Dict[str, Any]]], indent: int = 0) -> List[str]:
-        """Форматирует блок данных."""
+        """Форматирует блок данных (indent - уровень вложенности)."""
         result = []
 
         if isinstance(data, list):
@@ -263,6 +604,8 @@ class ValveFormat:
                 result.extend(self._format_block(item, indent))
             return result
 
+        emitter = self.emitter
+        pad = emitter.pads[indent]
         regular_data = {}
         list_data = {}
 
@@ -285,136 +628,199 @@ class ValveFormat:
                     continue
                 
                 # Обычный блок
-                result.append(" " * indent + key)
-                result.append(" " * indent + "{")
-                result.extend(self._format_block(value, indent + 4))
-                result.append(" " * indent + "}")
+                result.append(emitter.headers[indent, key])
+                result.append(emitter.opens[indent])
+                result.extend(self._format_block(value, indent + 1))
+                result.append(emitter.closes[indent])
             else:
                 # Простое значение
                 formatted_value = self._format_value(value)
-                result.append(f"{' ' * indent}{key} {formatted_value}")
+                result.append(f"{pad}{key} {formatted_value}")
 
         # Обрабатываем списки
         for key, value in list_data.items():
             for item in value:
-                result.append(" " * indent + key)
-                result.append(" " * indent + "{")
-                result.extend(self._format_block(item, indent + 4))
-                result.append(" " * indent + "}")
+                result.append(emitter.headers[indent, key])
+                result.append(emitter.opens[indent])
+                result.extend(self._format_block(item, indent + 1))
+                result.append(emitter.closes[indent])
 
         return result
 
     def _format_output_block(self, key: str, value: Dict[str, Any], indent: int) -> List[str]:
         """Форматирует Output блок или Parameters."""
-        result = []
-        result.append("\t" * indent + key)
-        result.append("\t" * indent + "{")
-        
-        if key == "Parameters":
-            # Специальная обработка Parameters - только как блок, без строкового значения
-            for param_key, param_value in value.items():
-                formatted_value = self._format_value(param_value)
-                # Используем табуляцию для отступов
-                result.append(f"\t" * (indent + 1) + f"{param_key} {formatted_value}")
-        else:
-            # Обычный Output блок
-            for output_key, output_value in value.items():
-                # Используем табуляцию для отступов
-                result.append(f"\t" * (indent + 1) + f"{output_key} {self._format_value(output_value)}")
+        emitter = self.emitter
+        pad = emitter.pads[indent + 1]
+        format_value = self._format_value
+        result = [emitter.headers[indent, key], emitter.opens[indent]]
+        
+        # Parameters выводится только как блок, без строкового значения
+        for output_key, output_value in value.items():
+            result.append(f"{pad}{output_key} {format_value(output_value)}")
             
-        result.append("\t" * indent + "}")
+        result.append(emitter.closes[indent])
         return result
 
     def dump(self, data: Dict[str, Any], indent: int = 0) -> str:
         """Форматирует данные в формат Valve."""
-        result = []
-        special_keys = {"__comment", "__base_files", "__attrs"}
+        return "\n".join(self.iter_dump(data, indent))
+        
+    def dump_to(self, data: Dict[str, Any], stream: TextIO, indent: int = 0) -> None:
+        """
+        Записывает данные в формате Valve в поток (файл, io.StringIO).
+        
+        Строки пишутся по мере формирования, без промежуточных join по
+        уровням вложенности; результат совпадает с dump().
+        """
+        self.write_lines(self.iter_dump(data, indent), stream)
+        
+    def write_lines(self, lines: Iterable[str], stream: TextIO) -> None:
+        """Пишет строки в поток через "\n" (как "\n".join(), без сборки текста)."""
+        write = stream.write
+        lines = iter(lines)
+        for line in lines:
+            write(line)
+            break
+        for line in lines:
+            write("\n")
+            write(line)
+            
+    def iter_dump(self, data: Dict[str, Any], indent: int = 0) -> Iterator[str]:
+        """Генерирует строки формата Valve (их "\n".join() - это dump())."""
+        dict_emitters = self._DICT_EMITTERS
+        format_key_value = self._format_key_value
+        emitter = self.emitter
+        pad = emitter.pads[indent]
         
         # Если есть комментарий, добавляем его первым
         if "__comment" in data:
             comment = data["__comment"]
             # Разбиваем комментарий на строки и форматируем каждую как однострочный комментарий
             for line in comment.split('\n'):
-                result.append("\t" * indent + f"// {line.strip()}")
+                yield pad + f"// {line.strip()}"
         
-        regular_data = {k: v for k, v in data.items() if k not in special_keys}
+        regular_data = {k: v for k, v in data.items() if k not in _SPECIAL_KEYS}
         
         # Сначала обрабатываем атрибуты, если они есть
         if "__attrs" in data:
             for attr in data["__attrs"]:
-                result.append("\t" * indent + f'Attributes {attr}')
+                yield f'{pad}Attributes {attr}'
             
         for key, value in regular_data.items():
             if isinstance(value, dict):
-                if self._is_output_block(key):
-                    # Специальная обработка для Output блоков
-                    result.extend(self._format_output_block(key, value, indent))
-                elif key == "Parameters":
-                    # Специальная обработка для Parameters - только как блок, без строкового значения
-                    result.extend(self._format_output_block(key, value, indent))
-                elif key == "Attributes":
-                    # Специальная обработка для Attributes
-                    if isinstance(value, (str, list)):
-                        # Если это строка или список, выводим как есть
-                        attrs = value if isinstance(value, list) else [value]
-                        for attr in attrs:
-                            result.append("\t" * indent + f'Attributes {attr}')
-                    else:
-                        # Если это словарь или что-то другое, извлекаем значения
-                        for attr_val in value.values():
-                            if attr_val:  # Пропускаем пустые значения
-                                result.append("\t" * indent + f'Attributes {attr_val}')
-                elif key in {"CharacterAttributes", "ItemAttributes"}:
-                    # Специальная обработка для CharacterAttributes и ItemAttributes
-                    result.append("\t" * indent + key)
-                    result.append("\t" * indent + "{")
-                    for attr_key, attr_val in value.items():
-                        if attr_key == "ItemName":
-                            result.append("\t" * (indent + 1) + f'ItemName "{attr_val}"')
-                        elif isinstance(attr_val, (int, float)):
-                            result.append("\t" * (indent + 1) + f'"{attr_key}" {attr_val}')
-                        else:
-                            result.append("\t" * (indent + 1) + f'"{attr_key}" "{attr_val}"')
-                    result.append("\t" * indent + "}")
-                else:
-                    # Обычный блок
-                    result.append("\t" * indent + self._format_key_value(key, value))
-                    result.append("\t" * indent + "{")
-                    result.append(self.dump(value, indent + 1))
-                    result.append("\t" * indent + "}")
+                # Способ вывода блока выбирается по таблице ключей
+                yield from dict_emitters[KEY_CLASSES[key].strategy](self, key, value, indent)
             elif isinstance(value, (list, tuple)):
                 # Для списков проверяем, не Squad ли это
                 if key == "Squad":
-                    result.append("\t" * indent + "Squad")
-                    result.append("\t" * indent + "{")
+                    inner = indent + 1
+                    yield emitter.headers[indent, "Squad"]
+                    yield emitter.opens[indent]
                     for item in value:
                         if isinstance(item, dict):
                             item_type = next(iter(item))  # TFBot или Tank
-                            result.append("\t" * (indent + 1) + item_type)
-                            result.append("\t" * (indent + 1) + "{")
-                            result.append(self.dump(item[item_type], indent + 2))
-                            result.append("\t" * (indent + 1) + "}")
+                            yield emitter.headers[inner, item_type]
+                            yield emitter.opens[inner]
+                            yield from self._iter_body(item_type, item[item_type], indent + 2)
+                            yield emitter.closes[inner]
                         else:
                             # Если элемент не словарь, форматируем его как есть
-                            result.append("\t" * (indent + 1) + str(item))
-                    result.append("\t" * indent + "}")
+                            yield emitter.pads[inner] + str(item)
+                    yield emitter.closes[indent]
                 else:
                     # Для обычных списков - каждый элемент как отдельный блок
                     for item in value:
                         if isinstance(item, dict):
-                            result.append("\t" * indent + self._format_key_value(key, item))
-                            result.append("\t" * indent + "{")
-                            result.append(self.dump(item, indent + 1))
-                            result.append("\t" * indent + "}")
+                            yield self._block_header(key, item, indent)
+                            yield emitter.opens[indent]
+                            yield from self._iter_body(key, item, indent + 1)
+                            yield emitter.closes[indent]
                         else:
-                            result.append("\t" * indent + self._format_key_value(key, item))
+                            yield pad + format_key_value(key, item)
             else:
                 # Простые значения (строки, числа, булевы)
                 # Пропускаем вывод Parameters как строки
-                if key != "Parameters":
-                    result.append("\t" * indent + self._format_key_value(key, value))
-        
-        return "\n".join(result)
+                if key == "Parameters":
+                    continue
+                if type(value) is str:
+                    # Самый частый случай: строка в кавычках
+                    yield f'{pad}{key} "{value}"'
+                else:
+                    yield pad + format_key_value(key, value)
+                    
+    def _block_header(self, key: str, value: Dict[str, Any], indent: int) -> str:
+        """Строка заголовка вложенного блока."""
+        if KEY_CLASSES[key].block_name:
+            return self.emitter.headers[indent, key]
+        return self.emitter.pads[indent] + self._format_key_value(key, value)
+
+    def _emit_attributes(self, key: str, value: Any, indent: int) -> Iterator[str]:
+        """Выводит блок Attributes строками "Attributes X"."""
+        pad = self.emitter.pads[indent]
+        if isinstance(value, (str, list)):
+            # Если это строка или список, выводим как есть
+            attrs = value if isinstance(value, list) else [value]
+            for attr in attrs:
+                yield pad + f'Attributes {attr}'
+        else:
+            # Если это словарь или что-то другое, извлекаем значения
+            for attr_val in value.values():
+                if attr_val:  # Пропускаем пустые значения
+                    yield pad + f'Attributes {attr_val}'
+
+    def _emit_attribute_block(self, key: str, value: Dict[str, Any], indent: int) -> Iterator[str]:
+        """Выводит CharacterAttributes и ItemAttributes."""
+        emitter = self.emitter
+        pad = emitter.pads[indent + 1]
+        yield emitter.headers[indent, key]
+        yield emitter.opens[indent]
+        for attr_key, attr_val in value.items():
+            if attr_key == "ItemName":
+                yield f'{pad}ItemName "{attr_val}"'
+            elif isinstance(attr_val, (int, float)):
+                yield f'{pad}"{attr_key}" {attr_val}'
+            else:
+                yield f'{pad}"{attr_key}" "{attr_val}"'
+        yield emitter.closes[indent]
+
+    def _emit_block(self, key: str, value: Dict[str, Any], indent: int) -> Iterator[str]:
+        """Выводит обычный вложенный блок."""
+        yield self._block_header(key, value, indent)
+        yield self.emitter.opens[indent]
+        yield from self._iter_body(key, value, indent + 1)
+        yield self.emitter.closes[indent]
+
+    def _emit_output_block(self, key: str, value: Dict[str, Any], indent: int) -> Iterable[str]:
+        """Выводит Output блок через кэш отрисовки."""
+        if self.subtree_cache is None:
+            return self._format_output_block(key, value, indent)
+        return self.subtree_cache.lines(
+            key, value, indent, lambda data, level: self._format_output_block(key, data, level)
+        )
+
+    def _iter_body(self, key: str, value: Dict[str, Any], indent: int) -> Iterable[str]:
+        """Строки содержимого вложенного блока; TFBot и Tank берутся из кэша отрисовки."""
+        if self.subtree_cache is not None and KEY_CLASSES[key].memoize:
+            return self.subtree_cache.lines(key, value, indent, self._iter_nested)
+        return self._iter_nested(value, indent)
+
+    # Диспетчеризация вывода блока по KeyClass.strategy
+    _DICT_EMITTERS: Dict[int, Callable[..., Iterable[str]]] = {
+        BLOCK: _emit_block,
+        OUTPUT: _emit_output_block,
+        PARAMETERS: _format_output_block,
+        ATTRIBUTES: _emit_attributes,
+        ATTRIBUTE_BLOCK: _emit_attribute_block,
+    }
+
+    def _iter_nested(self, data: Dict[str, Any], indent: int) -> Iterator[str]:
+        """Строки вложенного блока; пустой блок дает одну пустую строку, как в dump()."""
+        empty = True
+        for line in self.iter_dump(data, indent):
+            empty = False
+            yield line
+        if empty:
+            yield ""
 
     def _format_value(self, value: Any) -> str:
         """Форматирует отдельное значение для Valve-формата."""
@@ -1,11 +1,21 @@
 """
 Парсер для формата файлов Valve (используется в Source engine).
 """
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List
+from .valve_emitter import Emitter, EMITTER
+from .valve_keys import (
+    KEY_CLASSES, BLOCK, OUTPUT, PARAMETERS, ATTRIBUTES, ATTRIBUTE_BLOCK
+)
+
+# Служебные ключи дерева, не выводимые как обычные значения
+_SPECIAL_KEYS = frozenset(("__comment", "__base_files", "__attrs"))
 
 class ValveFormat:
     """Парсер формата Valve."""
     
+    # Отступы и скобки при выводе (dump)
+    emitter: Emitter = EMITTER
+    
     def __init__(self):
         self.text = ""
         self.pos = 0
@@ -17,15 +27,11 @@ class ValveFormat:
     
     def _is_root_param(self, key: str) -> bool:
         """Проверяет, является ли параметр корневым."""
-        root_params = {
-            "FixedRespawnWaveTime", "CanBotsAttackWhileInSpawnRoom", 
-            "AddSentryBusterWhenDamageDealtExceeds", "Advanced"
-        }
-        return key in root_params
+        return KEY_CLASSES[key].root_param
 
     def _format_boolean(self, key: str, value: bool) -> str:
         """Форматирует булево значение."""
-        if self._is_root_param(key):
+        if KEY_CLASSES[key].root_param:
             return f'{key} {"Yes" if value else "No"}'
         return f'{key} {1 if value else 0}'
 
@@ -35,11 +41,10 @@ class ValveFormat:
         if key == "__attrs":
             return f'Attributes {" ".join(value)}'
 
+        key_class = KEY_CLASSES[key]
+
         # Имена блоков без кавычек
-        if isinstance(value, (dict, list)) and key in {
-            "WaveSchedule", "Wave", "WaveSpawn", "Tank", "TFBot", 
-            "Mission", "CharacterAttributes", "ItemAttributes", "Squad"
-        }:
+        if key_class.block_name and isinstance(value, (dict, list)):
             return key
 
         # Булевы значения
@@ -49,12 +54,12 @@ class ValveFormat:
         # Числовые значения без кавычек
         if isinstance(value, (int, float)):
             # ItemName всегда в кавычках
-            if key == "ItemName":
+            if key_class.item_name:
                 return f'{key} "{value}"'
             return f'{key} {value}'
 
         # Where и подобные всегда в кавычках
-        if key in {"Where", "Name", "Template", "ItemName"}:
+        if key_class.quoted:
             return f'{key} "{value}"'
 
         # Обычные строки в кавычках если содержат пробелы
@@ -63,67 +68,91 @@ class ValveFormat:
             
         return f'{key} {value}'
 
+    def _dump_attributes(self, key: str, value: Dict[str, Any], indent: int) -> List[str]:
+        """Выводит блок Attributes одной строкой."""
+        attrs = []
+        for attr_key, attr_val in value.items():
+            if attr_key:  # Пропускаем пустые ключи
+                attrs.append(attr_val)
+        if attrs:
+            return [self.emitter.pads[indent] + f'Attributes {" ".join(attrs)}']
+        return []
+
+    def _dump_attribute_block(self, key: str, value: Dict[str, Any], indent: int) -> List[str]:
+        """Выводит CharacterAttributes и ItemAttributes."""
+        emitter = self.emitter
+        pad = emitter.pads[indent + 1]
+        result = [emitter.headers[indent, key], emitter.opens[indent]]
+        for attr_key, attr_val in value.items():
+            if attr_key == "ItemName":
+                result.append(pad + f'ItemName "{attr_val}"')
+            elif isinstance(attr_val, (int, float)):
+                result.append(pad + f'"{attr_key}" {attr_val}')
+            else:
+                result.append(pad + f'"{attr_key}" "{attr_val}"')
+        result.append(emitter.closes[indent])
+        return result
+
+    def _dump_block(self, key: str, value: Dict[str, Any], indent: int) -> List[str]:
+        """Выводит обычный вложенный блок (в том числе Output и Parameters)."""
+        emitter = self.emitter
+        return [
+            emitter.pads[indent] + self._format_key_value(key, value),
+            emitter.opens[indent],
+            self.dump(value, indent + 1),
+            emitter.closes[indent],
+        ]
+
+    # Диспетчеризация вывода блока по KeyClass.strategy
+    _DICT_EMITTERS: Dict[int, Callable[..., List[str]]] = {
+        BLOCK: _dump_block,
+        OUTPUT: _dump_block,
+        PARAMETERS: _dump_block,
+        ATTRIBUTES: _dump_attributes,
+        ATTRIBUTE_BLOCK: _dump_attribute_block,
+    }
+
     def dump(self, data: Dict[str, Any], indent: int = 0) -> str:
         """Форматирует данные в формат Valve."""
         result = []
-        special_keys = {"__comment", "__base_files", "__attrs"}
-        regular_data = {k: v for k, v in data.items() if k not in special_keys}
+        dict_emitters = self._DICT_EMITTERS
+        emitter = self.emitter
+        pad = emitter.pads[indent]
+        opening = emitter.opens[indent]
+        closing = emitter.closes[indent]
+        regular_data = {k: v for k, v in data.items() if k not in _SPECIAL_KEYS}
         
         # Сначала обрабатываем атрибуты, если они есть
         if "__attrs" in data:
-            result.append("\t" * indent + f'Attributes {" ".join(data["__attrs"])}')
+            result.append(pad + f'Attributes {" ".join(data["__attrs"])}')
             
         for key, value in regular_data.items():
             if isinstance(value, dict):
-                if key == "Attributes":
-                    # Специальная обработка для Attributes
-                    attrs = []
-                    for attr_key, attr_val in value.items():
-                        if attr_key:  # Пропускаем пустые ключи
-                            attrs.append(attr_val)
-                    if attrs:
-                        result.append("\t" * indent + f'Attributes {" ".join(attrs)}')
-                elif key in {"CharacterAttributes", "ItemAttributes"}:
-                    # Специальная обработка для CharacterAttributes и ItemAttributes
-                    result.append("\t" * indent + key)
-                    result.append("\t" * indent + "{")
-                    for attr_key, attr_val in value.items():
-                        if attr_key == "ItemName":
-                            result.append("\t" * (indent + 1) + f'ItemName "{attr_val}"')
-                        elif isinstance(attr_val, (int, float)):
-                            result.append("\t" * (indent + 1) + f'"{attr_key}" {attr_val}')
-                        else:
-                            result.append("\t" * (indent + 1) + f'"{attr_key}" "{attr_val}"')
-                    result.append("\t" * indent + "}")
-                else:
-                    # Обычный блок
-                    result.append("\t" * indent + self._format_key_value(key, value))
-                    result.append("\t" * indent + "{")
-                    result.append(self.dump(value, indent + 1))
-                    result.append("\t" * indent + "}")
+                # Способ вывода блока выбирается по таблице ключей
+                result.extend(dict_emitters[KEY_CLASSES[key].strategy](self, key, value, indent))
             elif isinstance(value, list):
                 if key == "Squad":
                     # Специальная обработка для Squad
-                    result.append("\t" * indent + key)
-                    result.append("\t" * indent + "{")
+                    result.append(emitter.headers[indent, key])
+                    result.append(opening)
                     for member in value:
                         member_type = next(iter(member))  # TFBot или Tank
-                        result.append("\t" * indent + member_type)
-                        result.append("\t" * indent + "{")
+                        result.append(emitter.headers[indent, member_type])
+                        result.append(opening)
                         result.append(self.dump(member[member_type], indent + 1))
-                        result.append("\t" * indent + "}")
-                    result.append("\t" * indent + "}")
+                        result.append(closing)
+                    result.append(closing)
                 else:
                     # Для других списков (например, Wave) - каждый элемент как отдельный блок
                     for item in value:
                         if isinstance(item, dict):
-                            result.append("\t" * indent + self._format_key_value(key, item))
-                            result.append("\t" * indent + "{")
+                            result.append(pad + self._format_key_value(key, item))
+                            result.append(opening)
                             result.append(self.dump(item, indent + 1))
-                            result.append("\t" * indent + "}")
+                            result.append(closing)
                         else:
-                            result.append("\t" * indent + self._format_key_value(key, item))
+                            result.append(pad + self._format_key_value(key, item))
             else:
-                result.append("\t" * indent + self._format_key_value(key, value))
+                result.append(pad + self._format_key_value(key, value))
         
         return "\n".join(result)
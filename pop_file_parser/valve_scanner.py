@@ -0,0 +1,238 @@
+"""
+Сканер формата Valve для текста и байтовых буферов (bytes, mmap).
+"""
+import mmap
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
+
+from .string_table import StringTable
+
+# Типы токенов
+TOKEN_STRING = 0  # Строка в кавычках
+TOKEN_WORD = 1    # Строка без кавычек
+TOKEN_LBRACE = 2
+TOKEN_RBRACE = 3
+TOKEN_BASE = 4    # Директива #base, значение - имя файла
+TOKEN_EOF = 5
+
+# Пробелы, однострочные и многострочные комментарии пропускаются по ходу
+# сканирования, без предварительного удаления из текста. {space} - один
+# пробельный символ, {word} - один символ слова без кавычек
+_SKIP = r'(?:{space}+|//[^\n]*|/\*.*?\*/)*'
+_QUOTED = r'"([^"]*)("?)'
+_BASE = r'#base{space}+"?([^"\n]+)"?'
+_WORD = r'(?:{word}|/(?![/*]))+'
+_COMMENT = r'//([^\n]*)|/\*(.*?)\*/'
+
+# Пробельные символы строкового \s (те же, что у str.isspace): все они
+# лежат не дальше U+3000
+_WHITESPACE = re.findall(r'\s', ''.join(map(chr, range(0x3001))))
+
+
+def _compile(skip, quoted, base, word, comment):
+    """Компилирует шаблоны сканера в порядке распаковки в ValveScanner."""
+    return (
+        re.compile(skip, re.DOTALL),
+        re.compile(quoted),
+        re.compile(base),
+        re.compile(word),
+        re.compile(comment, re.DOTALL),
+    )
+
+
+def _expand(pattern: str, space, word):
+    """Подставляет {space} и {word}; для байтовых подстановок шаблон кодируется."""
+    if isinstance(space, bytes):
+        pattern = pattern.encode()
+        return pattern.replace(b'{space}', space).replace(b'{word}', word)
+    return pattern.replace('{space}', space).replace('{word}', word)
+
+
+_TEXT_PATTERNS = _compile(*(
+    _expand(pattern, r'\s', r'[^\s{}/]')
+    for pattern in (_SKIP, _QUOTED, _BASE, _WORD, _COMMENT)
+))
+
+
+@lru_cache(maxsize=8)
+def _byte_patterns(encoding: str):
+    """
+    Шаблоны для байтового буфера в кодировке encoding.
+
+    Байтовый \\s знает только ASCII-пробелы, поэтому пробельные символы
+    строкового \\s кодируются явно: однобайтовые попадают в класс символов,
+    многобайтовые (U+00A0, U+3000 и т.п. в UTF-8) - в альтернативы. Так
+    буфер и строка с тем же текстом делятся на одинаковые токены.
+    """
+    single = set()
+    multi = []
+    for char in _WHITESPACE:
+        try:
+            encoded = char.encode(encoding)
+        except UnicodeEncodeError:
+            continue
+        if len(encoded) == 1:
+            single.add(encoded)
+        else:
+            multi.append(encoded)
+
+    chars = b''.join(re.escape(byte) for byte in sorted(single))
+    if multi:
+        leads = b''.join(sorted({re.escape(encoded[:1]) for encoded in multi}))
+        sequences = b'|'.join(re.escape(encoded) for encoded in multi)
+        space = b'(?:[' + chars + b']|' + sequences + b')'
+        # Ведущие байты многобайтовых пробелов проверяются отдельно, чтобы
+        # остальные символы слова сопоставлялись одним классом
+        word = (b'(?:[^' + chars + b'{}/' + leads + b']|(?!' + sequences + b')['
+                + leads + b'])')
+    else:
+        space = b'[' + chars + b']'
+        word = b'[^' + chars + b'{}/]'
+    return _compile(*(
+        _expand(pattern, space, word)
+        for pattern in (_SKIP, _QUOTED, _BASE, _WORD, _COMMENT)
+    ))
+
+
+Buffer = Union[str, bytes, bytearray, mmap.mmap]
+ScannerToken = Tuple[int, int, int]
+
+
+class ValveScanner:
+    """
+    Потоковый сканер токенов формата Valve.
+
+    Работает как со строкой, так и с байтовым буфером (bytes, mmap):
+    токены возвращаются смещениями в буфере, а в строки декодируются только
+    те срезы, которые запрашивает парсер.
+
+    При capture_comments=True текст комментариев, пропущенных перед
+    очередным токеном, накапливается и забирается парсером через
+    take_comments(), поэтому отдельный проход по тексту за комментариями
+    не нужен.
+
+    Если задана таблица строк strings, decode() возвращает строки из нее
+    (одинаковые ключи и значения - один объект на все деревья разбора).
+    """
+
+    def __init__(self, buffer: Buffer, encoding: str = 'utf-8',
+                 capture_comments: bool = False,
+                 strings: Optional[StringTable] = None):
+        self.buffer = buffer
+        self.encoding = encoding
+        self.capture_comments = capture_comments
+        self.strings = strings
+        self.is_text = isinstance(buffer, str)
+        self.length = len(buffer)
+        self.pos = 0
+        self.comments: List[str] = []
+
+        if strings is not None:
+            self.decode = self._decode_text if self.is_text else self._decode_bytes
+            self._decoder = strings.decoder(encoding)
+
+        patterns = _TEXT_PATTERNS if self.is_text else _byte_patterns(encoding)
+        self._skip, self._quoted, self._base, self._word, self._comment = patterns
+        if self.is_text:
+            self._lbrace, self._rbrace, self._quote, self._hash = '{', '}', '"', '#'
+            self._slash = '/'
+        else:
+            self._lbrace, self._rbrace, self._quote, self._hash = (
+                ord('{'), ord('}'), ord('"'), ord('#')
+            )
+            self._slash = b'/'
+
+    def next_token(self) -> ScannerToken:
+        """
+        Возвращает следующий токен как (тип, начало, конец).
+
+        Для строк смещения указывают на значение без кавычек.
+        """
+        buffer = self.buffer
+        skipped = self.pos
+        pos = self._skip.match(buffer, skipped).end()
+
+        if self.capture_comments and buffer.find(self._slash, skipped, pos) != -1:
+            self._collect_comments(skipped, pos)
+
+        if pos >= self.length:
+            self.pos = pos
+            return (TOKEN_EOF, pos, pos)
+
+        char = buffer[pos]
+
+        if char == self._lbrace:
+            self.pos = pos + 1
+            return (TOKEN_LBRACE, pos, pos + 1)
+
+        if char == self._rbrace:
+            self.pos = pos + 1
+            return (TOKEN_RBRACE, pos, pos + 1)
+
+        if char == self._quote:
+            match = self._quoted.match(buffer, pos)
+            self.pos = match.end()
+            return (TOKEN_STRING, match.start(1), match.end(1))
+
+        if char == self._hash:
+            match = self._base.match(buffer, pos)
+            if match:
+                self.pos = match.end()
+                return (TOKEN_BASE, match.start(1), match.end(1))
+
+        match = self._word.match(buffer, pos)
+        if match is None:
+            # Одиночный символ, с которого не начинается ни один токен
+            self.pos = pos + 1
+            return (TOKEN_WORD, pos, pos + 1)
+        self.pos = match.end()
+        return (TOKEN_WORD, pos, match.end())
+
+    def _collect_comments(self, start: int, end: int) -> None:
+        """Сохраняет текст комментариев из пропущенного участка."""
+        for match in self._comment.finditer(self.buffer, start, end):
+            if match.start(1) != -1:
+                lines = [self.decode_raw(match.start(1), match.end(1))]
+            else:
+                lines = self.decode_raw(match.start(2), match.end(2)).split('\n')
+            for line in lines:
+                line = line.strip()
+                if line:
+                    self.comments.append(line)
+
+    def comment_start(self, start: int, end: int) -> int:
+        """Смещение первого комментария на участке [start, end) или end."""
+        match = self._comment.search(self.buffer, start, end)
+        return match.start() if match else end
+
+    def take_comments(self) -> List[str]:
+        """Забирает комментарии, накопленные с прошлого вызова."""
+        comments = self.comments
+        if not comments:
+            return []
+        self.comments = []
+        return comments
+
+    def decode_raw(self, start: int, end: int) -> str:
+        """Возвращает участок буфера строкой (без таблицы строк)."""
+        if self.is_text:
+            return self.buffer[start:end]
+        return bytes(self.buffer[start:end]).decode(self.encoding)
+
+    # Значение токена строкой; с таблицей строк заменяется в __init__
+    decode = decode_raw
+
+    def _decode_text(self, start: int, end: int) -> str:
+        return self.strings[self.buffer[start:end]]
+
+    def _decode_bytes(self, start: int, end: int) -> str:
+        return self._decoder[bytes(self.buffer[start:end])]
+
+    def location(self, pos: int) -> Tuple[int, int]:
+        """Вычисляет строку и столбец смещения (только для сообщений об ошибках)."""
+        prefix = self.buffer[:pos]
+        if not self.is_text:
+            prefix = bytes(prefix).decode(self.encoding, errors='replace')
+        line_start = prefix.rfind('\n') + 1
+        return prefix.count('\n') + 1, len(prefix) - line_start + 1
@@ -0,0 +1,115 @@
+"""
+Тесты асинхронной загрузки и экспорта миссий.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pop_file_parser.async_compiler import AsyncPopFileCompiler, load_many_async
+from pop_file_parser.compiler import PopFileCompiler
+from pop_file_parser.valve_parser import ValveFormat
+
+POPFILE = """#base robot_standard.pop
+
+WaveSchedule
+{
+	StartingCurrency 400
+	Wave
+	{
+		WaveSpawn
+		{
+			Where spawnbot
+			TFBot
+			{
+				Class Heavyweapons
+			}
+		}
+	}
+}"""
+
+
+@pytest.fixture
+def mission(tmp_path):
+    path = tmp_path / "mission.pop"
+    path.write_text(POPFILE, encoding="utf-8")
+    return path
+
+
+def test_load_and_export_match_sync(mission, tmp_path):
+    """Асинхронные загрузка и экспорт дают тот же файл, что синхронные."""
+    sync = PopFileCompiler()
+    sync.load_file(mission)
+    sync.export_to_file(tmp_path / "sync.pop")
+
+    async def run():
+        facade = AsyncPopFileCompiler()
+        await facade.load_async(mission)
+        await facade.export_async(tmp_path / "async.pop")
+        return facade.compiler
+
+    compiler = asyncio.run(run())
+
+    assert compiler.base_files == ["robot_standard.pop"]
+    assert compiler.mission["WaveSchedule"]["StartingCurrency"] == "400"
+    exported = (tmp_path / "async.pop").read_text(encoding="utf-8")
+    assert exported == (tmp_path / "sync.pop").read_text(encoding="utf-8")
+    assert ValveFormat().parse_buffer(exported) == ValveFormat().parse_file(str(mission))
+
+
+def test_custom_executor(mission):
+    """Разбор выполняется в переданном пуле."""
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="popfile") as executor:
+        compiler = asyncio.run(AsyncPopFileCompiler(executor=executor).load_async(mission))
+
+    assert compiler.get_robots(1)[0].class_name == "Heavyweapons"
+
+
+def test_load_sections(mission, tmp_path):
+    """Выборочная загрузка сохраняет невыбранные блоки в исходном виде."""
+    async def run():
+        facade = AsyncPopFileCompiler()
+        await facade.load_async(mission, sections=["Templates"])
+        await facade.export_async(tmp_path / "async.pop")
+        return facade.compiler
+
+    compiler = asyncio.run(run())
+
+    assert compiler.waves == []
+    exported = (tmp_path / "async.pop").read_text(encoding="utf-8")
+    assert exported == POPFILE.replace("400", '"400"')
+
+
+def test_limiter_bounds_concurrency(tmp_path, monkeypatch):
+    """Одновременно выполняется не больше limit операций."""
+    from pop_file_parser import async_compiler
+
+    paths = []
+    for index in range(6):
+        path = tmp_path / f"mission_{index}.pop"
+        path.write_text(f"WaveSchedule {{ StartingCurrency {index} }}", encoding="utf-8")
+        paths.append(path)
+
+    active = 0
+    peak = 0
+    parse = async_compiler.parse_mission
+
+    def tracked(data, sections=None, comments=True):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        try:
+            return parse(data, sections, comments)
+        finally:
+            active -= 1
+
+    monkeypatch.setattr(async_compiler, "parse_mission", tracked)
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        compilers = asyncio.run(load_many_async(paths, executor=executor, limit=2))
+
+    assert peak <= 2
+    assert [c.mission["WaveSchedule"]["StartingCurrency"] for c in compilers] == [str(i) for i in range(6)]
+
+
+def test_invalid_limit():
+    with pytest.raises(ValueError, match="limit"):
+        AsyncPopFileCompiler(limit=0)
@@ -0,0 +1,72 @@
+"""
+Тесты пакетного разбора pop файлов.
+"""
+import pickle
+import pytest
+from pop_file_parser.batch import LoadResult, find_mission_files, load_file, load_many
+from pop_file_parser.valve_parser import ValveFormat
+
+
+@pytest.fixture
+def mission_dir(tmp_path):
+    """Каталог с тремя миссиями, одна из них с ошибкой."""
+    for index in range(2):
+        (tmp_path / f"mission_{index}.pop").write_text(
+            f'WaveSchedule {{ StartingCurrency {400 + index} Wave {{ WaveSpawn {{ Where spawnbot }} }} }}',
+            encoding="utf-8",
+        )
+    (tmp_path / "broken.pop").write_text("WaveSchedule { Wave {", encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("not a mission", encoding="utf-8")
+    return tmp_path
+
+
+def test_find_mission_files(mission_dir):
+    """Файлы выбираются по шаблону и сортируются."""
+    names = [path.name for path in find_mission_files(mission_dir)]
+    assert names == ["broken.pop", "mission_0.pop", "mission_1.pop"]
+
+
+def test_load_file_result(mission_dir):
+    """Результат содержит дерево, время разбора и переносится через pickle."""
+    path = mission_dir / "mission_0.pop"
+    result = load_file(path)
+
+    assert result.ok
+    assert result.seconds >= 0
+    assert result.tree() == ValveFormat().parse_file(str(path))
+    assert pickle.loads(pickle.dumps(result)) == result
+
+
+def test_load_file_error(mission_dir):
+    """Ошибка разбора сохраняется в результате."""
+    result = load_file(mission_dir / "broken.pop")
+
+    assert not result.ok
+    assert result.error.startswith("ValueError")
+    with pytest.raises(ValueError, match="broken.pop"):
+        result.tree()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_load_many_keeps_order(mission_dir, workers):
+    """Результаты возвращаются в порядке путей, в пуле и без него."""
+    paths = find_mission_files(mission_dir)
+    results = load_many(paths, workers=workers)
+
+    assert all(isinstance(result, LoadResult) for result in results)
+    assert [result.path for result in results] == [str(path) for path in paths]
+    assert [result.ok for result in results] == [False, True, True]
+    assert results[2].tree()["WaveSchedule"]["StartingCurrency"] == "401"
+
+
+def test_load_many_with_bases(tmp_path):
+    """Директивы #base подключаются по флагу bases."""
+    (tmp_path / "robot_standard.pop").write_text('WaveSchedule { Templates { T_Heavy { Class Heavyweapons } } }', encoding="utf-8")
+    mission = tmp_path / "mission.pop"
+    mission.write_text('#base robot_standard.pop\nWaveSchedule { StartingCurrency 400 }', encoding="utf-8")
+
+    plain, = load_many([mission], workers=1)
+    merged, = load_many([mission], workers=1, bases=True)
+
+    assert "Templates" not in plain.tree()["WaveSchedule"]
+    assert merged.tree()["WaveSchedule"]["Templates"]["T_Heavy"]["Class"] == "Heavyweapons"
@@ -134,3 +134,145 @@ def test_duplicate_wave_ids(compiler):
     
     compiler.waves = [wave1, wave2]
     assert compiler.validate() == False
+
+def _build_waves(compiler):
+    """Три волны по два WaveSpawn с роботами и танк."""
+    from pop_file_parser.models.tank import Tank
+    from pop_file_parser.models.tf_bot import TFBot
+    from pop_file_parser.models.wave_spawn import WaveSpawn
+    
+    for index in range(3):
+        wave = Wave(checkpoint=True)
+        for spawn_index in range(2):
+            spawn = WaveSpawn(where="spawnbot", total_count=5 + spawn_index)
+            spawn.squad.append(TFBot(class_name="Heavyweapons", health=300 + index))
+            wave.wave_spawns.append(spawn)
+        wave.tanks.append(Tank(health=20000))
+        compiler.waves.append(wave)
+
+def _expected_export(compiler):
+    """Полный экспорт без кэша: волны из compiler.waves в конце WaveSchedule."""
+    from pop_file_parser.valve_parser import ValveFormat
+    
+    schedule = dict(compiler.mission["WaveSchedule"])
+    schedule["Wave"] = [wave.to_valve_format() for wave in compiler.waves]
+    return ValveFormat().dump({"WaveSchedule": schedule})
+
+def test_incremental_export_rerenders_only_changed_models(tmp_path, monkeypatch):
+    """Повторный экспорт перерисовывает только измененные модели."""
+    from pop_file_parser.models.wave_spawn import WaveSpawn
+    
+    compiler = PopFileCompiler()
+    compiler.add_global_settings({"StartingCurrency": 400})
+    _build_waves(compiler)
+    output = tmp_path / "mission.pop"
+    
+    compiler.export_to_file(output)
+    assert output.read_text(encoding="utf-8") == _expected_export(compiler)
+    assert not any(wave.is_dirty for wave in compiler.waves)
+    
+    rendered = []
+    original = WaveSpawn.to_valve_format
+    monkeypatch.setattr(WaveSpawn, "to_valve_format",
+                        lambda spawn: rendered.append(spawn) or original(spawn))
+    
+    compiler.edit_robot(2, 0, {"health": 999}, spawn_index=1)
+    compiler.remove_robot(3, 0, spawn_index=0)
+    assert compiler.waves[1].is_dirty and not compiler.waves[0].is_dirty
+    compiler.export_to_file(output)
+    
+    assert rendered == [compiler.waves[1].wave_spawns[1], compiler.waves[2].wave_spawns[0]]
+    monkeypatch.undo()
+    assert output.read_text(encoding="utf-8") == _expected_export(compiler)
+    
+    compiler.waves[0].checkpoint = False
+    compiler.waves.pop()
+    compiler.export_to_file(output)
+    assert output.read_text(encoding="utf-8") == _expected_export(compiler)
+
+LOADED_POP = """WaveSchedule
+{
+	StartingCurrency 400
+	Wave
+	{
+		Checkpoint Yes
+		WaveSpawn
+		{
+			Name "Scouts"
+			TotalCount 10
+			TFBot
+			{
+				Class Scout
+				ClassIcon scout_fan
+			}
+		}
+		WaveSpawn
+		{
+			Name "Heavies"
+			TFBot
+			{
+				Class Heavyweapons
+			}
+		}
+	}
+	Wave
+	{
+		WaveSpawn
+		{
+			TFBot
+			{
+				Class Soldier
+			}
+		}
+	}
+	Mission
+	{
+		Objective DestroySentries
+	}
+}"""
+
+def test_load_file_populates_waves(tmp_path):
+    """Волны загруженного файла становятся моделями; экспорт без правок не меняет дерево."""
+    from pop_file_parser.valve_parser import ValveFormat
+    
+    path = tmp_path / "mission.pop"
+    path.write_text(LOADED_POP, encoding="utf-8")
+    compiler = PopFileCompiler()
+    compiler.load_file(path)
+    
+    assert len(compiler.waves) == 2
+    assert "Wave" not in compiler.mission["WaveSchedule"]
+    tree = ValveFormat().parse_buffer(LOADED_POP)
+    assert compiler.render_export() == ValveFormat().dump(tree)
+    
+    # Правка робота перерисовывает только его WaveSpawn
+    compiler.mark_exported()
+    compiler.edit_robot(1, 0, {"health": 500}, spawn_index=1)
+    exported = ValveFormat().parse_buffer(compiler.render_export())["WaveSchedule"]
+    spawns = exported["Wave"][0]["WaveSpawn"]
+    assert spawns[1]["TFBot"]["Health"] == "500"
+    assert spawns[0] == tree["WaveSchedule"]["Wave"][0]["WaveSpawn"][0]
+    assert exported["Wave"][0]["Checkpoint"] == "Yes"
+    assert exported["Mission"] == {"Objective": "DestroySentries"}
+
+def test_load_file_sections_writes_skipped_blocks_verbatim(tmp_path):
+    """Невыбранные блоки экспортируются исходным текстом на своих местах."""
+    from pop_file_parser.models.tf_bot import TFBot
+    from pop_file_parser.valve_parser import ValveFormat
+    
+    path = tmp_path / "mission.pop"
+    path.write_text(LOADED_POP, encoding="utf-8")
+    compiler = PopFileCompiler()
+    compiler.load_file(path, sections=["Wave[1]"])
+    
+    assert len(compiler.waves) == 1
+    assert compiler.get_robots(1)[0].class_name == "Soldier"
+    # Загруженные значения выводятся форматтером, пропущенные блоки - как в файле
+    assert compiler.render_export() == LOADED_POP.replace("400", '"400"').replace(
+        "Class Soldier", 'Class "Soldier"')
+    
+    compiler.get_wave_spawn(1).squad.append(TFBot(class_name="Pyro"))
+    exported = compiler.render_export()
+    tree = ValveFormat().parse_buffer(exported)["WaveSchedule"]
+    assert [bot["Class"] for bot in tree["Wave"][1]["WaveSpawn"]["Squad"]["TFBot"]] == ["Soldier", "Pyro"]
+    assert "\t\t\t\tClassIcon scout_fan" in exported.splitlines()
@@ -0,0 +1,103 @@
+"""
+Тесты оценки сложности волн.
+"""
+import pytest
+from pop_file_parser.difficulty import DifficultyEstimator
+from pop_file_parser.models.mission_info import MissionInfo
+from pop_file_parser.models.tank import Tank
+from pop_file_parser.models.template import TemplateManager
+from pop_file_parser.models.tf_bot import TFBot
+from pop_file_parser.models.wave import Wave
+from pop_file_parser.models.wave_spawn import WaveSpawn
+
+
+def test_bot_score_factors():
+    """Здоровье, навык, криты, гигант и атрибуты повышают оценку."""
+    estimator = DifficultyEstimator()
+    base = estimator.bot_score(TFBot(class_name="Soldier"))
+
+    assert base == pytest.approx(2.0)
+    assert estimator.bot_score(TFBot(class_name="Soldier", skill="Expert")) == pytest.approx(3.0)
+    assert estimator.bot_score(TFBot(class_name="Soldier", attributes={"AlwaysCrit"})) == pytest.approx(6.0)
+    giant = TFBot(class_name="Soldier", health="3800", attributes={"MiniBoss"}, scale=1.75)
+    assert estimator.bot_score(giant) > 38 * 1.5
+    faster = TFBot(class_name="Soldier", character_attributes={"damage bonus": "2", "fire rate bonus": "0.5"})
+    assert estimator.bot_score(faster) == pytest.approx(8.0)
+    assert estimator.bot_score(Tank(health=20000, speed=150)) == pytest.approx(100.0)
+
+
+def test_cache_keyed_by_content():
+    """Одинаковые по содержимому роботы оцениваются один раз."""
+    estimator = DifficultyEstimator()
+    estimator.bot_score(TFBot(class_name="Pyro", attributes={"AlwaysCrit"}))
+    estimator.bot_score(TFBot(class_name="Pyro", attributes={"AlwaysCrit"}))
+
+    assert (estimator.misses, estimator.hits, len(estimator)) == (1, 1, 1)
+
+
+def test_in_place_edit_rescored():
+    """Правка списков и словарей робота на месте меняет ключ кэша."""
+    estimator = DifficultyEstimator()
+    bot = TFBot(class_name="Soldier", health=300)
+    assert estimator.bot_score(bot) == pytest.approx(3.0)
+
+    bot.character_attributes["damage bonus"] = 5
+    assert estimator.bot_score(bot) == pytest.approx(15.0)
+    assert estimator.bot_score(bot) == DifficultyEstimator().bot_score(bot)
+
+    bot.items.append("The Black Box")
+    estimator.bot_score(bot)
+    assert estimator.misses == 3
+
+
+def test_rescore_after_edit_touches_changed_bot(monkeypatch):
+    """После правки одного робота пересчитывается только он."""
+    waves = [
+        Wave(wave_spawns=[WaveSpawn(total_count=5, squad=[TFBot(class_name=name)])])
+        for name in ("Scout", "Soldier", "Pyro")
+    ]
+    mission = MissionInfo(waves=waves)
+    estimator = DifficultyEstimator()
+    before = estimator.score_mission(mission)
+    assert estimator.misses == 3
+
+    waves[1].wave_spawns[0].squad[0].health = 1000
+    # Неизмененные роботы берутся из кэша по запомненному ключу
+    monkeypatch.setattr(TFBot, "to_valve_format", None)
+    after = estimator.score_mission(mission)
+
+    assert estimator.misses == 4
+    assert estimator.hits == 2
+    assert after[1].score > before[1].score
+    assert after[0].score == before[0].score
+
+
+def test_wave_concurrency():
+    """Больше одновременно живых роботов - выше оценка при том же составе."""
+    bot = TFBot(class_name="Heavyweapons")
+    calm = Wave(wave_spawns=[WaveSpawn(total_count=10, max_active=1, squad=[bot])])
+    rush = Wave(wave_spawns=[WaveSpawn(total_count=10, spawn_count=10, squad=[bot])])
+    estimator = DifficultyEstimator()
+
+    calm_score = estimator.score_wave(calm)
+    rush_score = estimator.score_wave(rush)
+    assert calm_score.robots == rush_score.robots == pytest.approx(30.0)
+    assert (calm_score.peak, rush_score.peak) == (1, 10)
+    assert rush_score.score > calm_score.score
+
+
+def test_templates_resolved():
+    """Роботы-шаблоны оцениваются после раскрытия шаблона."""
+    templates = TemplateManager()
+    templates.add_template("T_Giant", TFBot(class_name="Heavyweapons", health=5000, attributes={"MiniBoss"}))
+    estimator = DifficultyEstimator(templates=templates)
+    bot = TFBot(template="T_Giant")
+
+    assert estimator.bot_score(bot) == pytest.approx(75.0)
+    assert estimator.bot_score(bot) == pytest.approx(75.0)
+    assert estimator.misses == 1
+
+    # Изменение шаблона меняет ключ раскрытого робота
+    templates.add_template("T_Giant", TFBot(class_name="Heavyweapons", health=3000, attributes={"MiniBoss"}))
+    assert estimator.bot_score(bot) == pytest.approx(45.0)
+    assert estimator.misses == 2
@@ -0,0 +1,84 @@
+"""
+Тесты анализа экономики миссий.
+"""
+import json
+from pop_file_parser.economy import analyze_directory, analyze_tree, economy_json, economy_rows
+from pop_file_parser.models.wave_spawn import WaveSpawn
+from pop_file_parser.valve_parser import ValveFormat
+
+POPFILE = """
+WaveSchedule
+{
+    StartingCurrency 800
+    Wave
+    {
+        WaveSpawn { TotalCount 10 TotalCurrency 200 TFBot { Class Scout } }
+        WaveSpawn { TotalCount 5 TotalCurrency 100 TFBot { Class Heavyweapons } }
+        WaveSpawn { Support 1 TotalCount 4 TotalCurrency 50 TFBot { Class Medic } }
+    }
+    Wave
+    {
+        WaveSpawn { TotalCount 20 TotalCurrency 400 TFBot { Class Soldier } }
+        WaveSpawn { Support Limited TotalCount 2 TotalCurrency 25 TFBot { Class Sniper } }
+    }
+}
+"""
+
+
+def test_waves_cumulative_and_deltas():
+    """Кредиты волн накапливаются поверх StartingCurrency, поддержка не учитывается."""
+    economy = analyze_tree(ValveFormat().parse_buffer(POPFILE), "mission.pop")
+    first, second = economy.waves
+
+    assert economy.starting_currency == 800
+    assert (first.currency, first.robots, first.available, first.cumulative, first.delta) == (300, 15, 800, 1100, 300)
+    assert first.per_robot == 20
+    assert first.support_currency == 50
+    # Support Limited тоже не приносит кредитов
+    assert (second.currency, second.robots, second.available, second.cumulative, second.delta) == (400, 20, 1100, 1500, 100)
+    assert second.support_currency == 25
+    assert economy.total_currency == 700
+
+
+def test_single_wave_and_empty():
+    """Одна волна без списка и волна без роботов."""
+    economy = analyze_tree(ValveFormat().parse_buffer("WaveSchedule { Wave { WaitWhenDone 65 } }"))
+
+    wave, = economy.waves
+    assert (wave.currency, wave.robots, wave.per_robot, wave.available) == (0, 0, 0.0, 400)
+
+
+def test_fractional_and_malformed_currency():
+    """Дробные TotalCurrency округляются вниз, нечисловые пропускаются."""
+    text = """WaveSchedule { Wave {
+        WaveSpawn { TotalCount 2.0 TotalCurrency 100.5 }
+        WaveSpawn { TotalCount 1 TotalCurrency lots }
+    } }"""
+    wave, = analyze_tree(ValveFormat().parse_buffer(text)).waves
+
+    assert (wave.currency, wave.robots) == (100, 3)
+
+
+def test_support_limited_round_trip():
+    """Support Limited читается и записывается обратно."""
+    spawn = WaveSpawn.from_valve_format({"Support": "Limited", "TotalCount": "2"})
+
+    assert spawn.support and spawn.support_limited
+    assert spawn.to_valve_format()["Support"] == "Limited"
+
+
+def test_directory_rows_and_json(tmp_path):
+    """Каталог миссий превращается в таблицу и JSON; ошибки сохраняются."""
+    (tmp_path / "a.pop").write_text(POPFILE, encoding="utf-8")
+    (tmp_path / "b.pop").write_text("WaveSchedule { Wave {", encoding="utf-8")
+    economies = analyze_directory(tmp_path, workers=1)
+
+    assert [economy.error is None for economy in economies] == [True, False]
+    rows = economy_rows(economies)
+    assert [(row["wave"], row["currency"]) for row in rows] == [(1, 300), (2, 400)]
+    assert rows[0]["per_robot"] == 20
+
+    data = json.loads(economy_json(economies))
+    assert data[0]["total_currency"] == 700
+    assert data[0]["waves"][1]["available"] == 1100
+    assert data[1]["error"].startswith("ValueError")
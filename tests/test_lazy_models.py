@@ -0,0 +1,101 @@
+"""
+Тесты ленивого создания моделей из формата Valve.
+"""
+import pytest
+from pop_file_parser.models.mission_info import MissionInfo
+from pop_file_parser.models.tank import Tank
+from pop_file_parser.models.tf_bot import TFBot
+from pop_file_parser.models.wave import Wave
+from pop_file_parser.models.wave_spawn import WaveSpawn
+
+
+@pytest.fixture
+def wave_data():
+    """Словарь волны с одиночным роботом, отрядом и танком."""
+    return {
+        "__comment": "// первая волна",
+        "WaveSpawn": [
+            {"Name": "scouts", "TotalCount": 10, "TFBot": {"Class": "Scout", "Health": 125}},
+            {"Name": "squad", "Squad": {"TFBot": [{"Class": "Medic"}, {"Class": "Heavyweapons"}]}},
+        ],
+        "Tank": {"Name": "tankboss", "Health": 20000},
+    }
+
+
+def test_lazy_wave_defers_children(wave_data):
+    """Дочерние модели не создаются до первого обращения."""
+    wave = Wave.from_valve_format(wave_data, lazy=True)
+
+    assert wave.comment == "// первая волна"
+    assert not wave.is_materialized("wave_spawns")
+    assert not wave.is_materialized("tanks")
+
+    spawns = wave.wave_spawns
+    assert wave.is_materialized("wave_spawns")
+    assert not wave.is_materialized("tanks")
+    assert [spawn.name for spawn in spawns] == ["scouts", "squad"]
+    # Построенное поле запоминается
+    assert wave.wave_spawns is spawns
+
+    # Дочерние WaveSpawn тоже ленивые
+    assert not spawns[1].is_materialized("squad")
+    assert [bot.class_name for bot in spawns[1].squad] == ["Medic", "Heavyweapons"]
+    assert isinstance(wave.tanks[0], Tank)
+
+
+def test_lazy_wave_matches_eager(wave_data):
+    """Ленивая и обычная модели дают одинаковый результат."""
+    eager = Wave.from_valve_format(wave_data)
+    lazy = Wave.from_valve_format(wave_data, lazy=True)
+
+    assert eager.is_materialized("wave_spawns")
+    assert lazy == eager
+    assert lazy.to_valve_format() == eager.to_valve_format()
+
+
+def test_lazy_wave_drops_raw_data_when_built(wave_data):
+    """После построения всех полей ссылка на словарь не хранится."""
+    wave = Wave.from_valve_format(wave_data, lazy=True)
+    wave.wave_spawns
+    assert hasattr(wave, "_raw")
+    wave.tanks
+    assert not hasattr(wave, "_raw")
+
+
+def test_lazy_assignment_replaces_children(wave_data):
+    """Присвоенное поле не перезаписывается данными из словаря."""
+    wave = Wave.from_valve_format(wave_data, lazy=True)
+    wave.tanks = []
+
+    assert wave.tanks == []
+    assert len(wave.wave_spawns) == 2
+
+
+def test_lazy_materialization_keeps_clean_state(wave_data):
+    """Построение поля не помечает модель измененной."""
+    spawn = WaveSpawn.from_valve_format(wave_data["WaveSpawn"][0], lazy=True)
+    spawn.mark_clean()
+    assert not spawn.is_dirty
+
+    spawn = WaveSpawn.from_valve_format(wave_data["WaveSpawn"][0], lazy=True)
+    object.__setattr__(spawn, '_dirty', False)
+    spawn.squad
+    assert not spawn.is_self_dirty
+
+
+def test_lazy_unknown_attribute_raises(wave_data):
+    """Обращение к несуществующему атрибуту - обычный AttributeError."""
+    wave = Wave.from_valve_format(wave_data, lazy=True)
+    with pytest.raises(AttributeError):
+        wave.robots
+    with pytest.raises(AttributeError):
+        TFBot().squad
+
+
+def test_mission_info_lazy_waves(wave_data):
+    """MissionInfo передает ленивый режим волнам."""
+    info = MissionInfo.from_valve_format({"Wave": [wave_data, wave_data]}, lazy=True)
+
+    assert len(info.waves) == 2
+    assert not any(wave.is_materialized("wave_spawns") for wave in info.waves)
+    assert info.waves[1].wave_spawns[0].squad[0].health == 125
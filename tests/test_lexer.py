@@ -121,3 +121,47 @@ def test_line_column_tracking():
     # Проверяем позицию открывающей скобки
     assert tokens[0].line > 1  # Должна быть после первой строки
     assert tokens[0].column > 1  # Должна быть после пробелов
+
+FAST_SAMPLES = [
+    '',
+    '\n{ Name "Heavy" }',
+    'WaveSchedule\n{\n\tStartingCurrency 400 // comment\n\tScale 1.75\n}\n',
+    '"escaped \\"quote\\" \\n \\t \\x"',
+    '[1 2.5 34 _x9]',
+    '"unterminated string\n  with newline',
+    'Ключ "значение" ٣٣ é_1',
+]
+
+@pytest.mark.parametrize('text', FAST_SAMPLES)
+def test_fast_scanner_matches_character_walk(text):
+    """Регулярный сканер выдает тот же поток токенов, что и посимвольный обход."""
+    lexer = Lexer()
+    assert lexer.tokenize(text, fast=True) == lexer.tokenize(text, fast=False)
+
+def test_fast_scanner_invalid():
+    """Регулярный сканер сообщает позицию некорректного символа."""
+    lexer = Lexer()
+    
+    with pytest.raises(Exception, match='line 2, column 3'):
+        lexer.tokenize('{\n  $', fast=True)
+
+def test_iter_tokens_is_lazy():
+    """Генератор токенов не сканирует текст дальше запрошенного."""
+    lexer = Lexer()
+    tokens = lexer.iter_tokens('{ Name "Heavy" } $')
+    
+    assert next(tokens).type == 'LBRACE'
+    assert next(tokens).value == 'Name'
+    assert [token.type for token in lexer.iter_tokens('{}')] == ['LBRACE', 'RBRACE', 'EOF']
+
+def test_token_buffer_matches_token_list():
+    """Компактный буфер выдает те же токены, что и список Token."""
+    lexer = Lexer()
+    text = '\nWaveSchedule\n{\n\tName "Heavy \\"Boss\\""\n\tScale 1.75 // giant\n\tItems [1 2]\n}\n'
+    buffer = lexer.tokenize_compact(text)
+    
+    assert len(buffer) == len(lexer.tokenize(text))
+    assert list(buffer) == lexer.tokenize(text)
+    assert buffer.type_at(3) == 'STRING'
+    assert buffer.value_at(3) == 'Heavy "Boss"'
+    assert buffer[-1] == Token('EOF', None, 7, 1)
@@ -0,0 +1,46 @@
+"""
+Тесты моделей со __slots__.
+"""
+import copy
+import pickle
+import pytest
+from pop_file_parser.models import Robot, Tank, TFBot, Wave, WaveSpawn
+from pop_file_parser.models.output_block import OutputBlock
+
+
+@pytest.mark.parametrize("model", [TFBot(), WaveSpawn(), Wave(), Tank(), OutputBlock(), Robot(name="Heavy")])
+def test_models_have_no_instance_dict(model):
+    """Экземпляры моделей хранят поля в слотах."""
+    assert not hasattr(model, "__dict__")
+    with pytest.raises(AttributeError):
+        model.unknown_field = 1
+
+
+def test_slotted_defaults_and_factories():
+    """Значения по умолчанию сохраняются, изменяемые значения не общие."""
+    first, second = TFBot(), TFBot()
+    first.items.append("The Brass Beast")
+
+    assert first.comment == "" and first.skill == "Normal" and first.scale == 1.0
+    assert second.items == []
+    assert Tank().speed == 75
+
+
+def test_slotted_models_copy_and_pickle():
+    """Копирование и pickle работают для моделей со слотами."""
+    spawn = WaveSpawn(name="giants", comment="// гиганты")
+    spawn.squad.append(TFBot(class_name="Heavyweapons", health=5000))
+    wave = Wave(wave_spawns=[spawn], tanks=[Tank(health=20000)])
+
+    assert copy.deepcopy(wave) == wave
+    assert pickle.loads(pickle.dumps(wave)) == wave
+
+
+def test_slotted_models_keep_dirty_tracking():
+    """DirtyTrackingMixin работает без __dict__."""
+    bot = TFBot()
+    assert bot.is_dirty
+    bot.mark_clean()
+    assert not bot.is_dirty
+    bot.health = 300
+    assert bot.is_dirty
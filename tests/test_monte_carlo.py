@@ -0,0 +1,85 @@
+"""
+Тесты Монте-Карло оценки состава волн.
+"""
+import pytest
+from pop_file_parser.models.mission_info import MissionInfo
+from pop_file_parser.models.tank import Tank
+from pop_file_parser.models.template import TemplateManager
+from pop_file_parser.models.tf_bot import TFBot
+from pop_file_parser.models.wave import Wave
+from pop_file_parser.models.wave_spawn import WaveSpawn
+from pop_file_parser.monte_carlo import MonteCarloEngine, robot_spec
+
+SCOUT = TFBot(class_name="Scout")
+GIANT = TFBot(class_name="Heavyweapons", health=5000, attributes={"MiniBoss"})
+
+
+def random_wave(total=10) -> Wave:
+    return Wave(wave_spawns=[WaveSpawn(total_count=total, random_choice=True, squad=[SCOUT, GIANT])])
+
+
+def test_robot_spec():
+    """Здоровье по умолчанию берется по классу, MiniBoss - гигант."""
+    assert robot_spec(SCOUT) == ("Scout", 125, False)
+    assert robot_spec(TFBot(class_name="Soldier", health="800")) == ("Soldier", 800, False)
+    assert robot_spec(GIANT) == ("Heavyweapons", 5000, True)
+    assert robot_spec(Tank(health=20000)) == ("Tank", 20000, False)
+
+
+def test_fixed_wave_has_no_spread():
+    """Без RandomChoice все реализации одинаковы; поддержка не учитывается."""
+    wave = Wave(wave_spawns=[
+        WaveSpawn(total_count=4, squad=[SCOUT, GIANT]),
+        WaveSpawn(total_count=0, support=True, squad=[SCOUT]),
+    ])
+    result = MonteCarloEngine(samples=20, seed=1).sample_wave(wave)
+
+    assert set(result.health) == {2 * 125 + 2 * 5000}
+    assert set(result.giants) == {2}
+    assert result.summary()["health"]["stdev"] == 0
+    assert result.random_spawns == 0
+
+
+def test_random_choice_distribution():
+    """Выборы RandomChoice распределены равновероятно и воспроизводимы по seed."""
+    engine = MonteCarloEngine(samples=2000, seed=42)
+    result = engine.sample_wave(random_wave())
+    summary = result.summary()
+
+    assert result.random_spawns == 1
+    assert summary["giants"]["mean"] == pytest.approx(5, abs=0.2)
+    assert 0 <= summary["giants"]["min"] < summary["giants"]["max"] <= 10
+    assert all(scouts + giants == 10 for scouts, giants in zip(result.classes["Scout"], result.giants))
+    assert all(hp == 125 * scouts + 5000 * giants
+               for hp, scouts, giants in zip(result.health, result.classes["Scout"], result.giants))
+    assert MonteCarloEngine(samples=2000, seed=42).sample_wave(random_wave()).health == result.health
+
+
+def test_waves_use_one_stream():
+    """Одинаковые волны миссии получают разные выборы, результат воспроизводим по seed."""
+    mission = MissionInfo(waves=[random_wave(), random_wave()])
+    first, second = MonteCarloEngine(samples=200, seed=7).sample_mission(mission)
+
+    assert first.health != second.health
+    again = MonteCarloEngine(samples=200, seed=7).sample_mission(mission)
+    assert [result.health for result in again] == [first.health, second.health]
+
+
+def test_templates_resolved():
+    """Роботы-шаблоны раскрываются через resolve."""
+    templates = TemplateManager()
+    templates.add_template("T_Giant", GIANT)
+    wave = Wave(wave_spawns=[WaveSpawn(total_count=3, squad=[TFBot(template="T_Giant")])])
+
+    result = MonteCarloEngine(samples=5, resolve=templates.resolve_bot).sample_wave(wave)
+    assert list(result.giants) == [3] * 5
+
+
+def test_random_choice_round_trip():
+    """RandomChoice сохраняется при чтении и записи WaveSpawn."""
+    data = {"TotalCount": "2", "RandomChoice": {"TFBot": [{"Class": "Scout"}, {"Class": "Pyro"}]}}
+    spawn = WaveSpawn.from_valve_format(data)
+
+    assert spawn.random_choice
+    assert [bot.class_name for bot in spawn.squad] == ["Scout", "Pyro"]
+    assert spawn.to_valve_format()["RandomChoice"]["TFBot"][1]["Class"] == "Pyro"
@@ -0,0 +1,80 @@
+"""
+Тесты для дискового кэша разбора.
+"""
+import pytest
+from pop_file_parser.parse_cache import ParseCache
+from pop_file_parser.parser import Parser
+from pop_file_parser.valve_parser import ValveFormat
+
+POP = 'WaveSchedule { StartingCurrency 400 // старт\n Wave { Checkpoint Yes } }'
+
+@pytest.fixture
+def pop_file(tmp_path):
+    """Фикстура для создания временного pop файла."""
+    path = tmp_path / "mission.pop"
+    path.write_text(POP, encoding="utf-8")
+    return path
+
+def test_parse_file_hits_cache(tmp_path, pop_file):
+    """Повторный разбор неизмененного файла берется из кэша."""
+    cache = ParseCache(tmp_path / "cache")
+    parser = ValveFormat(cache=cache)
+    
+    first = parser.parse_file(str(pop_file))
+    first["WaveSchedule"]["Wave"]["Checkpoint"] = "No"
+    second = ValveFormat(cache=ParseCache(tmp_path / "cache")).parse_file(str(pop_file))
+    
+    assert second == ValveFormat().parse_file(str(pop_file))
+    assert cache.stats()["misses"] == 1
+    assert parser.parse_file(str(pop_file)) == second
+    assert cache.stats()["hits"] == 1
+
+def test_cache_key_depends_on_content_and_options(tmp_path, pop_file):
+    """Измененное содержимое и другие параметры разбора не дают попадания."""
+    cache = ParseCache(tmp_path / "cache")
+    parser = ValveFormat(cache=cache)
+    
+    parser.parse_file(str(pop_file))
+    assert parser.parse_file(str(pop_file), comments=False) == {
+        "WaveSchedule": {"StartingCurrency": "400", "Wave": {"Checkpoint": "Yes"}}
+    }
+    pop_file.write_text(POP.replace("400", "800"), encoding="utf-8")
+    assert parser.parse_file(str(pop_file))["WaveSchedule"]["StartingCurrency"] == "800"
+    assert cache.stats()["misses"] == 3
+    assert cache.stats()["entries"] == 3
+
+def test_lru_eviction(tmp_path):
+    """При превышении лимита вытесняются давно не использованные записи."""
+    cache = ParseCache(tmp_path / "cache")
+    keys = [cache.key("test", bytes([i])) for i in range(3)]
+    cache.put(keys[0], {"a": "x" * 100})
+    size = cache.stats()["bytes"]
+    cache.max_bytes = size * 2
+    cache.put(keys[1], {"a": "y" * 100})
+    
+    assert cache.get(keys[0]) == {"a": "x" * 100}
+    cache.put(keys[2], {"a": "z" * 100})
+    
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 2
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    """Поврежденная запись считается промахом и удаляется."""
+    cache = ParseCache(tmp_path / "cache")
+    key = cache.key("test", b"data")
+    cache.put(key, ["value"])
+    (tmp_path / "cache" / f"{key}.cache").write_bytes(b"garbage")
+    
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 0
+
+def test_parser_errors_are_not_cached(tmp_path):
+    """Ошибка разбора Parser.parse не сохраняется в кэш."""
+    cache = ParseCache(tmp_path / "cache")
+    
+    with pytest.raises(Exception):
+        Parser(cache=cache).parse('{ "Name": ')
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["misses"] == 1
@@ -2,6 +2,7 @@
 Тесты для парсера.
 """
 import pytest
+from pop_file_parser.lexer import Token
 from pop_file_parser.parser import Parser, Mission, Wave, Robot, Template
 
 TEST_POP = """
@@ -189,4 +190,58 @@ def test_parse_nested_blocks(parser):
     assert attributes["Damage"] == 150
     assert isinstance(attributes["Effects"], dict)
     assert attributes["Effects"]["Fire"] == True
-    assert attributes["Effects"]["Duration"] == 5
\ No newline at end of file
+    assert attributes["Effects"]["Duration"] == 5
+
+def test_parse_block_from_token_stream(parser):
+    """Тест разбора блока из генератора токенов без полного списка."""
+    text = 'TFBot { Class Heavyweapons Health 300 Scale 1.5 Tags [giant boss] } Rest'
+    tokens = parser.lexer.iter_tokens(text)
+    
+    parser.reset(tokens)
+    parser.eat('IDENTIFIER')
+    block = parser.parse_block()
+    
+    assert block == {
+        'Class': 'Heavyweapons',
+        'Health': 300,
+        'Scale': 1.5,
+        'Tags': ['giant', 'boss']
+    }
+    # Просмотр только на один токен вперед: остаток потока не прочитан
+    assert parser.current_token.value == 'Rest'
+    assert next(tokens).type == 'EOF'
+
+def test_parse_block_from_token_buffer(parser):
+    """Тест разбора блока напрямую из компактного буфера токенов."""
+    buffer = parser.lexer.tokenize_compact('{ Class Scout Health 125 }')
+    
+    parser.reset(buffer)
+    
+    assert parser.parse_block() == {'Class': 'Scout', 'Health': 125}
+    assert parser.current_token.type == 'EOF'
+
+def test_token_buffer_walked_by_index(parser):
+    """Буфер обходится курсором по индексу, без объектов Token."""
+    text = '{ Name "Heavy" Scale 1.5 Tags [giant boss] Sub { Skill Hard } }'
+    buffer = parser.lexer.tokenize_compact(text)
+    
+    parser.reset(buffer)
+    assert not isinstance(parser.current_token, Token)
+    block = parser.parse_block()
+    
+    parser.reset(parser.lexer.iter_tokens(text))
+    assert block == parser.parse_block()
+    
+    parser.reset(parser.lexer.tokenize_compact('{\n  Name ]\n}'))
+    with pytest.raises(Exception, match="line 2, column 8"):
+        parser.parse_block()
+
+def test_parse_deeply_nested_values(parser):
+    """Тест разбора вложенности глубже лимита рекурсии Python."""
+    depth = 5000
+    parser.reset(parser.lexer.iter_tokens("{ k [" * depth + " 1" + " ] }" * depth))
+    
+    node = parser.parse_value()
+    for _ in range(depth):
+        node = node["k"][0] if isinstance(node["k"][0], dict) else node["k"]
+    assert node == [1]
@@ -0,0 +1,82 @@
+"""
+Тесты общей таблицы строк парсеров.
+"""
+import sys
+from pop_file_parser.lexer import Lexer
+from pop_file_parser.string_table import STRINGS, StringTable
+from pop_file_parser.valve_parser import ValveFormat
+
+POPFILE = """
+WaveSchedule
+{
+    Wave
+    {
+        WaveSpawn { Where spawnbot TFBot { Class "Heavyweapons" Skill Expert } }
+        WaveSpawn { Where spawnbot TFBot { Class "Heavyweapons" Skill Expert } }
+    }
+}
+"""
+
+
+def test_table_returns_shared_objects():
+    """Одинаковые строки заменяются одним объектом."""
+    table = StringTable()
+    first = table["".join(["spawn", "bot"])]
+    second = table["".join(["spawn", "bot"])]
+
+    assert first == "spawnbot"
+    assert first is second
+
+
+def test_table_limits():
+    """Длинные строки и строки сверх лимита в таблицу не попадают."""
+    table = StringTable(max_length=8, max_entries=1)
+    table["spawnbot"]
+    assert "spawnbot" in table
+
+    long_value = "a very long description"
+    assert table[long_value] is long_value
+    assert long_value not in table
+    table["Expert"]
+    assert "Expert" not in table
+
+
+def test_seed_strings_are_interned():
+    """Ключи схемы из таблицы совпадают с интернированными строками."""
+    assert STRINGS["TFBot"] is sys.intern("TFBot")
+    assert "spawnbot" in STRINGS
+
+
+def test_parse_shares_strings_between_trees():
+    """Ключи и значения разных деревьев - общие объекты."""
+    formatter = ValveFormat()
+    formatter.strings = StringTable()
+    first = formatter.parse_buffer(POPFILE)
+    second = formatter.parse_buffer(POPFILE.encode("utf-8"))
+
+    assert first == second
+    spawns = first["WaveSchedule"]["Wave"]["WaveSpawn"] + second["WaveSchedule"]["Wave"]["WaveSpawn"]
+    classes = {id(spawn["TFBot"]["Class"]) for spawn in spawns}
+    keys = {id(key) for spawn in spawns for key in spawn["TFBot"]}
+    assert len(classes) == 1
+    assert len(keys) == 2
+
+
+def test_parse_without_table():
+    """strings = None отключает таблицу строк."""
+    formatter = ValveFormat()
+    formatter.strings = None
+    tree = formatter.parse_buffer(POPFILE)
+
+    spawns = tree["WaveSchedule"]["Wave"]["WaveSpawn"]
+    assert spawns[0]["Where"] == spawns[1]["Where"] == "spawnbot"
+    assert spawns[0]["TFBot"]["Class"] is not spawns[1]["TFBot"]["Class"]
+
+
+def test_lexer_values_from_table():
+    """Лексер берет строки и идентификаторы из общей таблицы."""
+    lexer = Lexer()
+    for fast in (True, False):
+        tokens = lexer.tokenize('TFBot { Class "Heavy" Skill Expert }', fast=fast)
+        assert tokens[0].value is STRINGS["TFBot"]
+        assert tokens[3].value is STRINGS["Heavy"]
@@ -0,0 +1,130 @@
+"""
+Тесты разрешения наследования шаблонов.
+"""
+import pytest
+from pop_file_parser.models.template import TemplateManager, merge_bots
+from pop_file_parser.models.tf_bot import TFBot
+from pop_file_parser.parser import Mission, Template
+from pop_file_parser.template_resolver import TemplateResolver
+
+
+@pytest.fixture
+def manager():
+    """Цепочка T_Giant -> T_Heavy -> T_Base и отдельный T_Scout."""
+    manager = TemplateManager()
+    base = TFBot(skill="Hard", attributes={"AlwaysCrit"}, character_attributes={"move speed bonus": 0.5})
+    manager.add_template("T_Base", base)
+    manager.add_template("T_Heavy", TFBot(
+        template="T_Base", class_name="Heavyweapons", health=300, items=["The Brass Beast"],
+    ))
+    manager.add_template("T_Giant", TFBot(
+        template="T_Heavy", health=5000, scale=1.75, attributes={"MiniBoss"},
+        character_attributes={"move speed bonus": 0.4, "damage force reduction": 0.3},
+    ))
+    manager.add_template("T_Scout", TFBot(class_name="Scout", health=125))
+    return manager
+
+
+def test_resolve_flattens_chain(manager):
+    """Итоговый робот содержит поля всей цепочки."""
+    giant = manager.resolve("T_Giant")
+
+    assert giant.template == ""
+    assert giant.class_name == "Heavyweapons"
+    assert giant.health == 5000
+    assert giant.skill == "Hard"
+    assert giant.scale == 1.75
+    assert giant.attributes == {"AlwaysCrit", "MiniBoss"}
+    assert giant.items == ["The Brass Beast"]
+    assert giant.character_attributes == {"move speed bonus": 0.4, "damage force reduction": 0.3}
+
+
+def test_resolve_is_memoised(manager):
+    """Шаблоны цепочки разрешаются один раз."""
+    giant = manager.resolve("T_Giant")
+    assert manager.resolve("T_Giant") is giant
+    assert manager.resolver.misses == 1
+    # Базовые шаблоны запомнены при разрешении цепочки
+    manager.resolve("T_Heavy")
+    assert manager.resolver.hits == 2
+    assert len(manager.resolver) == 3
+
+
+def test_resolve_bot_with_template_reference(manager):
+    """Робот со ссылкой на шаблон получает итоговые поля."""
+    bot = TFBot(template="T_Heavy", name="Heavy Mittens")
+    resolved = manager.resolve_bot(bot)
+
+    assert resolved.name == "Heavy Mittens"
+    assert resolved.health == 300
+    assert resolved.skill == "Hard"
+    assert bot.health == 0
+    plain = TFBot(class_name="Soldier")
+    assert manager.resolve_bot(plain) is plain
+
+
+def test_invalidate_drops_only_dependants(manager):
+    """Изменение шаблона сбрасывает только его наследников."""
+    giant = manager.resolve("T_Giant")
+    scout = manager.resolve("T_Scout")
+    base = manager.resolve("T_Base")
+
+    manager.templates["T_Heavy"].bot.health = 400
+    manager.invalidate("T_Heavy")
+
+    assert manager.resolve("T_Scout") is scout
+    assert manager.resolve("T_Base") is base
+    assert manager.resolve("T_Heavy").health == 400
+    # T_Giant наследует T_Heavy и разрешается заново
+    assert manager.resolve("T_Giant") is not giant
+
+
+def test_replace_template_invalidates_dependants(manager):
+    """Замена базового шаблона видна наследникам."""
+    assert manager.resolve("T_Giant").skill == "Hard"
+    manager.add_template("T_Base", TFBot(skill="Expert"))
+    assert manager.resolve("T_Giant").skill == "Expert"
+
+
+def test_cycle_and_missing_template(manager):
+    """Циклы и неизвестные шаблоны дают ValueError."""
+    manager.add_template("T_Base", TFBot(template="T_Giant"))
+    with pytest.raises(ValueError, match="T_Giant -> T_Heavy -> T_Base -> T_Giant"):
+        manager.resolve("T_Giant")
+
+    manager.remove_template("T_Base")
+    with pytest.raises(ValueError, match="T_Base not found"):
+        manager.resolve("T_Giant")
+    with pytest.raises(ValueError, match="T_Unknown not found"):
+        manager.resolve_bot(TFBot(template="T_Unknown"))
+
+
+def test_merge_bots_copies_containers():
+    """Итоговый робот не делит списки и словари с исходным."""
+    bot = TFBot(items=["Minigun"], character_attributes={"health regen": 5})
+    resolved = merge_bots(None, bot)
+
+    assert resolved == bot
+    assert resolved.items is not bot.items
+    assert resolved.character_attributes is not bot.character_attributes
+
+
+def test_parser_templates_resolve_base():
+    """Шаблоны разбора наследуют атрибуты через Base."""
+    mission = Mission(templates={
+        "T_Base": Template(name="Base", base=None, attributes={"Skill": "Hard", "Health": 300}),
+        "T_Heavy": Template(name="Heavy", base="T_Base", attributes={"Class": "Heavyweapons", "Health": 5000}),
+    })
+    resolver = mission.template_resolver()
+
+    assert resolver.resolve("T_Heavy") == {"Skill": "Hard", "Health": 5000, "Class": "Heavyweapons"}
+
+
+def test_long_chain_resolves_without_recursion():
+    """Длинная цепочка разрешается без рекурсии."""
+    resolver = TemplateResolver(
+        lambda name: int(name),
+        lambda value: str(value - 1) if value else None,
+        lambda base, value: (base or 0) + value,
+    )
+    assert resolver.resolve("5000") == sum(range(5001))
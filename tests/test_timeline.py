@@ -0,0 +1,138 @@
+"""
+Тесты моделирования хода волны.
+"""
+import pytest
+from pop_file_parser.models.mission_info import MissionInfo
+from pop_file_parser.models.tank import Tank
+from pop_file_parser.models.tf_bot import TFBot
+from pop_file_parser.models.wave import Wave
+from pop_file_parser.models.wave_spawn import WaveSpawn
+from pop_file_parser.timeline import TimelineSimulator
+
+
+def spawn(name="", total=4, **kwargs) -> WaveSpawn:
+    return WaveSpawn(name=name, total_count=total, squad=[TFBot()], **kwargs)
+
+
+def test_spawn_groups_and_end():
+    """Группы SpawnCount выходят через WaitBetweenSpawns после WaitBeforeStarting."""
+    wave = Wave(wave_spawns=[spawn("a", total=4, spawn_count=2, wait_between_spawns=5, wait_before_starting=3)])
+    timeline = TimelineSimulator(lifetime=10).simulate(wave)
+    schedule = timeline.spawns[0]
+
+    assert (schedule.start, schedule.first_spawn, schedule.all_spawned, schedule.all_dead) == (3, 3, 8, 18)
+    assert schedule.spawned == 4
+    assert timeline.end == 18
+    assert [timeline.alive_at(t) for t in (0, 3, 8, 13, 18)] == [0, 2, 4, 2, 0]
+    assert timeline.peak == 4
+
+
+def test_max_active_and_robot_limit():
+    """MaxActive и RobotLimit задерживают спавн до гибели роботов."""
+    wave = Wave(wave_spawns=[spawn("a", total=6, max_active=2)])
+    timeline = TimelineSimulator(lifetime=10).simulate(wave)
+    assert timeline.peak == 2
+    assert timeline.end == 30
+
+    wave = Wave(wave_spawns=[spawn("a", total=3), spawn("b", total=3)])
+    timeline = TimelineSimulator(robot_limit=4, lifetime=10).simulate(wave)
+    assert timeline.peak == 4
+    assert timeline.end == 20
+
+
+def test_wait_chains():
+    """WaitForAllSpawned и WaitForAllDead задают порядок WaveSpawn."""
+    wave = Wave(wave_spawns=[
+        spawn("a", total=2, wait_between_spawns=5, spawn_count=1),
+        spawn("b", total=1, wait_for_all_spawned="a"),
+        spawn("c", total=1, wait_for_all_dead="b", wait_before_starting=2),
+        spawn("d", total=1, wait_for_all_dead="missing"),
+    ])
+    timeline = TimelineSimulator(lifetime=10).simulate(wave)
+    starts = {schedule.name: schedule.start for schedule in timeline.spawns}
+
+    assert starts == {"a": 0, "b": 5, "c": 17, "d": 0}
+    assert timeline.end == 27
+
+
+def test_support_and_tanks():
+    """Поддержка не задерживает конец волны, танки не занимают слоты."""
+    tank = WaveSpawn(name="tank", total_count=1, squad=[Tank()])
+    support = spawn("support", total=0, support=True, wait_between_spawns=1)
+    wave = Wave(wave_spawns=[spawn("a", total=2, spawn_count=2), tank, support])
+    timeline = TimelineSimulator(robot_limit=3, lifetime=10, tank_lifetime=40).simulate(wave)
+
+    assert timeline.end == 40
+    assert timeline.peak == 3
+    assert timeline.spawns[2].spawned > 0
+    assert timeline.stalled == []
+
+
+def test_circular_wait_stalls():
+    """Взаимное ожидание WaveSpawn - волна не завершается."""
+    wave = Wave(wave_spawns=[
+        spawn("a", wait_for_all_dead="b"),
+        spawn("b", wait_for_all_dead="a"),
+    ])
+    timeline = TimelineSimulator().simulate(wave)
+
+    assert timeline.end is None
+    assert timeline.stalled == ["a", "b"]
+
+
+def test_mission_robot_limit():
+    """simulate_mission берет RobotLimit из миссии."""
+    info = MissionInfo(robot_limit=2, waves=[Wave(wave_spawns=[spawn("a", total=4)])])
+    timeline, = TimelineSimulator(lifetime=10).simulate_mission(info)
+
+    assert timeline.peak == 2
+    assert timeline.end == 20
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"lifetime": -1}, {"lifetime": 0}, {"tank_lifetime": 0}, {"lifetime": 1e-300},
+])
+def test_lifetime_must_advance_time(kwargs):
+    """Нулевое время жизни зациклило бы бесконечную поддержку в одном моменте."""
+    with pytest.raises(ValueError, match="lifetime"):
+        TimelineSimulator(**kwargs)
+
+
+def test_infinite_support_stops_at_horizon():
+    """Бесконечная поддержка с WaitBetweenSpawns 0 не мешает завершить моделирование."""
+    support = spawn("sup", total=5, support=True, spawn_count=1)
+    late = spawn("late", total=4, spawn_count=2, wait_before_starting=30)
+    timeline = TimelineSimulator(lifetime=0.5).simulate(Wave(wave_spawns=[late, support]))
+    assert timeline.end == 30.5
+
+    stalled = spawn("big", total=30, spawn_count=30)
+    timeline = TimelineSimulator(lifetime=0.5, horizon=100).simulate(Wave(wave_spawns=[stalled, support]))
+    assert timeline.end is None
+    assert timeline.stalled == ["big"]
+
+
+def test_support_limited_is_finite():
+    """Support Limited спавнит только TotalCount роботов."""
+    support = spawn("support", total=3, support=True, support_limited=True)
+    wave = Wave(wave_spawns=[spawn("a", total=1), support])
+    timeline = TimelineSimulator(lifetime=10).simulate(wave)
+
+    assert timeline.spawns[1].spawned == 3
+    assert timeline.end == 10
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_empty_spawn_does_not_shift_others(reverse):
+    """Пустой WaveSpawn с WaitBeforeStarting не сдвигает старт остальных."""
+    spawns = [
+        spawn("a", total=0, wait_before_starting=30),
+        spawn("b", total=1),
+        spawn("c", total=1, wait_for_all_dead="a"),
+    ]
+    if reverse:
+        spawns.reverse()
+    timeline = TimelineSimulator(lifetime=10).simulate(Wave(wave_spawns=spawns))
+    starts = {schedule.name: schedule.start for schedule in timeline.spawns}
+
+    assert starts == {"a": 30, "b": 0, "c": 30}
+    assert timeline.end == 40
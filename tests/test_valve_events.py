@@ -0,0 +1,132 @@
+"""
+Тесты для событийного разбора формата Valve.
+"""
+from pathlib import Path
+
+import pytest
+from pop_file_parser.valve_parser import ValveFormat
+from pop_file_parser.valve_events import (
+    ValveHandler, WaveSummaryHandler, CurrencySummaryHandler
+)
+
+EXAMPLE = Path(__file__).resolve().parent.parent / "examples" / "expert_mission.pop"
+
+
+class TreeHandler(ValveHandler):
+    """Собирает дерево из событий так же, как parse_buffer."""
+
+    def __init__(self):
+        self.stack = [{}]
+
+    def _add(self, key, value):
+        block = self.stack[-1]
+        if key in block:
+            if isinstance(block[key], list):
+                block[key].append(value)
+            else:
+                block[key] = [block[key], value]
+        else:
+            block[key] = value
+
+    def start_block(self, key):
+        self.stack.append({})
+        self.stack[-1]["__key"] = key
+
+    def key_value(self, key, value):
+        self._add(key, value)
+
+    def end_block(self):
+        block = self.stack.pop()
+        self._add(block.pop("__key"), block)
+
+    def base_file(self, path):
+        self.stack[0].setdefault("__base_files", []).append(path)
+
+
+def as_list(value):
+    return value if isinstance(value, list) else [value]
+
+
+def test_events_rebuild_parsed_tree():
+    """События описывают то же дерево, что строит parse_file."""
+    parser = ValveFormat()
+    tree = parser.scan_file(str(EXAMPLE), TreeHandler()).stack[0]
+    
+    assert tree == parser.parse_file(str(EXAMPLE), comments=False)
+    assert parser.scan_file(str(EXAMPLE), TreeHandler(), use_mmap=True).stack[0] == tree
+
+def test_wave_and_currency_summaries():
+    """Готовые обработчики совпадают с подсчетом по полному дереву."""
+    parser = ValveFormat()
+    waves = parser.scan_file(str(EXAMPLE), WaveSummaryHandler())
+    currency = parser.scan_file(str(EXAMPLE), CurrencySummaryHandler())
+    
+    schedule = parser.parse_file(str(EXAMPLE))["WaveSchedule"]
+    wave_list = as_list(schedule["Wave"])
+    spawns = [as_list(wave.get("WaveSpawn", [])) for wave in wave_list]
+    
+    assert waves.wave_count == len(wave_list)
+    assert waves.wave_spawns == [len(s) for s in spawns]
+    assert waves.base_files == parser.parse_file(str(EXAMPLE))["__base_files"]
+    assert currency.starting_currency == int(schedule["StartingCurrency"])
+    assert currency.wave_currency == [
+        sum(int(spawn.get("TotalCurrency", 0)) for spawn in s) for s in spawns
+    ]
+
+def test_templates_used_and_defined():
+    """Шаблоны собираются из блока Templates и ключей Template."""
+    text = """WaveSchedule
+{
+    Templates { T_Heavy { Class Heavyweapons } T_Scout { Class Scout } }
+    Wave
+    {
+        WaveSpawn { TotalCurrency 100 TFBot { Template T_Heavy } }
+        WaveSpawn { TotalCurrency 50 Squad { TFBot { Template T_Heavy } TFBot { Template T_Scout } } }
+    }
+    Wave { WaveSpawn { TotalCurrency 25 Tank { Health 20000 } } }
+}
+"""
+    waves = ValveFormat().scan_buffer(text, WaveSummaryHandler())
+    currency = ValveFormat().scan_buffer(text.encode("utf-8"), CurrencySummaryHandler())
+    
+    assert waves.templates_defined == ["T_Heavy", "T_Scout"]
+    assert waves.templates_used == {"T_Heavy": 2, "T_Scout": 1}
+    assert waves.wave_spawns == [2, 1]
+    assert currency.wave_currency == [150, 25]
+    assert currency.total_currency == 175
+
+def test_currency_values_tolerant():
+    """Дробные значения валюты округляются вниз, нечисловые пропускаются."""
+    text = """WaveSchedule
+{
+    StartingCurrency 400.0
+    Wave
+    {
+        WaveSpawn { TotalCurrency 100.5 }
+        WaveSpawn { TotalCurrency lots }
+        WaveSpawn { TotalCurrency 1e999 }
+        WaveSpawn { TotalCurrency 50 }
+    }
+}
+"""
+    currency = ValveFormat().scan_buffer(text, CurrencySummaryHandler())
+    
+    assert currency.starting_currency == 400
+    assert currency.wave_currency == [150]
+
+@pytest.mark.parametrize("text", [
+    "",
+    "WaveSchedule Wave",
+    "WaveSchedule { { } }",
+    "WaveSchedule\n{ Wave {",
+    "\n  } { }",
+    "// only a comment\n\n",
+])
+def test_errors_match_parse_buffer(text):
+    """Синтаксические ошибки сообщаются так же, как при полном разборе."""
+    with pytest.raises(ValueError) as expected:
+        ValveFormat().parse_buffer(text)
+    with pytest.raises(ValueError) as actual:
+        ValveFormat().scan_buffer(text, ValveHandler())
+    
+    assert str(actual.value) == str(expected.value)
@@ -0,0 +1,357 @@
+"""
+Тесты для парсера формата Valve.
+"""
+import io
+from pathlib import Path
+
+import pytest
+from pop_file_parser.valve_parser import ValveFormat
+from pop_file_parser.valve_emitter import Emitter
+from pop_file_parser.parse_cache import BaseTreeCache
+from pop_file_parser.valve_keys import (
+    KEY_CLASSES, BLOCK, OUTPUT, PARAMETERS, ATTRIBUTE_BLOCK, _KeyTable
+)
+
+EXAMPLE = Path(__file__).resolve().parent.parent / "examples" / "expert_mission.pop"
+
+SAMPLE = """#base robot_giant.pop
+#base "robot_standard.pop"
+
+WaveSchedule
+{
+    StartingCurrency 400 // стартовая валюта
+    /* многострочный
+       комментарий */
+    Wave
+    {
+        WaveSpawn
+        {
+            Where spawnbot
+            Template "T_TFBot_Giant_Heavy"
+            Name "http://example.com"
+        }
+        WaveSpawn { Where spawnbot_left }
+    }
+}
+"""
+
+@pytest.fixture
+def sample_file(tmp_path):
+    """Фикстура для создания временного pop файла."""
+    path = tmp_path / "sample.pop"
+    path.write_text(SAMPLE, encoding="utf-8")
+    return path
+
+def test_mmap_matches_text_parse():
+    """Разбор через mmap совпадает с текстовым разбором на примере миссии."""
+    parser = ValveFormat()
+    
+    assert parser.parse_file(str(EXAMPLE), use_mmap=True) == parser.parse_file(str(EXAMPLE))
+
+def test_mmap_skips_comments_inline(sample_file):
+    """Комментарии пропускаются при сканировании, строки в кавычках не трогаются."""
+    result = ValveFormat().parse_file(str(sample_file), use_mmap=True)
+    schedule = result["WaveSchedule"]
+    
+    assert result["__base_files"] == ["robot_giant.pop", "robot_standard.pop"]
+    assert schedule["StartingCurrency"] == "400"
+    assert schedule["Wave"]["WaveSpawn"][0]["Name"] == "http://example.com"
+    assert schedule["Wave"]["WaveSpawn"][1] == {"Where": "spawnbot_left"}
+
+def test_parse_buffer_bytes_and_text():
+    """Байтовый и текстовый буферы дают одинаковый результат."""
+    data = 'Templates { T_Бот { Class "Heavyweapons" } }'
+    parser = ValveFormat()
+    
+    assert parser.parse_buffer(data.encode("utf-8")) == parser.parse_buffer(data)
+    assert parser.parse_buffer(data) == {"Templates": {"T_Бот": {"Class": "Heavyweapons"}}}
+
+def test_parse_buffer_unicode_whitespace():
+    """Юникодные пробелы разделяют токены одинаково в байтах и в строке."""
+    data = 'Templates\u3000{ T_Bot\xa0{ Class\u2003"Heavyweapons" Name\xa0\xa0Bot© } }'
+    parser = ValveFormat()
+    
+    expected = {"Templates": {"T_Bot": {"Class": "Heavyweapons", "Name": "Bot©"}}}
+    assert parser.parse_buffer(data) == expected
+    assert parser.parse_buffer(data.encode("utf-8")) == expected
+    # В однобайтовой кодировке пробелом считается только байт U+00A0
+    latin = data.replace("\u3000", " ").replace("\u2003", " ").encode("cp1252")
+    assert parser.parse_buffer(latin, encoding="cp1252") == expected
+
+@pytest.mark.parametrize("data", ["} { a b }", "", "// only comment"])
+def test_root_key_rejects_brace_and_eof(data):
+    """Закрывающая скобка и конец файла не становятся корневым ключом."""
+    parser = ValveFormat()
+    with pytest.raises(ValueError, match="Expected '{'"):
+        parser.parse_buffer(data)
+    with pytest.raises(ValueError, match="Expected '{'"):
+        parser.parse_sections(data.encode(), ["Wave"])
+
+def test_parse_buffer_unclosed_block():
+    """Незакрытый блок сообщает позицию ошибки."""
+    with pytest.raises(ValueError, match="line 2"):
+        ValveFormat().parse_buffer(b"WaveSchedule\n{ Wave {")
+
+def test_comments_attached_to_each_block():
+    """Комментарии прикрепляются к своему блоку, даже если имена блоков совпадают."""
+    text = """WaveSchedule
+{
+    // Первая волна
+    Wave
+    {
+        // Скауты
+        WaveSpawn { Where spawnbot }
+        WaveSpawn
+        {
+            // Хевики
+            Where spawnbot_left
+            TotalCount 4 // итого
+        }
+    }
+}
+"""
+    result = ValveFormat().parse_buffer(text)
+    wave = result["WaveSchedule"]["Wave"]
+    
+    assert wave["__comment"] == "Первая волна"
+    assert wave["WaveSpawn"][0]["__comment"] == "Скауты"
+    assert wave["WaveSpawn"][1]["__comment"] == "Хевики\nитого"
+    assert "__comment" not in result["WaveSchedule"]
+
+def test_comments_can_be_skipped():
+    """Без сохранения комментариев дерево не содержит "__comment"."""
+    text = "WaveSchedule { /* шапка */ Wave { // c\n Checkpoint Yes } }"
+    result = ValveFormat().parse_buffer(text, comments=False)
+    
+    assert result == {"WaveSchedule": {"Wave": {"Checkpoint": "Yes"}}}
+
+def test_deep_nesting_without_recursion_limit():
+    """Глубоко вложенные блоки разбираются без RecursionError."""
+    depth = 5000
+    text = "Root {" + " k {" * depth + " v 1" + " }" * depth + " }"
+    node = ValveFormat().parse_buffer(text)["Root"]
+    
+    for _ in range(depth):
+        node = node["k"]
+    assert node == {"v": "1"}
+
+def test_parse_sections_builds_only_requested_blocks():
+    """Выборочный разбор строит только выбранные блоки и возвращает пропущенные."""
+    text = """#base robot_giant.pop
+WaveSchedule
+{
+    StartingCurrency 400
+    Templates { T_A { Class "}" } }
+    Wave { Checkpoint Yes /* } */ }
+    Wave { WaveSpawn { Where spawnbot } }
+    "Wave" { Checkpoint No }
+}
+"""
+    parser = ValveFormat()
+    full = parser.parse_buffer(text)
+    
+    result, skipped = parser.parse_sections(text, ["Templates", "Wave[1]"])
+    
+    assert result == {
+        "WaveSchedule": {
+            "StartingCurrency": "400",
+            "Templates": full["WaveSchedule"]["Templates"],
+            "Wave": full["WaveSchedule"]["Wave"][1],
+        },
+        "__base_files": ["robot_giant.pop"],
+    }
+    assert [region[0] for region in skipped] == ["Wave[0]", "Wave[2]"]
+    assert [text[start:end] for _, start, end in skipped] == [
+        "Wave { Checkpoint Yes /* } */ }",
+        '"Wave" { Checkpoint No }',
+    ]
+
+def test_parse_sections_comments():
+    """Комментарий выбранного блока не дублируется в корне, у пропущенного - входит в регион."""
+    text = """WaveSchedule
+{
+    // money
+    StartingCurrency 400
+    // first wave
+    Wave { Checkpoint Yes }
+    /* second
+       wave */
+    Wave { Checkpoint No }
+}
+"""
+    result, skipped = ValveFormat().parse_sections(text, ["Wave[1]"])
+    
+    assert result == {"WaveSchedule": {
+        "StartingCurrency": "400",
+        "Wave": {"Checkpoint": "No", "__comment": "second\nwave"},
+        "__comment": "money",
+    }}
+    assert [text[start:end] for _, start, end in skipped] == [
+        "// first wave\n    Wave { Checkpoint Yes }"
+    ]
+
+def test_parse_sections_bytes_offsets():
+    """Для байтового буфера смещения пропущенных секций - байтовые."""
+    data = 'Root { T { Name "Бот" } Wave { A 1 } }'.encode("utf-8")
+    result, skipped = ValveFormat().parse_sections(data, ["Wave"])
+    
+    assert result == {"Root": {"Wave": {"A": "1"}}}
+    assert [(name, data[start:end]) for name, start, end in skipped] == [
+        ("T[0]", 'T { Name "Бот" }'.encode("utf-8"))
+    ]
+
+def test_parse_file_with_bases(tmp_path):
+    """#base файлы подключаются рекурсивно, значения файла важнее."""
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    (shared / "robot_giant.pop").write_text(
+        '#base robot_common.pop\n'
+        'WaveSchedule { Templates { T_Giant { Class Heavyweapons } } StartingCurrency 100 }',
+        encoding="utf-8")
+    (shared / "robot_common.pop").write_text(
+        'WaveSchedule { Templates { T_Giant { Class Scout } T_Common { Class Pyro } } }',
+        encoding="utf-8")
+    missions = []
+    for i in range(3):
+        mission = tmp_path / f"mission_{i}.pop"
+        mission.write_text(
+            '#base robot_giant.pop\nWaveSchedule { StartingCurrency 400 Wave { } }',
+            encoding="utf-8")
+        missions.append(str(mission))
+    
+    cache = BaseTreeCache()
+    parser = ValveFormat(base_cache=cache)
+    results = [parser.parse_file_with_bases(m, search_path=[str(shared)]) for m in missions]
+    
+    assert results[0] == {
+        "WaveSchedule": {
+            "StartingCurrency": "400",
+            "Wave": {},
+            "Templates": {
+                "T_Giant": {"Class": "Heavyweapons"},
+                "T_Common": {"Class": "Pyro"},
+            },
+        },
+        "__base_files": ["robot_giant.pop"],
+    }
+    # Каждый #base файл разобран один раз, общие деревья не изменяются
+    assert (cache.misses, cache.hits) == (2, 4)
+    results[0]["WaveSchedule"]["Templates"]["T_Common"]["Class"] = "Spy"
+    assert results[1] == results[2]
+    assert results[1]["WaveSchedule"]["Templates"]["T_Common"] == {"Class": "Pyro"}
+
+def test_parse_file_with_bases_errors(tmp_path):
+    """Отсутствующий и циклический #base сообщаются ошибкой."""
+    (tmp_path / "a.pop").write_text('#base b.pop\nA { }', encoding="utf-8")
+    (tmp_path / "b.pop").write_text('#base a.pop\nB { }', encoding="utf-8")
+    (tmp_path / "c.pop").write_text('#base missing.pop\nC { }', encoding="utf-8")
+    parser = ValveFormat(base_cache=BaseTreeCache())
+    
+    with pytest.raises(ValueError, match="Circular #base include"):
+        parser.parse_file_with_bases(str(tmp_path / "a.pop"))
+    with pytest.raises(FileNotFoundError, match="missing.pop"):
+        parser.parse_file_with_bases(str(tmp_path / "c.pop"))
+
+def test_dump_to_matches_dump():
+    """Потоковая запись дает тот же текст, что и dump()."""
+    parser = ValveFormat()
+    data = parser.parse_file(str(EXAMPLE))
+    data["WaveSchedule"]["Empty"] = {}
+    stream = io.StringIO()
+    
+    parser.dump_to(data, stream)
+    
+    assert stream.getvalue() == parser.dump(data)
+    assert "\n".join(parser.iter_dump(data, 1)) == parser.dump(data, 1)
+
+def test_key_classes():
+    """Таблица ключей классифицирует известные и новые ключи."""
+    assert KEY_CLASSES["OnKilledOutput"].strategy == OUTPUT
+    assert KEY_CLASSES["Parameters"].strategy == PARAMETERS
+    assert KEY_CLASSES["ItemAttributes"].strategy == ATTRIBUTE_BLOCK
+    assert KEY_CLASSES["CustomBlock"].strategy == BLOCK
+    assert "CustomBlock" in KEY_CLASSES
+    assert KEY_CLASSES["Advanced"].root_param
+    assert ValveFormat()._format_key_value("Advanced", True) == "Advanced Yes"
+    assert ValveFormat()._format_key_value("Health", True) == "Health 1"
+    assert ValveFormat()._format_key_value("ItemName", 5) == 'ItemName "5"'
+
+def test_key_table_bounded():
+    """Таблица признаков не растет больше max_entries и сохраняет ключи схемы."""
+    table = _KeyTable(["TFBot", "OnKilledOutput"], max_entries=4)
+    for number in range(10):
+        assert table[f"T_Bot{number}"].strategy == BLOCK
+    
+    assert len(table) <= 4
+    assert "TFBot" in table and table["OnKilledOutput"].strategy == OUTPUT
+
+def test_emitter_tables_and_tab_indentation():
+    """Отступы берутся из таблиц эмиттера; все форматтеры используют табуляцию."""
+    emitter = Emitter()
+    
+    assert emitter.opens[2] == "\t\t{"
+    assert emitter.headers[1, "TFBot"] is emitter.headers[1, "TFBot"]
+    assert ValveFormat()._format_block({"Wave": {"Checkpoint": "Yes"}}, 1) == [
+        "\tWave", "\t{", '\t\tCheckpoint "Yes"', "\t}"
+    ]
+
+def test_emitter_tables_bounded():
+    """Таблицы эмиттера очищаются при переполнении и строят строки заново."""
+    emitter = Emitter(max_entries=3)
+    headers = [emitter.headers[0, f"T_Bot{number}"] for number in range(10)]
+    
+    assert headers[7] == "T_Bot7"
+    assert len(emitter.headers) <= 3
+    assert emitter.opens[5] == "\t" * 5 + "{" and len(emitter.pads) <= 3
+
+def test_subtree_cache_reuses_repeated_robots():
+    """Одинаковые TFBot отрисовываются один раз и переиспользуются на любом уровне."""
+    bot = {"Class": "Heavyweapons", "Health": 5000, "Advanced": True, "Empty": {}}
+    other = dict(bot, Health="5000")
+    data = {"WaveSchedule": {"Wave": [
+        {"WaveSpawn": {"TFBot": dict(bot)}},
+        {"WaveSpawn": {"Squad": [{"TFBot": dict(bot)}, {"TFBot": other}]}},
+        {"TFBot": dict(bot), "DoneOutput": {"Target": "relay"}},
+    ]}}
+    reference = ValveFormat()
+    reference.subtree_cache = None
+    parser = ValveFormat()
+    
+    assert parser.dump(data) == reference.dump(data)
+    assert parser.dump(data, 2) == reference.dump(data, 2)
+    # Health 5000 и "5000" выводятся по-разному и кэшируются отдельно
+    assert len(parser.subtree_cache) == 3
+    assert parser.subtree_cache.misses == 3
+
+
+def test_subtree_cache_sees_in_place_edits():
+    """Правки списков и словарей модели на месте меняют вывод повторно используемого ValveFormat."""
+    import copy
+    from pop_file_parser.models.tf_bot import TFBot
+    from pop_file_parser.models.wave_spawn import WaveSpawn
+
+    bot = TFBot(class_name="Heavyweapons", health=5000)
+    spawn = WaveSpawn(squad=[bot])
+    reference = ValveFormat(subtree_cache=None)
+    parser = ValveFormat()
+    assert reference.subtree_cache is None
+
+    def check():
+        data = {"WaveSpawn": spawn.to_valve_format()}
+        assert parser.dump(data) == reference.dump(data)
+
+    check()
+    check()
+    assert (parser.subtree_cache.misses, parser.subtree_cache.hits) == (1, 1)
+
+    bot.items.append("The Brass Beast")
+    bot.character_attributes["damage bonus"] = "2"
+    check()
+    assert parser.subtree_cache.misses == 2
+    assert 'Item "The Brass Beast"' in parser.dump({"TFBot": bot.to_valve_format()})
+
+    # Копия, измененная на месте, не выдает строки оригинала
+    spawn.squad[0] = copy.deepcopy(bot)
+    spawn.squad[0].items.append("Tomislav")
+    check()
+    assert parser.subtree_cache.misses == 3